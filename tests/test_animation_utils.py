@@ -0,0 +1,54 @@
+import importlib.util
+import os
+
+import numpy as np
+
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+
+def load_animation_utils():
+    # create/ is a package of the add-on; animation_utils itself needs neither bpy nor its siblings
+    spec = importlib.util.spec_from_file_location("animation_utils", os.path.join(ADDON_DIR, "create", "animation_utils.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+animation_utils = load_animation_utils()
+
+def test_quaternion_matrix_round_trip():
+    rng = np.random.default_rng(7)
+    quaternions = rng.normal(size=(64, 4))
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    quaternions[:4] = [(1, 0, 0, 0), (0, 1, 0, 0), (0, 0, 1, 0), (0, 0, 0, 1)]
+    matrices = animation_utils.quaternions_to_matrices(quaternions)
+    np.testing.assert_allclose(matrices @ matrices.transpose(0, 2, 1), np.broadcast_to(np.eye(3), matrices.shape), atol=1e-12)
+
+    # Same rotation, with the sign made canonical (w >= 0), also from scaled matrices
+    expected = quaternions * np.where(quaternions[:, :1] < 0, -1.0, 1.0)
+    np.testing.assert_allclose(animation_utils.matrices_to_quaternions(matrices * 2.5), expected, atol=1e-9)
+
+def test_half_turn_sign_follows_blender_branch():
+    # A half turn about an axis whose z has the largest magnitude but nz² < 0.5:
+    # Blender solves for x (m22 < 0 and m00 > m11) and makes x positive
+    axis = np.array((0.6, 0.5, -0.62))
+    axis /= np.linalg.norm(axis)
+    expected = np.concatenate(((0.0,), axis))
+    for rotation in (expected, -expected):
+        matrix = animation_utils.quaternions_to_matrices(rotation[None])
+        np.testing.assert_allclose(animation_utils.matrices_to_quaternions(matrix)[0], expected, atol=1e-12)
+        values = animation_utils.pose_keyframe_values(np.zeros((1, 3)), rotation[None], 1.0)
+        np.testing.assert_allclose(values[0, 3:7], expected, atol=1e-12)
+
+def test_pose_keyframe_values_identity_base_matches_plain_path():
+    translations = np.array([(1.0, 2.0, 3.0), (-1.0, 0.0, 0.5)])
+    rotations = np.array([(0.0, 0.0, 0.0, -1.0), (0.5, 0.5, 0.5, 0.5)])
+    plain = animation_utils.pose_keyframe_values(translations, rotations, 1.0)
+    with_base = animation_utils.pose_keyframe_values(translations, rotations, 1.0, np.eye(4))
+    np.testing.assert_allclose(plain, with_base, atol=1e-12)
+
+def test_merge_keyframes_later_keys_replace_earlier_ones():
+    frames, values = animation_utils.merge_keyframes([
+        (np.array([1.0, 2.0, 3.0]), np.array([[10.0], [20.0], [30.0]])),
+        (np.array([2.0, 4.0]), np.array([[21.0], [40.0]])),
+    ])
+    np.testing.assert_array_equal(frames, [1, 2, 3, 4])
+    np.testing.assert_array_equal(values[:, 0], [10, 21, 30, 40])
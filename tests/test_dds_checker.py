@@ -0,0 +1,74 @@
+import os
+import struct
+import sys
+
+import pytest
+
+# The parser modules import each other as top-level modules, as they do inside Blender
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+sys.path.insert(0, os.path.join(ADDON_DIR, "wce_import"))
+
+import dds_checker
+
+def write_dds(path, compression=b'DXT5', flags=dds_checker.DDSD_MIPMAPCOUNT, mip_map_count=0):
+    header = bytearray(dds_checker.DDS_HEADER_SIZE)
+    header[:4] = dds_checker.DDS_MAGIC
+    struct.pack_into('<I', header, dds_checker.DDS_OFFSET_FLAGS, flags)
+    struct.pack_into('<I', header, dds_checker.DDS_OFFSET_MIPMAPCOUNT, mip_map_count)
+    header[dds_checker.DDS_OFFSET_COMPRESSION:dds_checker.DDS_OFFSET_COMPRESSION + 4] = compression
+    path.write_bytes(bytes(header))
+    return str(path)
+
+def read_flags(path):
+    with open(path, 'rb') as f:
+        return struct.unpack_from('<I', f.read(dds_checker.DDS_HEADER_SIZE), dds_checker.DDS_OFFSET_FLAGS)[0]
+
+@pytest.fixture
+def checks(monkeypatch):
+    # Counts the files actually opened, with a fresh mtime cache
+    monkeypatch.setattr(dds_checker, 'checked_files', {})
+    opened = []
+    check_and_fix_dds = dds_checker.check_and_fix_dds
+    def counting_check(texture_path):
+        opened.append(texture_path)
+        return check_and_fix_dds(texture_path)
+    monkeypatch.setattr(dds_checker, 'check_and_fix_dds', counting_check)
+    return opened
+
+def test_fix_dds_files_clears_mip_map_flag_once(tmp_path, checks):
+    broken = write_dds(tmp_path / "broken.dds")
+    fine = write_dds(tmp_path / "fine.dds", mip_map_count=4)
+    bmp = tmp_path / "texture.bmp"
+    bmp.write_bytes(b"BM" + bytes(200))
+
+    assert dds_checker.fix_dds_files([broken, fine, str(bmp), broken]) == [broken]
+    assert not read_flags(broken) & dds_checker.DDSD_MIPMAPCOUNT
+    assert read_flags(fine) & dds_checker.DDSD_MIPMAPCOUNT
+    assert sorted(checks) == sorted([broken, fine, str(bmp)])
+
+    # Unchanged files are not opened again
+    checks.clear()
+    assert dds_checker.fix_dds_files([broken, fine, str(bmp)]) == []
+    assert checks == []
+
+def test_fix_dds_files_checks_changed_and_missing_files_again(tmp_path, checks):
+    path = write_dds(tmp_path / "texture.dds", mip_map_count=1)
+    missing = str(tmp_path / "missing.dds")
+    assert dds_checker.fix_dds_files([path, missing]) == []
+    assert missing not in dds_checker.checked_files
+
+    # Rewritten with a newer modification time
+    write_dds(tmp_path / "texture.dds")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    checks.clear()
+    assert dds_checker.fix_dds_files([path]) == [path]
+    assert checks == [path]
+    assert dds_checker.checked_files[path] == os.stat(path).st_mtime_ns
+
+def test_fix_dds_files_in_threads(tmp_path, checks):
+    paths = [write_dds(tmp_path / f"texture{i}.dds", mip_map_count=i % 2) for i in range(12)]
+    fixed = dds_checker.fix_dds_files(paths, threads=4)
+    assert fixed == paths[::2]
+    assert dds_checker.fix_dds_files(paths, threads=4) == []
+    assert len(checks) == len(paths)
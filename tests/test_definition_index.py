@@ -0,0 +1,50 @@
+import os
+import sys
+
+# The parser modules import each other as top-level modules, as they do inside Blender
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+sys.path.insert(0, os.path.join(ADDON_DIR, "wce_import"))
+
+import definition_index
+
+INDENTED = (
+    b'// wce\n'
+    b'MATERIALPALETTE "A_MP"\n'
+    b'\tNUMMATERIALS 1\n'
+    b'\tMATERIAL "A_MDF"\n'
+    b'ACTORINST "SKIPPED"\n'
+    b'\tSPRITETAG "X"\n'
+    b'MATERIALPALETTE "B_MP"\n'
+    b'\tNUMMATERIALS 0\n'
+)
+
+def test_select_lines_reads_only_requested_kinds():
+    index = definition_index.build_index(INDENTED)
+    assert [entry[:2] for entry in index['entries']] == [("MATERIALPALETTE", "A_MP"), ("ACTORINST", "SKIPPED"), ("MATERIALPALETTE", "B_MP")]
+    assert not index['single_line_kinds']
+    lines = definition_index.select_lines(INDENTED, index, {"MATERIALPALETTE"})
+    assert b'ACTORINST "SKIPPED"' not in lines
+    assert lines[0] == b'MATERIALPALETTE "A_MP"' and lines[-1] == b'\tNUMMATERIALS 0'
+
+def test_select_lines_falls_back_to_whole_file_without_indentation():
+    data = INDENTED.replace(b'\tNUMMATERIALS 1', b'NUMMATERIALS 1')
+    index = definition_index.build_index(data)
+    assert "MATERIALPALETTE" in index['single_line_kinds']
+    assert definition_index.select_lines(data, index, {"MATERIALPALETTE"}) == data.splitlines()
+
+def test_select_lines_from_mapped_file_matches_bytes(tmp_path):
+    path = tmp_path / "model.wce"
+    path.write_bytes(INDENTED)
+    with definition_index.open_mapped(str(path)) as data:
+        index = definition_index.build_index(data)
+        lines = definition_index.select_lines(data, index, {"MATERIALPALETTE"})
+    # The lines are copies, still usable once the mapping is closed
+    assert lines == definition_index.select_lines(INDENTED, definition_index.build_index(INDENTED), {"MATERIALPALETTE"})
+    assert all(type(line) is bytes for line in lines)
+
+def test_open_mapped_empty_file(tmp_path):
+    path = tmp_path / "empty.wce"
+    path.write_bytes(b"")
+    with definition_index.open_mapped(str(path)) as data:
+        assert data == b""
+        assert definition_index.build_index(data)['entries'] == []
@@ -0,0 +1,48 @@
+import os
+import sys
+
+# The parser modules import each other as top-level modules, as they do inside Blender
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+sys.path.insert(0, os.path.join(ADDON_DIR, "wce_import"))
+
+import eq_ascii_wld_parser
+
+def write_wce(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+def palette(name):
+    return f'MATERIALPALETTE "{name}"\n\tNUMMATERIALS 1\n\tMATERIAL "{name}_MDF"'
+
+def test_iter_definitions_expands_includes_in_place(tmp_path):
+    write_wce(tmp_path / "nested.wce", [palette("C")])
+    write_wce(tmp_path / "include.wce", [palette("B"), 'INCLUDE "nested.wce"', palette("D")])
+    filepath = write_wce(tmp_path / "model.wce", [palette("A"), 'INCLUDE "include.wce"', palette("E")])
+
+    definitions = list(eq_ascii_wld_parser.iter_definitions(filepath))
+    assert [(keyword, definition['name']) for keyword, definition in definitions] == [("MATERIALPALETTE", name) for name in "ABCDE"]
+    assert definitions[0][1]['materials'] == ["A_MDF"]
+
+def test_iter_definitions_without_expanding_includes(tmp_path):
+    write_wce(tmp_path / "include.wce", [palette("B")])
+    filepath = write_wce(tmp_path / "model.wce", [palette("A"), 'INCLUDE "include.wce"'])
+
+    definitions = list(eq_ascii_wld_parser.iter_definitions(filepath, expand_includes=False))
+    assert definitions[0][0] == "MATERIALPALETTE"
+    assert definitions[1] == ("INCLUDE", "include.wce")
+
+def dm_track(name, offset, num_frames=2):
+    lines = [f'DMTRACKDEF2 "{name}"', "\tSLEEP 100", "\tPARAM2 0", "\tFPSCALE 1", "\tSIZE6 0", f"\tNUMFRAMES {num_frames}"]
+    for frame in range(num_frames):
+        lines += ["\t\tNUMVERTICES 2"] + [f"\t\t\tXYZ {offset + frame} {vertex} 0" for vertex in range(2)]
+    return "\n".join(lines)
+
+def test_vertex_animations_by_name_first_definition_wins(tmp_path):
+    filepath = write_wce(tmp_path / "model.wce", [dm_track("A_DMT", 0), dm_track("B_DMT", 10, 1), dm_track("A_DMT", 20)])
+
+    vertex_animations = eq_ascii_wld_parser.parse(filepath, {"DMTRACKDEF2"})[8]
+    assert list(vertex_animations) == ["A_DMT", "B_DMT"]
+    frames = vertex_animations["A_DMT"]['frames']
+    assert len(frames) == 2
+    assert frames[1].tolist() == [[1, 0, 0], [1, 1, 0]]
+    assert len(vertex_animations["B_DMT"]['frames']) == 1
@@ -0,0 +1,24 @@
+import os
+import sys
+
+import numpy as np
+
+# The parser modules import each other as top-level modules, as they do inside Blender
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+sys.path.insert(0, os.path.join(ADDON_DIR, "wce_import"))
+
+from mesh_record import expand_groups
+
+def test_expand_groups_repeats_each_index_by_its_count():
+    # FACEMATERIALGROUPS 3 2 0 1 4 3 1
+    expanded = expand_groups("3 2 0 1 4 3 1".split(), 6)
+    np.testing.assert_array_equal(expanded, [0, 0, 4, 1, 1, 1])
+    assert expanded.dtype == np.int32
+
+def test_expand_groups_pads_uncovered_entries():
+    np.testing.assert_array_equal(expand_groups("1 2 7".split(), 5), [7, 7, -1, -1, -1])
+    np.testing.assert_array_equal(expand_groups(["0"], 3), [-1, -1, -1])
+
+def test_expand_groups_drops_entries_past_total():
+    # Groups covering more entries than exist; tokens after the pairs are ignored
+    np.testing.assert_array_equal(expand_groups("2 3 5 3 6 9 9".split(), 4), [5, 5, 5, 6])
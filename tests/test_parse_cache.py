@@ -0,0 +1,59 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The parser modules import each other as top-level modules, as they do inside Blender
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+sys.path.insert(0, os.path.join(ADDON_DIR, "wce_import"))
+
+import parse_cache
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "cache"
+    monkeypatch.setitem(parse_cache.cache_settings, 'enabled', True)
+    monkeypatch.setitem(parse_cache.cache_settings, 'directory', str(directory))
+    monkeypatch.setitem(parse_cache.cache_settings, 'max_bytes', 1024 * 1024)
+    return directory
+
+def test_parse_cache_round_trip_and_invalidation(tmp_path, cache_dir):
+    source = tmp_path / "model.wce"
+    include = tmp_path / "include.wce"
+    source.write_text("MODEL\n")
+    include.write_text("INCLUDE\n")
+    results = {'vertices': np.arange(6, dtype=np.float32).reshape(2, 3), 'name': "ORC"}
+
+    parse_cache.store(str(source), [str(include)], results)
+    cached = parse_cache.load(str(source))
+    np.testing.assert_array_equal(cached['vertices'], results['vertices'])
+    assert cached['name'] == "ORC"
+
+    # Same size, different modification time
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert parse_cache.load(str(source)) is None
+
+    # An edited INCLUDE invalidates the entry too
+    parse_cache.store(str(source), [str(include)], results)
+    assert parse_cache.load(str(source)) is not None
+    include.write_text("INCLUDE CHANGED\n")
+    assert parse_cache.load(str(source)) is None
+
+def test_parse_cache_evicts_least_recently_used(tmp_path, cache_dir):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"model{i}.wce"
+        path.write_text(f"MODEL {i}\n")
+        parse_cache.store(str(path), [], b"x" * 1000)
+        # Entries ordered oldest to newest, then the oldest is used again
+        os.utime(parse_cache._entry_path(str(path), parse_cache.CACHE_SUFFIX), (1000 + i, 1000 + i))
+        paths.append(str(path))
+    assert parse_cache.load(paths[0]) is not None
+
+    entry_size = parse_cache.cache_size() // 3
+    parse_cache.evict(entry_size * 2)
+    assert parse_cache.load(paths[1]) is None
+    assert parse_cache.load(paths[0]) is not None
+    assert parse_cache.load(paths[2]) is not None
@@ -0,0 +1,22 @@
+import os
+import sys
+
+# The parser modules import each other as top-level modules, as they do inside Blender
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+sys.path.insert(0, os.path.join(ADDON_DIR, "wce_import"))
+
+import eq_ascii_wld_parser
+import parse_pool
+
+def write_palette_file(path, name, materials):
+    lines = [f'MATERIALPALETTE "{name}"', f"\tNUMMATERIALS {len(materials)}"] + [f'\tMATERIAL "{material}"' for material in materials]
+    path.write_text("\n".join(lines) + "\n")
+    return str(path)
+
+def test_parse_includes_keeps_file_order(tmp_path):
+    # The first file is the largest so it is not the first to finish
+    filepaths = [write_palette_file(tmp_path / f"include{i}.wce", f"P{i}", [f"M{i}_{j}" for j in range(2000 if i == 0 else i + 1)]) for i in range(4)]
+    kinds = {"MATERIALPALETTE"}
+    parsed = parse_pool.parse_includes(filepaths, kinds, workers=2)
+    for filepath, (results, opened_files) in zip(filepaths, parsed):
+        assert results[3] == eq_ascii_wld_parser.parse(filepath, kinds)[3]
@@ -0,0 +1,42 @@
+import json
+import os
+import sys
+
+import pytest
+
+# The parser modules import each other as top-level modules, as they do inside Blender
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+sys.path.insert(0, os.path.join(ADDON_DIR, "wce_import"))
+
+import eq_ascii_wld_parser
+import parse_stats
+from parse_stats import ParseStats
+
+def test_merge_adds_totals_from_stats_or_dict():
+    stats = ParseStats()
+    stats.add_open("a.wce", 0.5)
+    stats.add_block("a.wce", "DMSPRITEDEF2", 1.0, 100)
+    other = ParseStats()
+    other.add_block("a.wce", "DMSPRITEDEF2", 2.0, 50)
+    other.add_block("b.wce", "TRACKDEFINITION", 0.25, 10)
+    other.cache['hits'] += 1
+
+    stats.merge(other)
+    # Worker processes send their totals back as to_dict()
+    stats.merge(json.loads(other.to_json()))
+
+    assert stats.keywords["DMSPRITEDEF2"] == {'seconds': 5.0, 'blocks': 3, 'bytes': 200}
+    assert stats.files["b.wce"] == {'seconds': 0.5, 'blocks': 2, 'bytes': 20}
+    assert stats.cache == {'hits': 2, 'misses': 0}
+    assert stats.to_dict()['total_seconds'] == pytest.approx(0.5 + 5.0 + 0.5)
+
+def test_collect_records_parses_and_merges_into_outer(tmp_path):
+    path = tmp_path / "model.wce"
+    path.write_text('MATERIALPALETTE "A"\n\tNUMMATERIALS 1\n\tMATERIAL "A_MDF"\n')
+    with parse_stats.collect() as outer:
+        with parse_stats.collect() as inner:
+            eq_ascii_wld_parser.parse(str(path), {"MATERIALPALETTE"})
+    assert parse_stats.active_stats is None
+    assert inner.keywords["MATERIALPALETTE"]['blocks'] == 1
+    assert inner.keywords["MATERIALPALETTE"]['bytes'] == len(path.read_bytes())
+    assert json.loads(outer.to_json())['keywords'] == json.loads(inner.to_json())['keywords']
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter", "wce_import"))
+
+from eq_ascii_wld_parser import parse_property
+from parse_track import parse_track
+from wce_tokenizer import WCETokenizer
+
+TRACK = b"""TRACKDEFINITION "ELF_TRACKDEF"
+\tTAGINDEX 0
+\tNUMFRAMES 3
+\t\tFRAME 256 512 0 -256 0 0 0 0
+\t\tFRAME 256 0 128 0 2 0 0 0
+\t\tFRAME 128 0 0 64 0 0 3 4
+\tNUMLEGACYFRAMES 1
+\t\tLEGACYFRAME 256 300 0 0 1 0 0 0
+TRACKINSTANCE "ELF_TRACK"
+\tTAGINDEX 0
+\tSPRITE "ELF_TRACKDEF"
+\tSPRITEINDEX 0
+\tINTERPOLATE 0
+\tREVERSE 0
+\tSLEEP? 100
+"""
+
+def read_track(data):
+    r = WCETokenizer(data)
+    return parse_track(r, parse_property, "ELF", next(r))
+
+def test_frames_are_stored_as_arrays():
+    track_def = read_track(TRACK)['armature_tracks']["ELF_TRACK"]['definition']
+    np.testing.assert_array_equal(track_def['translations'], [(2, 0, -1), (0, 0.5, 0), (0, 0, 0.25)])
+    # A zero quaternion becomes (0, 1, 0, 0) as mathutils.Quaternion.normalize() makes it
+    np.testing.assert_allclose(track_def['rotations'], [(0, 1, 0, 0), (1, 0, 0, 0), (0, 0, 0.6, 0.8)])
+    assert track_def['translations'].dtype == track_def['rotations'].dtype == np.float64
+    assert track_def['xyz_scale'] == 128
+    np.testing.assert_array_equal(track_def['legacy_translations'], [(300 / 256, 0, 0)])
+
+def test_track_without_frames_has_empty_arrays():
+    data = TRACK.replace(b"NUMFRAMES 3", b"NUMFRAMES 0")
+    data = b"\n".join(line for line in data.split(b"\n") if not line.startswith(b"\t\tFRAME"))
+    track_def = read_track(data)['armature_tracks']["ELF_TRACK"]['definition']
+    assert track_def['translations'].shape == (0, 3)
+    assert track_def['rotations'].shape == (0, 4)
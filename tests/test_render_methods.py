@@ -0,0 +1,55 @@
+import os
+import sys
+
+# The parser modules import each other as top-level modules, as they do inside Blender
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+sys.path.insert(0, os.path.join(ADDON_DIR, "wce_import"))
+
+from render_methods import material_signature
+
+def texture(files, tag="ORC_SPRITE", animated=False, sleep=0):
+    return {
+        'frames': [{'tag': tag, 'frame_files': [dict(entry) for entry in files]}],
+        'animated': animated,
+        'sleep': sleep,
+    }
+
+def material(name, rendermethod="USERDEFINED_2", **values):
+    return dict({'name': name, 'rendermethod': rendermethod, 'tag_index': 0}, **values)
+
+def test_signature_ignores_per_name_properties(tmp_path):
+    files = [{'file': "orc.dds"}, {'type': "layer", 'file': "orc_layer.dds"}]
+    signature = material_signature(material("A_MDF"), texture(files, sleep=0), "USERDEFINED_2", str(tmp_path))
+    other = material_signature(material("B_MDF", tag_index=3, variation=1), texture(files, sleep=100), "USERDEFINED_2", str(tmp_path))
+    assert signature is not None and signature == other
+
+def test_signature_resolves_files_against_the_assets_folder(tmp_path):
+    relative = material_signature(material("A_MDF"), texture([{'file': "sub/../orc.dds"}]), "USERDEFINED_2", str(tmp_path))
+    direct = material_signature(material("A_MDF"), texture([{'file': "orc.dds"}]), "USERDEFINED_2", str(tmp_path))
+    elsewhere = material_signature(material("A_MDF"), texture([{'file': "orc.dds"}]), "USERDEFINED_2", str(tmp_path / "other"))
+    assert relative == direct
+    assert direct != elsewhere
+
+def test_signature_tells_node_tree_content_apart(tmp_path):
+    base = material_signature(material("A_MDF"), texture([{'file': "orc.dds"}]), "USERDEFINED_2", str(tmp_path))
+    variants = [
+        material_signature(material("A_MDF", "USERDEFINED_6"), texture([{'file': "orc.dds"}]), "USERDEFINED_6", str(tmp_path)),
+        material_signature(material("A_MDF"), texture([{'file': "elf.dds"}]), "USERDEFINED_2", str(tmp_path)),
+        material_signature(material("A_MDF"), texture([{'file': "orc.dds"}], tag="ELF_SPRITE"), "USERDEFINED_2", str(tmp_path)),
+        material_signature(material("A_MDF"), texture([{'file': "orc.dds"}], animated=True), "USERDEFINED_2", str(tmp_path)),
+        material_signature(material("A_MDF"), texture([{'file': "orc.dds", 'type': "tiled", 'scale': 2}]), "USERDEFINED_2", str(tmp_path)),
+    ]
+    assert len({base, *variants}) == len(variants) + 1
+
+def test_solid_fill_signature_includes_its_colors(tmp_path):
+    def signature(rgbpen, brightness=0.0):
+        mat_data = material("A_MDF", "SOLIDFILLAMBIENTGOURAUD1", rgbpen=rgbpen, brightness=brightness, scaledambient=0.75)
+        return material_signature(mat_data, {}, "SOLIDFILLAMBIENTGOURAUD1", str(tmp_path))
+    assert signature([0.5, 0.5, 0.5, 0.0]) == signature((0.5, 0.5, 0.5, 0.0))
+    assert signature([0.5, 0.5, 0.5, 0.0]) != signature([0.5, 0.5, 0.5, 0.0], 1.0)
+    assert signature([0.5, 0.5, 0.5, 0.0]) != signature([1.0, 0.5, 0.5, 0.0])
+
+def test_signature_refuses_unhashable_or_missing_texture_info(tmp_path):
+    assert material_signature(material("A_MDF"), None, "USERDEFINED_2", str(tmp_path)) is None
+    unhashable = texture([{'file': "orc.dds", 'params': [1, 2]}])
+    assert material_signature(material("A_MDF"), unhashable, "USERDEFINED_2", str(tmp_path)) is None
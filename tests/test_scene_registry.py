@@ -0,0 +1,63 @@
+import importlib.util
+import os
+
+import numpy as np
+
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+
+def load_scene_registry():
+    # create/ is a package of the add-on; scene_registry itself needs neither bpy nor its siblings
+    spec = importlib.util.spec_from_file_location("scene_registry", os.path.join(ADDON_DIR, "create", "scene_registry.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+scene_registry = load_scene_registry()
+
+def world_node(worldnode, normal, front_tree=0, back_tree=0):
+    return {'worldnode': worldnode, 'normal': normal, 'front_tree': front_tree, 'back_tree': back_tree}
+
+# 1 splits into 2 and 3, 3 into 4 and 5; 6 is not reachable from the root
+NODES = [
+    world_node(1, [0.0, 0.0, 2.0, 4.0], 2, 3),
+    world_node(2, [1.0, 0.0, 0.0, 0.0]),
+    world_node(3, [0.0, 3.0, 4.0, -5.0], 4, 5),
+    world_node(4, [0.0, 0.0, 0.0, 1.0]),
+    world_node(5, [1.0, 0.0, 0.0, 0.0]),
+    world_node(6, [1.0, 0.0, 0.0, 0.0]),
+]
+
+def test_index_world_tree_arrays():
+    world_tree = scene_registry.index_world_tree(NODES)
+    assert world_tree['parents'].tolist() == [-1, -1, 1, 1, 3, 3, -1]
+    assert world_tree['leaves'].tolist() == [False, False, True, False, True, True, True]
+    # Normals normalized and d negated; a zero normal stays zero
+    np.testing.assert_allclose(world_tree['planes'][1], [0.0, 0.0, 1.0, -4.0])
+    np.testing.assert_allclose(world_tree['planes'][3], [0.0, 0.6, 0.8, 5.0])
+    np.testing.assert_allclose(world_tree['planes'][4], [0.0, 0.0, 0.0, -1.0])
+
+def test_ancestor_ids_nearest_first_and_memoized():
+    world_tree = scene_registry.index_world_tree(NODES)
+    assert scene_registry.ancestor_ids(world_tree, 5) == (3, 1)
+    # The whole chain was filled in on the way back down
+    assert world_tree['ancestors'] == {1: (), 3: (1,), 5: (3, 1)}
+    assert scene_registry.ancestor_ids(world_tree, 4) == (3, 1)
+    assert scene_registry.ancestor_ids(world_tree, 1) == ()
+    assert scene_registry.ancestor_ids(world_tree, 6) == ()
+
+def test_ancestor_ids_reuses_known_chains():
+    world_tree = scene_registry.index_world_tree(NODES)
+    world_tree['ancestors'][3] = ("known",)
+    assert scene_registry.ancestor_ids(world_tree, 4) == (3, "known")
+
+def test_plane_distances_matches_per_point_dot_products():
+    world_tree = scene_registry.index_world_tree(NODES)
+    planes = world_tree['planes'][[1, 3]]
+    points = np.array([[0.0, 0.0, 0.0], [1.0, 2.0, 3.0], [-4.0, 5.0, -6.0]])
+    distances = scene_registry.plane_distances(planes, points)
+    assert distances.shape == (2, 3)
+    expected = [[plane[:3] @ point - plane[3] for point in points] for plane in planes]
+    np.testing.assert_allclose(distances, expected)
+    # NORMALABCD 0 0 2 4 keeps its d as the normal is normalized: the plane z = -4
+    np.testing.assert_allclose(scene_registry.plane_distances(planes[:1], [[7.0, 1.0, -4.0], [0.0, 0.0, -1.0]]), [[0.0, 3.0]])
+    assert scene_registry.plane_distances(planes, np.empty((0, 3))).shape == (2, 0)
@@ -0,0 +1,49 @@
+import os
+import shlex
+import sys
+
+import numpy as np
+import pytest
+
+# The parser modules import each other as top-level modules, as they do inside Blender
+ADDON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "wce_importer_exporter")
+sys.path.insert(0, os.path.join(ADDON_DIR, "wce_import"))
+
+from wce_tokenizer import WCETokenizer, split_line
+
+@pytest.mark.parametrize("line", [
+    'VXYZ 1.0 -2.5 3e+30',
+    '\tSPRITE "ORC_HS_DEF"',
+    'USERDATA ""',
+    'FILE "MY TEXTURE.BMP"',
+    'FRAME "A" "B C" 1',
+    'LOCATION? NULL NULL NULL',
+    '   ',
+    'NAME "back\\\\slash"',
+    "NAME 'single quoted'",
+    'TAG abc"def ghi"',
+    'TAG "abc"def',
+])
+def test_split_line_matches_shlex(line):
+    assert split_line(line) == shlex.split(line)
+
+VERTEX_LINES = b"\n".join(b"\t\tVXYZ %d.5 %d %d" % (i, -i, i * 2) for i in range(5)) + b"\n"
+
+def test_read_records_fast_and_slow_paths_agree():
+    fast = WCETokenizer(VERTEX_LINES + b"NEXT 1\n")
+    # A blank line in the run forces the line by line path
+    slow = WCETokenizer(VERTEX_LINES.replace(b"\n", b"\n\n", 1) + b"NEXT 1\n")
+    fast_values = fast.read_block("VXYZ", 3, 5)
+    slow_values = slow.read_block("VXYZ", 3, 5)
+    np.testing.assert_array_equal(fast_values, slow_values)
+    assert fast_values.shape == (5, 3)
+    assert next(fast) == next(slow) == ["NEXT", "1"]
+
+def test_read_records_interleaved_layout_with_comments():
+    data = b"".join(b"UV %d 0 // uv\nNORMAL 0 0 %d\n" % (i, i) for i in range(3))
+    values = WCETokenizer(data).read_records((("UV", 2), ("NORMAL", 3)), 3)
+    np.testing.assert_array_equal(values, [[i, 0, 0, 0, i] for i in range(3)])
+
+def test_read_records_rejects_wrong_keyword():
+    with pytest.raises(Exception, match="expected VXYZ"):
+        WCETokenizer(VERTEX_LINES.replace(b"VXYZ 2", b"VXYX 2")).read_block("VXYZ", 3, 5)
@@ -29,7 +29,7 @@ from .wce_export import master_export  # Assuming 'master_export.py' is in the e
 from .passable_flag_editor import register_passable_editor, unregister_passable_editor
 from .ui_world_tools import register as register_world_tools, unregister as unregister_world_tools
 
-from .update_handler import update_animated_texture_nodes
+from .update_handler import update_animated_texture_nodes, rebuild_animated_textures
 
 bpy.types.Scene.export_folder_path = bpy.props.StringProperty(name="Export Folder", default="")
 
@@ -37,6 +37,25 @@ bpy.types.Scene.export_folder_path = bpy.props.StringProperty(name="Export Folde
 class WCEImporterPreferences(bpy.types.AddonPreferences):
     bl_idname = __name__
 
+    use_parse_cache: bpy.props.BoolProperty(
+        name="Cache Parsed Files",
+        description="Store parsed .wce files so re-importing an unchanged model skips parsing",
+        default=True,
+    )
+    parse_cache_size: bpy.props.IntProperty(
+        name="Parse Cache Size (MB)",
+        description="Least recently used entries are removed once the cache grows past this size",
+        default=512,
+        min=16,
+    )
+    parse_workers: bpy.props.IntProperty(
+        name="Parse Workers",
+        description="Processes used to parse the INCLUDE files of an import in parallel; 1 parses them one after another",
+        default=1,
+        min=1,
+        max=64,
+    )
+
     def draw(self, context):
         layout = self.layout
         col = layout.column()
@@ -45,11 +64,55 @@ class WCEImporterPreferences(bpy.types.AddonPreferences):
         quail_version = ".".join(map(str, bl_info["Quail"]))
         col.label(text=f"Compatible Quail Version: {quail_version}")
 
+        col.separator()
+        col.prop(self, "use_parse_cache")
+        row = col.row()
+        row.enabled = self.use_parse_cache
+        row.prop(self, "parse_cache_size")
+        col.operator("import_wce.clear_parse_cache")
+        col.prop(self, "parse_workers")
+        col.operator("import_wce.build_node_group_library")
+
+def get_preferences(context):
+    return context.preferences.addons[__name__].preferences
+
+def configure_parse_cache(context):
+    prefs = get_preferences(context)
+    return import_wce_file.configure_parse_cache(prefs.use_parse_cache, prefs.parse_cache_size)
+
+def configure_parse_workers(context):
+    import_wce_file.configure_parse_workers(get_preferences(context).parse_workers)
+
+# Operator to delete every parse cache entry
+class ClearParseCacheOperator(bpy.types.Operator):
+    bl_idname = "import_wce.clear_parse_cache"
+    bl_label = "Clear Parse Cache"
+    bl_description = "Delete all cached parse results so the next import re-reads every .wce file"
+
+    def execute(self, context):
+        parse_cache = configure_parse_cache(context)
+        removed = parse_cache.clear()
+        self.report({'INFO'}, f"Removed {removed} parse cache entries")
+        return {'FINISHED'}
+
+# Operator to write every render method's node group to the node group library
+class BuildNodeGroupLibraryOperator(bpy.types.Operator):
+    bl_idname = "import_wce.build_node_group_library"
+    bl_label = "Build Node Group Library"
+    bl_description = "Build the node group of every render method once and save them, so imports append them instead of building them"
+
+    def execute(self, context):
+        from .wce_import.material_creator import build_node_group_library
+        written = build_node_group_library()
+        self.report({'INFO'}, f"Wrote {written} node groups to the node group library")
+        return {'FINISHED'}
+
 # Property Group for Model Items
 class ModelItem(bpy.types.PropertyGroup):
     name: bpy.props.StringProperty(name="Model Name")
     selected: bpy.props.BoolProperty(name="Select", default=False)
     include_line: bpy.props.StringProperty(name="Include Line")
+    summary: bpy.props.StringProperty(name="Summary")
 
 # Load models from file
 def load_models_from_file(filepath):
@@ -66,6 +129,17 @@ def load_models_from_file(filepath):
         print(f"Failed to load models from file: {e}")
     return models
 
+# Short "(1234v 567f 12trk)" label of what an INCLUDE contains
+def format_model_summary(counts):
+    parts = []
+    if counts.get('vertices'):
+        parts.append(f"{counts['vertices']}v")
+    if counts.get('faces'):
+        parts.append(f"{counts['faces']}f")
+    if counts.get('TRACKDEFINITION'):
+        parts.append(f"{counts['TRACKDEFINITION']}trk")
+    return f"({' '.join(parts)})" if parts else ""
+
 # Import Dialog Operator
 class WCEImportDialogOperator(bpy.types.Operator):
     bl_idname = "import_wce.select_models"
@@ -73,14 +147,17 @@ class WCEImportDialogOperator(bpy.types.Operator):
     filepath: bpy.props.StringProperty(subtype="FILE_PATH")
 
     def invoke(self, context, event):
+        configure_parse_cache(context)
         models = load_models_from_file(self.filepath)
         context.scene.wce_model_list.clear()
+        file_dir = os.path.dirname(self.filepath)
 
         for model_name, include_line in models:
             item = context.scene.wce_model_list.add()
             item.name = model_name
             item.selected = False
             item.include_line = include_line  # Store the full INCLUDE line
+            item.summary = format_model_summary(import_wce_file.summarize_include(include_line, file_dir))
 
         num_items = len(context.scene.wce_model_list)
 
@@ -109,13 +186,122 @@ class WCEImportDialogOperator(bpy.types.Operator):
         for i, item in enumerate(context.scene.wce_model_list):
             if i % self.column_count == 0:  # Create a new column every N items
                 col = row.column()
-            col.prop(item, "selected", text=item.name)
+            col.prop(item, "selected", text=f"{item.name} {item.summary}" if item.summary else item.name)
 
     def execute(self, context):
-        selected_models = [item.include_line for item in context.scene.wce_model_list if item.selected]
-        for include_line in selected_models:
-            import_wce_file.process_include_file(include_line, os.path.dirname(self.filepath), self.filepath, {})
-        self.report({'INFO'}, f"Imported models: {', '.join(selected_models)}")
+        # The selected models are parsed in the background and built by the modal import operator
+        bpy.ops.import_wce.pipelined_import('INVOKE_DEFAULT', filepath=self.filepath)
+        return {'FINISHED'}
+
+# Events a running import passes on, so the viewport can still be navigated. Everything else, e.g.
+# deleting objects or materials the import session still refers to, waits until it is done
+IMPORT_NAVIGATION_EVENTS = {
+    'MOUSEMOVE', 'INBETWEEN_MOUSEMOVE', 'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE',
+    'WHEELINMOUSE', 'WHEELOUTMOUSE', 'TRACKPADPAN', 'TRACKPADZOOM', 'MOUSEROTATE', 'MOUSESMARTZOOM',
+    'NDOF_MOTION', 'NUMPAD_0', 'NUMPAD_1', 'NUMPAD_2', 'NUMPAD_3', 'NUMPAD_4', 'NUMPAD_5',
+    'NUMPAD_6', 'NUMPAD_7', 'NUMPAD_8', 'NUMPAD_9', 'NUMPAD_PERIOD', 'NUMPAD_PLUS', 'NUMPAD_MINUS',
+    'WINDOW_DEACTIVATE',
+}
+
+# Running pipelined imports, each {'pipeline', 'timer', 'aborted'}
+running_imports = []
+
+@bpy.app.handlers.persistent
+def abort_running_imports(*args):
+    """
+    undo_pre/redo_pre/load_pre handler: the undo step or file load is about to
+    free what the running imports' sessions refer to, so drop the sessions
+    without touching them and stop the imports.
+    """
+    wm = bpy.context.window_manager
+    for job in running_imports:
+        import_wce_file.abort_pipelined_import(job['pipeline'])
+        job['aborted'] = True
+        if wm:
+            wm.event_timer_remove(job['timer'])
+            wm.progress_end()
+        if bpy.context.workspace:
+            bpy.context.workspace.status_text_set(None)
+    running_imports.clear()
+
+# Modal operator importing the selected models: workers parse the INCLUDE files
+# ahead while each timer tick builds the next parsed model on the main thread
+class WCEPipelinedImportOperator(bpy.types.Operator):
+    bl_idname = "import_wce.pipelined_import"
+    bl_label = "Import WCE Models"
+    bl_description = "Import the selected models, parsing them in the background (Esc to cancel)"
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+
+    _timer = None
+    _pipeline = None
+    _job = None
+
+    def invoke(self, context, event):
+        configure_parse_cache(context)
+        configure_parse_workers(context)
+        self._selected_models = [item.include_line for item in context.scene.wce_model_list if item.selected]
+        if not self._selected_models:
+            self.report({'WARNING'}, "No models selected")
+            return {'CANCELLED'}
+
+        # One session for the whole selection: shared caches, a collection per model, one undo step
+        self._pipeline = import_wce_file.start_pipelined_import(self.filepath, self._selected_models, get_preferences(context).parse_workers)
+
+        wm = context.window_manager
+        wm.progress_begin(0, len(self._selected_models))
+        self._timer = wm.event_timer_add(0.05, window=context.window)
+        self._job = {'pipeline': self._pipeline, 'timer': self._timer, 'aborted': False}
+        running_imports.append(self._job)
+        wm.modal_handler_add(self)
+        self.update_status(context)
+        return {'RUNNING_MODAL'}
+
+    def update_status(self, context):
+        built = self._pipeline['built']
+        context.window_manager.progress_update(built)
+        if context.workspace:
+            context.workspace.status_text_set(f"Importing WCE models: {built}/{len(self._selected_models)} built (Esc to cancel)")
+
+    def finish(self, context):
+        running_imports.remove(self._job)
+        wm = context.window_manager
+        wm.event_timer_remove(self._timer)
+        wm.progress_end()
+        if context.workspace:
+            context.workspace.status_text_set(None)
+        import_wce_file.finish_pipelined_import(self._pipeline)
+        return self._selected_models[:self._pipeline['built']]
+
+    def modal(self, context, event):
+        if self._job['aborted']:
+            built_models = self._selected_models[:self._pipeline['built']]
+            self.report({'WARNING'}, f"Import stopped by undo or file load, imported models: {', '.join(built_models)}")
+            return {'CANCELLED'}
+
+        if event.type == 'ESC':
+            built_models = self.finish(context)
+            self.report({'WARNING'}, f"Import cancelled, imported models: {', '.join(built_models)}")
+            return {'CANCELLED'}
+
+        if event.type in IMPORT_NAVIGATION_EVENTS:
+            return {'PASS_THROUGH'}
+
+        if event.type != 'TIMER':
+            return {'RUNNING_MODAL'}
+
+        try:
+            done = import_wce_file.step_pipelined_import(self._pipeline)
+        except Exception as e:
+            self.finish(context)
+            self.report({'ERROR'}, f"Import failed: {e}")
+            return {'CANCELLED'}
+
+        self.update_status(context)
+        if not done:
+            return {'RUNNING_MODAL'}
+
+        built_models = self.finish(context)
+        self.report({'INFO'}, f"Imported models: {', '.join(built_models)}")
         return {'FINISHED'}
 
 # Operator to Open File Selection for Importing
@@ -257,12 +443,15 @@ class ModelExportItem(bpy.types.PropertyGroup):
 # Register and Unregister
 def register():
     bpy.utils.register_class(WCEImporterPreferences)
+    bpy.utils.register_class(ClearParseCacheOperator)
+    bpy.utils.register_class(BuildNodeGroupLibraryOperator)
     bpy.utils.register_class(ModelItem)
     bpy.utils.register_class(ModelExportItem)
     bpy.types.Scene.wce_model_list = bpy.props.CollectionProperty(type=ModelItem)
     bpy.types.Scene.wce_export_list = bpy.props.CollectionProperty(type=ModelExportItem)
     bpy.utils.register_class(ImportWCEFileOperator)
     bpy.utils.register_class(WCEImportDialogOperator)
+    bpy.utils.register_class(WCEPipelinedImportOperator)
     bpy.utils.register_class(ImportWCEPanel)
     bpy.utils.register_class(SelectExportFolderOperator)
     bpy.utils.register_class(WCEExporterDialogOperator)
@@ -272,15 +461,27 @@ def register():
 
     if update_animated_texture_nodes not in bpy.app.handlers.frame_change_post:
         bpy.app.handlers.frame_change_post.append(update_animated_texture_nodes)
+    # Node and image references do not survive loading a file, undo or redo
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if rebuild_animated_textures not in handlers:
+            handlers.append(rebuild_animated_textures)
+    # bpy.data can't be read while registering, so index the open file right after
+    bpy.app.timers.register(rebuild_animated_textures, first_interval=0)
+    for handlers in (bpy.app.handlers.undo_pre, bpy.app.handlers.redo_pre, bpy.app.handlers.load_pre):
+        if abort_running_imports not in handlers:
+            handlers.append(abort_running_imports)
 
 def unregister():
     bpy.utils.unregister_class(WCEImporterPreferences)
+    bpy.utils.unregister_class(ClearParseCacheOperator)
+    bpy.utils.unregister_class(BuildNodeGroupLibraryOperator)
     bpy.utils.unregister_class(ModelItem)
     bpy.utils.unregister_class(ModelExportItem)
     del bpy.types.Scene.wce_model_list
     del bpy.types.Scene.wce_export_list
     bpy.utils.unregister_class(ImportWCEFileOperator)
     bpy.utils.unregister_class(WCEImportDialogOperator)
+    bpy.utils.unregister_class(WCEPipelinedImportOperator)
     bpy.utils.unregister_class(ImportWCEPanel)
     bpy.utils.unregister_class(SelectExportFolderOperator)
     bpy.utils.unregister_class(WCEExporterDialogOperator)
@@ -290,6 +491,12 @@ def unregister():
 
     if update_animated_texture_nodes in bpy.app.handlers.frame_change_post:
         bpy.app.handlers.frame_change_post.remove(update_animated_texture_nodes)
+    for handlers in (bpy.app.handlers.load_post, bpy.app.handlers.undo_post, bpy.app.handlers.redo_post):
+        if rebuild_animated_textures in handlers:
+            handlers.remove(rebuild_animated_textures)
+    for handlers in (bpy.app.handlers.undo_pre, bpy.app.handlers.redo_pre, bpy.app.handlers.load_pre):
+        if abort_running_imports in handlers:
+            handlers.remove(abort_running_imports)
 
 if __name__ == "__main__":
     register()
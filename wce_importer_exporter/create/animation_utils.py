@@ -0,0 +1,111 @@
+import numpy as np
+try:
+    import bpy
+except ImportError:  # The NumPy helpers are usable without Blender, e.g. from the tests
+    bpy = None
+
+LINEAR_INTERPOLATION = bpy.types.Keyframe.bl_rna.properties['interpolation'].enum_items['LINEAR'].value if bpy else None
+
+def frame_arrays(track):
+    """Returns the translations (N, 3) and normalized (w, x, y, z) rotations (N, 4) parse_track stored for a track's frames."""
+    return track['translations'], track['rotations']
+
+def quaternions_to_matrices(quaternions):
+    """Converts (N, 4) unit quaternions to (N, 3, 3) rotation matrices."""
+    w, x, y, z = quaternions.T
+    matrices = np.empty((len(quaternions), 3, 3))
+    matrices[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    matrices[:, 0, 1] = 2 * (x * y - w * z)
+    matrices[:, 0, 2] = 2 * (x * z + w * y)
+    matrices[:, 1, 0] = 2 * (x * y + w * z)
+    matrices[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    matrices[:, 1, 2] = 2 * (y * z - w * x)
+    matrices[:, 2, 0] = 2 * (x * z - w * y)
+    matrices[:, 2, 1] = 2 * (y * z + w * x)
+    matrices[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return matrices
+
+def matrices_to_quaternions(matrices):
+    """
+    Converts (N, 3, 3) matrices to (N, 4) quaternions the way
+    Matrix.to_quaternion() does: columns are normalized first, the branch
+    is chosen as Blender chooses it and the result has a non-negative w.
+    """
+    lengths = np.linalg.norm(matrices, axis=1, keepdims=True)
+    m = np.divide(matrices, lengths, out=np.zeros_like(matrices), where=lengths != 0)
+    m00, m01, m02 = m[:, 0, 0], m[:, 0, 1], m[:, 0, 2]
+    m10, m11, m12 = m[:, 1, 0], m[:, 1, 1], m[:, 1, 2]
+    m20, m21, m22 = m[:, 2, 0], m[:, 2, 1], m[:, 2, 2]
+    trace = m00 + m11 + m22
+
+    # Each branch solves for one of w, x, y and z and divides by it
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = 2 * np.sqrt(np.maximum(np.stack((1 + trace, 1 + m00 - m11 - m22, 1 - m00 + m11 - m22, 1 - m00 - m11 + m22)), 0))
+        candidates = np.stack((
+            np.stack((s[0] / 4, (m21 - m12) / s[0], (m02 - m20) / s[0], (m10 - m01) / s[0]), axis=1),
+            np.stack(((m21 - m12) / s[1], s[1] / 4, (m01 + m10) / s[1], (m02 + m20) / s[1]), axis=1),
+            np.stack(((m02 - m20) / s[2], (m01 + m10) / s[2], s[2] / 4, (m12 + m21) / s[2]), axis=1),
+            np.stack(((m10 - m01) / s[3], (m02 + m20) / s[3], (m12 + m21) / s[3], s[3] / 4), axis=1),
+        ))
+    # Blender's mat3_normalized_to_quat_fast() branch choice, which also decides
+    # the sign of half turns (w == 0): the component it solves for is positive
+    branch = np.where(m22 < 0, np.where(m00 > m11, 1, 2), np.where(m00 < -m11, 3, 0))
+    quaternions = candidates[branch, np.arange(len(m))]
+
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    quaternions[quaternions[:, 0] < 0] *= -1
+    return quaternions
+
+def pose_keyframe_values(translations, rotations, scale_factor, base_matrix=None):
+    """
+    Returns (N, 10) location, rotation_quaternion and scale values of the
+    bone matrices translation @ rotation @ scale @ base_matrix for every
+    frame at once. base_matrix is an optional 4x4 mathutils.Matrix.
+    """
+    values = np.empty((len(translations), 10))
+    if base_matrix is None:
+        values[:, 0:3] = translations
+        # A uniform scale does not change the rotation, only its sign is made canonical
+        values[:, 3:7] = rotations * np.where(rotations[:, :1] < 0, -1.0, 1.0)
+        # With w == 0 the sign depends on which component Matrix.to_quaternion() solves for
+        half_turns = rotations[:, 0] == 0
+        if half_turns.any():
+            values[half_turns, 3:7] = matrices_to_quaternions(quaternions_to_matrices(rotations[half_turns]))
+    else:
+        base = np.array(base_matrix, dtype=np.float64)
+        rotation_matrices = quaternions_to_matrices(rotations) * scale_factor
+        values[:, 0:3] = translations + rotation_matrices @ base[:3, 3]
+        values[:, 3:7] = matrices_to_quaternions(rotation_matrices @ base[:3, :3])
+    values[:, 7:10] = scale_factor
+    return values
+
+def set_keyframes(fcurve, frames, values):
+    """Replaces the keyframes of fcurve with linear keys at frames, written in bulk."""
+    keyframe_points = fcurve.keyframe_points
+    keyframe_points.clear()
+    keyframe_points.add(len(frames))
+    keyframe_points.foreach_set("co", np.column_stack((frames, values)).astype(np.float32).ravel())
+    keyframe_points.foreach_set("interpolation", np.full(len(frames), LINEAR_INTERPOLATION, dtype=np.int32))
+    fcurve.update()
+
+def merge_keyframes(keys):
+    """
+    Combines (frames, values) pairs written to the same channels into one
+    sorted set, later pairs replacing keys on the same frame like
+    keyframe_points.insert() does.
+    """
+    if len(keys) == 1:
+        frames, values = keys[0]
+    else:
+        frames = np.concatenate([frames for frames, _ in keys])
+        values = np.concatenate([values for _, values in keys])
+    # np.unique keeps the first occurrence, so search the reversed arrays for the last one
+    frames, last = np.unique(frames[::-1], return_index=True)
+    return frames, values[::-1][last]
+
+def write_pose_fcurves(bone_fcurves, keys):
+    """Writes merged (N, 10) keys into a bone's location, rotation_quaternion and scale F-curves."""
+    frames, values = merge_keyframes(keys)
+    channels = bone_fcurves['location'] + bone_fcurves['rotation_quaternion'] + bone_fcurves['scale']
+    for column, fcurve in enumerate(channels):
+        set_keyframes(fcurve, frames, values[:, column])
@@ -1,5 +1,7 @@
 import bpy
 import mathutils
+import numpy as np
+from .animation_utils import frame_arrays, pose_keyframe_values, write_pose_fcurves
 
 fallback_names = {
     "HUM": "ELM", "HUF": "ELF", "BAM": "ELM", "BAF": "ELF", "ERM": "ELM", "ERF": "ELF",
@@ -22,6 +24,52 @@ fallback_names = {
     "SHN": "SHM", "SUN": "SNN", "FAN": "GNN", "CPM": "GNN", "SHF": "SHM", "MTC": "LIM" 
 }
 
+class BoneIndex:
+    """
+    Name lookups over an armature's bones for matching tracks to bones:
+    bone names with '_DAG' stripped and with '_ANIDAG' stripped, each
+    mapping to the first bone in armature order that has that name.
+    """
+    def __init__(self, armature_obj):
+        self.order = {}
+        self.by_dag_name = {}
+        self.by_anidag_name = {}
+        for bone in armature_obj.data.bones:
+            self.add(bone.name)
+
+    def add(self, bone_name):
+        self.order[bone_name] = len(self.order)
+        self.by_dag_name.setdefault(bone_name.replace('_DAG', ''), bone_name)
+        self.by_anidag_name.setdefault(bone_name.replace('_ANIDAG', ''), bone_name)
+
+    def match(self, stripped_name, modified_name):
+        """
+        Returns (bone name, matched track name) for the first bone in
+        armature order whose stripped name equals the track name or its
+        race-substituted form, or (None, stripped_name).
+        """
+        candidates = []
+        for priority, (lookup, name) in enumerate(((self.by_dag_name, stripped_name), (self.by_dag_name, modified_name), (self.by_anidag_name, stripped_name))):
+            bone_name = lookup.get(name)
+            if bone_name is not None:
+                candidates.append((self.order[bone_name], priority, bone_name, name))
+        if not candidates:
+            return None, stripped_name
+        _, _, bone_name, name = min(candidates)
+        return bone_name, name
+
+def create_anidag_bones(armature_obj, new_bones):
+    """Adds the animation-only '_ANIDAG' bones in one edit mode session."""
+    bpy.ops.object.mode_set(mode='EDIT')
+    edit_bones = armature_obj.data.edit_bones
+    for anim_bone_name, parent_bone_name in new_bones:
+        parent_bone = edit_bones[parent_bone_name]
+        anim_bone = edit_bones.new(anim_bone_name)
+        anim_bone.head = parent_bone.tail
+        anim_bone.tail = anim_bone.head + mathutils.Vector((0, 0.1, 0))
+        anim_bone.parent = parent_bone
+    bpy.ops.object.mode_set(mode='OBJECT')
+
 def create_animation(armature_obj, track_definitions, armature_data, model_prefix):
     # Get the scene's frame rate
     frame_rate = bpy.context.scene.render.fps
@@ -36,12 +84,59 @@ def create_animation(armature_obj, track_definitions, armature_data, model_prefi
         action_name = f"{animation_key}_{model_name}"
 
         if action_name not in animations_by_key:
-            animations_by_key[action_name] = []
+            animations_by_key[action_name] = (animation_key, model_name, [])
         
-        animations_by_key[action_name].append(animation_data)
+        animations_by_key[action_name][2].append(animation_data)
+
+    # Match every track to its bone first, so missing bones can be created in one go
+    bone_index = BoneIndex(armature_obj)
+    first_bone_name = armature_obj.data.bones[0].name if armature_obj.data.bones else None
+    new_bones = []
+    matched_tracks = {}
+
+    for action_name, (animation_key, model_name, tracks) in animations_by_key.items():
+        matched = matched_tracks[action_name] = []
+        for track_index, track_data in enumerate(tracks):
+            track_instance_name = track_data['instance']['name']
+
+            # Strip the animation prefix and '_TRACK' from the track instance name
+            stripped_track_instance_name = track_instance_name[len(animation_key):].replace('_TRACK', '')
+
+            # Check if the track contains the model name
+            if model_prefix not in stripped_track_instance_name:
+                fallback_name = fallback_names.get(model_prefix, None)
+                
+                if fallback_name and fallback_name in stripped_track_instance_name:
+                    modified_track_instance_name = stripped_track_instance_name.replace(fallback_name, model_prefix)
+                else:
+                    modified_track_instance_name = model_name + stripped_track_instance_name
+            else:
+                modified_track_instance_name = stripped_track_instance_name
+            
+            if model_name == "WOE":
+                modified_track_instance_name = stripped_track_instance_name.replace("WOE", "WEL")
+
+            # Force matching the first track to the first bone in the armature
+            if track_index == 0:
+                bone_name = first_bone_name
+            else:
+                bone_name, stripped_track_instance_name = bone_index.match(stripped_track_instance_name, modified_track_instance_name)
+
+            if not bone_name and track_index != 0:  # Only create new bone if it's not the first track
+                # Plan a new animation-only bone with "_ANIDAG" under the track's parent bone
+                parent_bone_name = stripped_track_instance_name[:-1] + '_DAG'
+                if parent_bone_name in bone_index.order:
+                    bone_name = f"{stripped_track_instance_name}_ANIDAG"
+                    new_bones.append((bone_name, parent_bone_name))
+                    bone_index.add(bone_name)
+
+            matched.append((track_data, bone_name))
+
+    if new_bones:
+        create_anidag_bones(armature_obj, new_bones)
 
     # Create actions for each animation key
-    for action_name, tracks in animations_by_key.items():
+    for action_name, matched in matched_tracks.items():
         action = bpy.data.actions.new(name=action_name)
         
         # Assign the action to the armature to ensure it has a user
@@ -60,12 +155,13 @@ def create_animation(armature_obj, track_definitions, armature_data, model_prefi
         nla_strip.name = action_name
 
         fcurves = {}
+        # (frames, values) pairs per bone, written once every track of the action is read
+        bone_keys = {}
 
         # Go through each track in the animation data
-        for track_index, track_data in enumerate(tracks):
+        for track_data, bone_name in matched:
             track = track_data['definition']
             track_instance = track_data['instance']
-            track_instance_name = track_instance['name']
             sleep = track_instance.get('sleep', None)
 
             # Determine frames_per_sleep only if sleep is not None
@@ -75,66 +171,6 @@ def create_animation(armature_obj, track_definitions, armature_data, model_prefi
 
             current_frame = 1
 
-            # Strip the animation prefix and '_TRACK' from the track instance name
-            stripped_track_instance_name = track_instance_name[len(animation_key):].replace('_TRACK', '')
-
-            # Check if the track contains the model name
-            if model_prefix not in stripped_track_instance_name:
-                fallback_name = fallback_names.get(model_prefix, None)
-                
-                if fallback_name and fallback_name in stripped_track_instance_name:
-                    modified_track_instance_name = stripped_track_instance_name.replace(fallback_name, model_prefix)
-                else:
-                    modified_track_instance_name = model_name + stripped_track_instance_name
-            else:
-                modified_track_instance_name = stripped_track_instance_name
-            
-            if model_name == "WOE":
-                modified_track_instance_name = stripped_track_instance_name.replace("WOE", "WEL")
-
-            # Identify which bone this track belongs to
-            bone_name = None
-
-            # Force matching the first track to the first bone in the armature
-            if track_index == 0:
-                first_bone = armature_obj.pose.bones[0]
-                bone_name = first_bone.name
-            else:
-                for bone in armature_obj.pose.bones:
-                    stripped_bone_name = bone.name.replace('_DAG', '')
-
-                    if stripped_bone_name == stripped_track_instance_name:
-                        bone_name = bone.name
-                        break
-                    elif stripped_bone_name == modified_track_instance_name:
-                        bone_name = bone.name
-                        stripped_track_instance_name = modified_track_instance_name
-                        break
-                    elif bone.name.replace('_ANIDAG', '') == stripped_track_instance_name:
-                        bone_name = bone.name
-                        break
-
-            if not bone_name and track_index != 0:  # Only create new bone if it's not the first track
-                # Create new animation-only bone with "_ANIDAG"
-                bpy.ops.object.mode_set(mode='EDIT')
-                parent_bone_name = stripped_track_instance_name[:-1] + '_DAG'
-                parent_bone = armature_obj.data.edit_bones.get(parent_bone_name)
-
-                if parent_bone:
-                    anim_bone_name = f"{stripped_track_instance_name}_ANIDAG"
-                    anim_bone = armature_obj.data.edit_bones.new(anim_bone_name)
-                    anim_bone.head = parent_bone.tail
-                    anim_bone.tail = anim_bone.head + mathutils.Vector((0, 0.1, 0))
-                    anim_bone.parent = parent_bone
-                    bpy.ops.object.mode_set(mode='OBJECT')
-
-                    # After creating the animation bone, retry matching
-                    for bone in armature_obj.pose.bones:
-                        stripped_bone_name = bone.name.replace('_ANIDAG', '')
-                        if stripped_bone_name == stripped_track_instance_name:
-                            bone_name = bone.name
-                            break
-
             if bone_name:
                 if bone_name not in fcurves:
                     fcurves[bone_name] = {
@@ -150,38 +186,15 @@ def create_animation(armature_obj, track_definitions, armature_data, model_prefi
                     for i in range(4):
                         fcurves[bone_name]['rotation_quaternion'].append(action.fcurves.new(data_path=f'pose.bones["{bone_name}"].rotation_quaternion', index=i))
 
-                for frame_index, frame in enumerate(track['frames']):
-                    location = frame.get('translation', [0, 0, 0])
-                    frame_rotation = mathutils.Quaternion(frame.get('rotation', [1, 0, 0, 0]))
-                    xyz_scale = track.get('xyz_scale', 256)
-                    scale_factor = xyz_scale / 256.0
-
-                    scale_matrix = mathutils.Matrix.Scale(scale_factor, 4)
-                    rotation_matrix = frame_rotation.to_matrix().to_4x4()
-                    translation_matrix = mathutils.Matrix.Translation(location)
-
-                    bone_matrix = translation_matrix @ rotation_matrix @ scale_matrix
-
-                    translation = bone_matrix.to_translation()
-                    rotation = bone_matrix.to_quaternion()
-                    scale = [scale_factor] * 3
-
-                    for i, value in enumerate(translation):
-                        fcurve = fcurves[bone_name]['location'][i]
-                        kf = fcurve.keyframe_points.insert(current_frame, value)
-                        kf.interpolation = 'LINEAR'
-
-                    for i, value in enumerate(rotation):
-                        fcurve = fcurves[bone_name]['rotation_quaternion'][i]
-                        kf = fcurve.keyframe_points.insert(current_frame, value)
-                        kf.interpolation = 'LINEAR'
-
-                    for i, value in enumerate(scale):
-                        fcurve = fcurves[bone_name]['scale'][i]
-                        kf = fcurve.keyframe_points.insert(current_frame, value)
-                        kf.interpolation = 'LINEAR'
+                # Translate, rotate and scale every frame of the track at once
+                translations, rotations = frame_arrays(track)
+                scale_factor = track.get('xyz_scale', 256) / 256.0
+                frames = current_frame + np.arange(len(translations)) * frames_per_sleep
+                values = pose_keyframe_values(translations, rotations, scale_factor)
+                bone_keys.setdefault(bone_name, []).append((frames, values))
 
-                    current_frame += frames_per_sleep
+        for bone_name, keys in bone_keys.items():
+            write_pose_fcurves(fcurves[bone_name], keys)
 
         # Add custom properties to the NLA strip
         action["TAGINDEX"] = track_instance.get('tag_index', 0)
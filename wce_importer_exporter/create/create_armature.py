@@ -3,25 +3,24 @@ import mathutils
 from .create_mesh_and_bounding_shapes import create_bounding_sphere
 
 def create_armature(armature_data, armature_tracks, parent_obj):
-    bpy.context.view_layer.objects.active = parent_obj
-
-    bpy.ops.object.mode_set(mode='OBJECT')
-    bpy.ops.object.select_all(action='DESELECT')
-    bpy.ops.object.select_pattern(pattern=parent_obj.name)
-
-    bpy.ops.object.armature_add(enter_editmode=True)
-    armature_obj = bpy.context.object
-    armature_obj.name = armature_data['name']
-    armature = armature_obj.data
-    armature.name = armature_data['name']
+    # Build the armature through the data API; only the bone edits need edit mode
+    armature = bpy.data.armatures.new(armature_data['name'])
+    armature_obj = bpy.data.objects.new(armature_data['name'], armature)
+    bpy.context.collection.objects.link(armature_obj)
     armature_obj.parent = parent_obj
 
-    armature.edit_bones.remove(armature.edit_bones[0])
-
     # Extract the bounding_radius and calculate the tail length
     bounding_radius = armature_data.get('bounding_radius', 1.0)  # Default to 1.0 if bounding_radius is not provided
     tail_length = round(bounding_radius / 10, 2)  # Calculate tail length based on bounding_radius
 
+    view_layer = bpy.context.view_layer
+    if view_layer.objects.active and view_layer.objects.active.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    view_layer.objects.active = armature_obj
+
+    # One edit mode session creates every bone and its parenting
+    bpy.ops.object.mode_set(mode='EDIT')
+
     bone_map = {}
     cumulative_matrices = {}
     for index, bone in enumerate(armature_data['bones']):
@@ -34,8 +33,6 @@ def create_armature(armature_data, armature_tracks, parent_obj):
 
         bone_map[index] = bone_bpy
 
-    bpy.ops.object.mode_set(mode='EDIT')
-
     for parent_index, child_indices in armature_data['relationships']:
         parent_bone = bone_map.get(parent_index)
         if not parent_bone:
@@ -45,7 +42,8 @@ def create_armature(armature_data, armature_tracks, parent_obj):
             if child_bone:
                 child_bone.parent = parent_bone
 
-                cumulative_matrices[child_bone.name] = child_bone.matrix
+                # Copied, edit bones are gone once edit mode is left
+                cumulative_matrices[child_bone.name] = child_bone.matrix.copy()
 
         if not parent_bone.children:
             parent_bone.tail = parent_bone.head + mathutils.Vector((0, tail_length, 0))
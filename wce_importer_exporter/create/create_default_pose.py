@@ -1,6 +1,7 @@
 import bpy
 import mathutils
-from mathutils import Quaternion
+import numpy as np
+from .animation_utils import frame_arrays, pose_keyframe_values, write_pose_fcurves
 
 def create_default_pose(armature_obj, track_definitions, armature_data, cumulative_matrices, prefix):
     # Get the scene's frame rate
@@ -41,25 +42,8 @@ def create_default_pose(armature_obj, track_definitions, armature_data, cumulati
             sleep = track_instance.get('sleep', None)
             frames_per_sleep = (sleep / 1000) * frame_rate if sleep else 1
 
-            current_frame = start_frame
-
-            # Iterate over all frames to create keyframes
-            for frame_index, frame_data in enumerate(track_def['frames']):
-                armature_translation = frame_data.get('translation', [0, 0, 0])
-                armature_rotation = frame_data.get('rotation', Quaternion((1, 0, 0, 0)))
-                xyz_scale = track_def.get('xyz_scale', 256)
-                scale_factor = xyz_scale / 256.0
-
-                # Create the transformation matrix
-                scale_matrix = mathutils.Matrix.Scale(scale_factor, 4)
-                rotation_matrix = armature_rotation.to_matrix().to_4x4()
-                translation_matrix = mathutils.Matrix.Translation(armature_translation)
-
-                bone_matrix = (
-                    translation_matrix @ rotation_matrix @ scale_matrix @
-                    cumulative_matrices.get(bone_name, mathutils.Matrix.Identity(4))
-                )
-
+            translations, rotations = frame_arrays(track_def)
+            if len(translations):
                 # Initialize fcurves for location, rotation, and scale
                 if bone_name not in fcurves:
                     fcurves[bone_name] = {
@@ -75,29 +59,11 @@ def create_default_pose(armature_obj, track_definitions, armature_data, cumulati
                     for i in range(4):  # Rotation quaternion
                         fcurves[bone_name]['rotation_quaternion'].append(action.fcurves.new(data_path=f'pose.bones["{bone_name}"].rotation_quaternion', index=i))
 
-                # Extract translation, rotation, and scale
-                translation = bone_matrix.to_translation()
-                rotation = bone_matrix.to_quaternion()
-                scale = [scale_factor] * 3
-
-                # Insert keyframes for location, rotation, and scale
-                for i, value in enumerate(translation):
-                    fcurve = fcurves[bone_name]['location'][i]
-                    kf = fcurve.keyframe_points.insert(current_frame, value)
-                    kf.interpolation = 'LINEAR'
-
-                for i, value in enumerate(rotation):
-                    fcurve = fcurves[bone_name]['rotation_quaternion'][i]
-                    kf = fcurve.keyframe_points.insert(current_frame, value)
-                    kf.interpolation = 'LINEAR'
-
-                for i, value in enumerate(scale):
-                    fcurve = fcurves[bone_name]['scale'][i]
-                    kf = fcurve.keyframe_points.insert(current_frame, value)
-                    kf.interpolation = 'LINEAR'
-
-                # Advance the current frame
-                current_frame += frames_per_sleep
+                # Transform every frame by the bone's cumulative matrix in one pass
+                scale_factor = track_def.get('xyz_scale', 256) / 256.0
+                frames = start_frame + np.arange(len(translations)) * frames_per_sleep
+                values = pose_keyframe_values(translations, rotations, scale_factor, cumulative_matrices.get(bone_name, mathutils.Matrix.Identity(4)))
+                write_pose_fcurves(fcurves[bone_name], [(frames, values)])
 
             # Add custom properties to the action
             action["TAGINDEX"] = track_instance.get('tag_index', 0)
@@ -1,22 +1,25 @@
 import bpy
-import bmesh
 import mathutils
+import numpy as np
 import re
 from .create_vertex_animation import create_vertex_animation
+from .scene_registry import find_object
 
-def create_mesh(mesh_data, parent_obj, armature_obj=None, armature_data=None, material_palettes=None, created_materials=None, vertex_animations=None, pending_objects=None):
+def create_mesh(mesh_data, parent_obj, armature_obj=None, armature_data=None, material_palettes=None, created_materials=None, vertex_animations=None, pending_objects=None, registry=None):
     mesh = bpy.data.meshes.new(mesh_data['name'])
     obj = bpy.data.objects.new(mesh_data['name'], mesh)
     pending_objects.append(obj)
     region_mesh_pattern = re.compile(r"^R\d+_DMSPRITEDEF$")
     if region_mesh_pattern.match(obj.name):
         # Try to get the REGION_MESHES empty
-        region_meshes_empty = bpy.data.objects.get("REGION_MESHES")
+        region_meshes_empty = find_object(registry, "REGION_MESHES")
 
         # If REGION_MESHES doesn't exist yet, create and link it
         if region_meshes_empty is None:
             region_meshes_empty = bpy.data.objects.new("REGION_MESHES", None)
             bpy.context.collection.objects.link(region_meshes_empty)
+            if registry is not None:
+                registry['objects']["REGION_MESHES"] = region_meshes_empty
 
         # Parent the mesh under REGION_MESHES
         obj.parent = region_meshes_empty
@@ -27,34 +30,41 @@ def create_mesh(mesh_data, parent_obj, armature_obj=None, armature_data=None, ma
     center_offset = mathutils.Vector(mesh_data.get('center_offset', [0.0, 0.0, 0.0]))
     obj.location = center_offset
 
-    # Extract only the first three vertices for each face (without passable value)
-    faces_for_creation = [face[:3] for face in mesh_data['faces']]
-    mesh.from_pydata(mesh_data['vertices'], [], faces_for_creation)
-    mesh.update()
-
-    for poly in mesh.polygons:
-        poly.use_smooth = True
+    record = mesh_data['record']
+    num_vertices = record.num_vertices
+    num_faces = record.num_faces
+
+    # Allocate the geometry once and fill it from the record's flat arrays
+    mesh.vertices.add(num_vertices)
+    mesh.vertices.foreach_set("co", record.verts.ravel())
+    loop_vertices = record.tris.ravel()
+    mesh.loops.add(len(loop_vertices))
+    mesh.loops.foreach_set("vertex_index", loop_vertices)
+    mesh.polygons.add(num_faces)
+    mesh.polygons.foreach_set("loop_start", np.arange(0, num_faces * 3, 3, dtype=np.int32))
+    # Since Blender 3.6 face sizes follow from loop_start and loop_total is read-only
+    if not mesh.polygons.bl_rna.properties["loop_total"].is_readonly:
+        mesh.polygons.foreach_set("loop_total", np.full(num_faces, 3, dtype=np.int32))
+    mesh.polygons.foreach_set("use_smooth", np.ones(num_faces, dtype=bool))
+    mesh.update(calc_edges=True)
 
     # == UV mapping ==
-    if 'uvs' in mesh_data and mesh_data['uvs']:  # Check if UV data is present
+    if len(record.uvs):  # Check if UV data is present
         uvlayer = mesh.uv_layers.new(name="UVMap")
-        for i, triangle in enumerate(mesh.polygons):
-            vertices = list(triangle.vertices)
-            for j, vertex in enumerate(vertices):
-                uvlayer.data[triangle.loop_indices[j]].uv = (mesh_data['uvs'][vertex][0], mesh_data['uvs'][vertex][1] - 1)
+        # Gather each loop's UV from its vertex, with V shifted down by one
+        loop_uvs = record.uvs[loop_vertices] - np.array((0.0, 1.0), dtype=np.float32)
+        uvlayer.data.foreach_set("uv", loop_uvs.ravel())
 
     # == Apply Custom Normals ==
-    if 'normals' in mesh_data and len(mesh_data['normals']) == len(mesh_data['vertices']):
-        loop_normals = []
-        for loop in mesh.loops:
-            v_index = loop.vertex_index
-            normal = mathutils.Vector(mesh_data['normals'][v_index])
-            loop_normals.append(normal.normalized())
-        mesh.normals_split_custom_set(loop_normals)
+    if len(record.normals) == num_vertices:
+        lengths = np.linalg.norm(record.normals, axis=1, keepdims=True)
+        # Zero normals stay zero, as mathutils.Vector.normalized() leaves them
+        normals = np.divide(record.normals, lengths, out=np.zeros_like(record.normals), where=lengths != 0)
+        mesh.normals_split_custom_set_from_vertices(normals.tolist())
         mesh.use_auto_smooth = True
 
     # == Color Attribute (Vertex Colors per Vertex) ==
-    if 'colors' in mesh_data and len(mesh_data['colors']) == len(mesh_data['vertices']):
+    if len(record.colors) == num_vertices:
         # Remove existing color attributes, if any
         color_attribute_name = "Color"  # Set the name for the color attribute
         if color_attribute_name in mesh.color_attributes:
@@ -63,20 +73,14 @@ def create_mesh(mesh_data, parent_obj, armature_obj=None, armature_data=None, ma
         # Create a new color attribute in the 'POINT' domain (per vertex)
         color_attribute = mesh.color_attributes.new(name=color_attribute_name, domain='POINT', type='FLOAT_COLOR')
 
-        # Write vertex color data per vertex
-        for v_index, vertex_color in enumerate(mesh_data['colors']):
-            r, g, b, a = vertex_color  # Extract RGBA values
-            color_attribute.data[v_index].color = (r / 255.0, g / 255.0, b / 255.0, a / 255.0)
+        # Write vertex color data per vertex, scaled from 0-255 to 0-1
+        color_attribute.data.foreach_set("color", (record.colors.astype(np.float32) / 255.0).ravel())
 
     # == Vertex Material Indices as Custom Attribute ==
-    if 'vertex_materials' in mesh_data:
-        # Create a custom integer attribute for vertex materials in the 'POINT' domain
-        vertex_material_attribute = mesh.attributes.new(name="Vertex_Material_Index", type='INT', domain='POINT')
-
-        # Iterate over vertex_material_groups and assign material indices to vertices
-        for vertex_start, vertex_end, material_index in mesh_data['vertex_materials']:
-            for v_index in range(vertex_start, vertex_end):
-                vertex_material_attribute.data[v_index].value = material_index
+    # Create a custom integer attribute for vertex materials in the 'POINT' domain
+    vertex_material_attribute = mesh.attributes.new(name="Vertex_Material_Index", type='INT', domain='POINT')
+    # Vertices outside every VERTEXMATERIALGROUP keep index 0
+    vertex_material_attribute.data.foreach_set("value", np.maximum(record.vertex_materials, 0))
 
     # == Save custom properties ==
     material_palette = mesh_data.get('material_palette', "")
@@ -98,14 +102,18 @@ def create_mesh(mesh_data, parent_obj, armature_obj=None, armature_data=None, ma
     obj["POLYHEDRON"] = polyhedron_value  # Store as blank if polyhedron_value is ""
 
     # Create vertex groups if armature data is available
-    if armature_obj and 'vertex_groups' in mesh_data and mesh_data['vertex_groups']:
-        for vg_start, vg_end, bone_index in mesh_data['vertex_groups']:
+    vertex_bones = record.vertex_bones
+    if armature_obj and (vertex_bones >= 0).any():
+        # One group per bone, in the order the bones first appear
+        assigned_bones = vertex_bones[vertex_bones >= 0]
+        _, first_seen = np.unique(assigned_bones, return_index=True)
+        for bone_index in assigned_bones[np.sort(first_seen)]:
             bone_name = armature_data['bones'][bone_index]['name']
             group = obj.vertex_groups.new(name=bone_name)
-            group.add(range(vg_start, vg_end), 1.0, 'ADD')
+            group.add(np.flatnonzero(vertex_bones == bone_index).tolist(), 1.0, 'ADD')
 
     # Create materials only if face materials exist
-    if 'face_materials' in mesh_data and mesh_data['face_materials']:
+    if (record.face_materials >= 0).any():
         palette_name = mesh_data.get('material_palette', None)
         if palette_name:
             if palette_name not in material_palettes:
@@ -122,38 +130,23 @@ def create_mesh(mesh_data, parent_obj, armature_obj=None, armature_data=None, ma
             print(f"Warning: No material palette found for mesh '{mesh_data['name']}'")
             materials = []
 
-        # Assign materials to faces
-        face_index = 0
-        for face_data in mesh_data['face_materials']:
-            start_face, end_face, material_index = face_data[:3]
-            num_faces = end_face - start_face
-
-            if material_index < len(materials):
-                material_name = materials[material_index]
-                material_list_index = obj.data.materials.find(material_name)
-                if material_list_index == -1:
-                    material_list_index = len(obj.data.materials) - 1
+        # Map each palette index to its material slot, then assign all faces at once
+        slot_lookup = np.zeros(max(len(materials), 1), dtype=np.int32)
+        for material_index, material_name in enumerate(materials):
+            material_list_index = obj.data.materials.find(material_name)
+            if material_list_index == -1:
+                material_list_index = len(obj.data.materials) - 1
+            slot_lookup[material_index] = material_list_index
 
-                for i in range(num_faces):
-                    if face_index < len(obj.data.polygons):
-                        obj.data.polygons[face_index].material_index = material_list_index
-                        face_index += 1
+        face_materials = record.face_materials
+        valid = (face_materials >= 0) & (face_materials < len(materials))
+        material_indices = np.zeros(num_faces, dtype=np.int32)
+        material_indices[valid] = slot_lookup[face_materials[valid]]
+        mesh.polygons.foreach_set("material_index", material_indices)
 
     # == Apply the "PASSABLE" attribute as a custom face property ==
-    bm = bmesh.new()
-    bm.from_mesh(mesh)
-
-    # Create a custom layer for the "PASSABLE" value
-    passable_layer = bm.faces.layers.int.new("PASSABLE")
-
-    # Assign the "PASSABLE" value to each face based on the parsed data
-    for i, face in enumerate(bm.faces):
-        passable_value = mesh_data['faces'][i][3]  # The fourth element in the face tuple is the PASSABLE flag
-        face[passable_layer] = passable_value
-
-    # Write the bmesh data back to the original mesh
-    bm.to_mesh(mesh)
-    bm.free()
+    passable_attribute = mesh.attributes.new(name="PASSABLE", type='INT', domain='FACE')
+    passable_attribute.data.foreach_set("value", record.passable.astype(np.int32))
 
     # == Store MESHOPS as a text block ==
     if 'meshops' in mesh_data and len(mesh_data['meshops']) > 0:  # Only proceed if meshops exists and is not empty
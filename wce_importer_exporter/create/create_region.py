@@ -1,7 +1,8 @@
 import bpy
 import json
+from .scene_registry import find_object, register_region_empty
 
-def create_region(region_data, pending_objects=None):
+def create_region(region_data, pending_objects=None, registry=None):
     name = region_data['name']
     sphere = region_data['sphere']  # [x, y, z, radius]
 
@@ -13,6 +14,8 @@ def create_region(region_data, pending_objects=None):
     empty["VISLISTBYTES"] = bool(region_data.get("vislistbytes", 1))
     empty["SPRITE"] = region_data['sprite']
     pending_objects.append(empty)
+    if registry is not None:
+        register_region_empty(registry, empty)
 
     # Write VISLISTs as custom JSON properties
     visible_lists = region_data.get("vislists", [])
@@ -34,7 +37,7 @@ def create_region(region_data, pending_objects=None):
         empty[key] = json.dumps(json_data)
 
     # Parent to REGION empty if it exists
-    region_parent = bpy.data.objects.get("REGION")
+    region_parent = find_object(registry, "REGION")
     if region_parent:
         empty.parent = region_parent
     else:
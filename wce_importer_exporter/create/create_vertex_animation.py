@@ -1,7 +1,9 @@
 import bpy
+import numpy as np
 
 def create_vertex_animation(mesh_obj, dmtrack_name, vertex_animations):
-    vertex_animation_data = next((anim for anim in vertex_animations if anim.get('name') == dmtrack_name), None)
+    # vertex_animations maps DMTRACKDEF2 names to their parsed data
+    vertex_animation_data = vertex_animations.get(dmtrack_name)
     
     # Ensure animation data was found
     if not vertex_animation_data:
@@ -28,28 +30,37 @@ def create_vertex_animation(mesh_obj, dmtrack_name, vertex_animations):
     mesh_obj.data.shape_keys.animation_data_create().action = action
 
     # Create shape keys with frame-specific names and set up the frames
+    num_vertices = len(mesh_obj.data.vertices)
     shape_keys = []
     for frame_index, frame_data in enumerate(vertex_animation_data["frames"]):
         # Name each shape key based on dmtrack_name and frame number
         shape_key_name = f"{dmtrack_name}_{frame_index + 1}"
         shape_key = mesh_obj.shape_key_add(name=shape_key_name, from_mix=False)
         shape_keys.append(shape_key)
-        for vertex, coords in zip(mesh_obj.data.shape_keys.key_blocks[shape_key_name].data, frame_data):
-            vertex.co = coords
-
-    # Set up keyframes for shape keys to create the animation sequence
-    for shape_key in shape_keys:
-        # Set all shape key values to 0 and keyframe them at this frame
-        for sk in shape_keys:
-            sk.value = 0.0
-            sk.keyframe_insert(data_path="value", frame=current_frame)
-        
-        # Set only the active shape key's value to 1.0 and keyframe it
-        shape_key.value = 1.0
-        shape_key.keyframe_insert(data_path="value", frame=current_frame)
-        
-        # Advance to the next frame for the next shape key
-        current_frame += frames_per_sleep
+        if len(frame_data) == num_vertices:
+            shape_key.data.foreach_set("co", np.ascontiguousarray(frame_data, dtype=np.float32).ravel())
+        else:
+            # Vertices the frame does not cover keep their basis position
+            coords = np.empty(num_vertices * 3, dtype=np.float32)
+            shape_key.data.foreach_get("co", coords)
+            coords = coords.reshape(num_vertices, 3)
+            count = min(len(frame_data), num_vertices)
+            coords[:count] = frame_data[:count]
+            shape_key.data.foreach_set("co", coords.ravel())
+
+    # Each shape key is on (1.0) at its own frame and off (0.0) at its neighbours'.
+    # Keys at the other frames would all be 0.0 and do not change the curve.
+    frame_times = current_frame + np.arange(len(shape_keys)) * frames_per_sleep
+    for frame_index, shape_key in enumerate(shape_keys):
+        first = max(frame_index - 1, 0)
+        last = min(frame_index + 1, len(shape_keys) - 1)
+        times = frame_times[first:last + 1]
+        values = (np.arange(first, last + 1) == frame_index).astype(np.float32)
+
+        fcurve = action.fcurves.new(data_path=shape_key.path_from_id("value"))
+        fcurve.keyframe_points.add(len(times))
+        fcurve.keyframe_points.foreach_set("co", np.column_stack((times, values)).astype(np.float32).ravel())
+        fcurve.update()
 
     # Ensure shape key animation is visible in playback
     # mesh_obj.active_shape_key_index = 0
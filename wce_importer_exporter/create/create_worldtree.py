@@ -1,6 +1,7 @@
 import bpy
 import math
 import mathutils
+from .scene_registry import index_world_tree, register_world_node
 
 DEFAULT_SIZE = 10000.0  # Default plane side length
 
@@ -72,7 +73,7 @@ def compute_scale_from_location(location, default_size=DEFAULT_SIZE):
     scale_factor = final_size / default_size
     return scale_factor
 
-def create_worldtree(worldtree_data, pending_objects=None):
+def create_worldtree(worldtree_data, pending_objects=None, registry=None):
     """
     Creates a WorldTree from the provided data.
     Each non-leaf node is represented by a plane mesh (with a translucent yellow material and a Solidify modifier)
@@ -161,6 +162,11 @@ def create_worldtree(worldtree_data, pending_objects=None):
         node_obj["back_tree"] = node["back_tree"]
 
         node_objects[node["worldnode"]] = node_obj
+        if registry is not None:
+            register_world_node(registry, node_obj)
+
+    if registry is not None:
+        registry['world_tree'] = index_world_tree(worldtree_data["nodes"])
 
     # bpy.context.view_layer.update()
 
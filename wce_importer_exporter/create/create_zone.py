@@ -4,6 +4,7 @@ import numpy as np
 import mathutils
 from mathutils import Vector
 from math import pi, radians
+from .scene_registry import ancestor_ids, plane_distances, scene_registry_from_objects, world_tree_index
 
 EPSILON = 1e-1
 
@@ -293,16 +294,18 @@ def cleanup_bmesh(bm, deg_edge_dist=1e-3, angle_limit=radians(5), use_dissolve_b
 
 # ─── ZONE CREATION ───────────────────────────────────────────────────────────
 
-def create_zone(zone):
+def create_zone(zone, registry=None):
     name     = zone['name']
     regions  = zone['region_list']
     userdata = zone.get('userdata', "")
+    if registry is None:
+        registry = scene_registry_from_objects()
 
     # 1) gather region empties named "R{index:06d}"
     empties = []
     for r in regions:
         nm = f"R{r+1:06d}"
-        e  = bpy.data.objects.get(nm)
+        e  = registry['region_empties'].get(r)
         if e and e.type=='EMPTY':
             empties.append(e)
         else:
@@ -312,24 +315,14 @@ def create_zone(zone):
         return None
 
     # 2) compute AABB including each empty’s empty_display_size
-    min_x = min(e.location.x - e.empty_display_size for e in empties)
-    max_x = max(e.location.x + e.empty_display_size for e in empties)
-    min_y = min(e.location.y - e.empty_display_size for e in empties)
-    max_y = max(e.location.y + e.empty_display_size for e in empties)
-    min_z = min(e.location.z - e.empty_display_size for e in empties)
-    max_z = max(e.location.z + e.empty_display_size for e in empties)
+    locations = np.array([e.location[:] for e in empties])
+    sizes     = np.array([e.empty_display_size for e in empties])[:, None]
+    box_min   = (locations - sizes).min(axis=0)
+    box_max   = (locations + sizes).max(axis=0)
 
     # center & full dims
-    center = Vector((
-        (min_x + max_x) * 0.5,
-        (min_y + max_y) * 0.5,
-        (min_z + max_z) * 0.5,
-    ))
-    dims = Vector((
-        (max_x - min_x),
-        (max_y - min_y),
-        (max_z - min_z),
-    ))
+    center = Vector((box_min + box_max) * 0.5)
+    dims   = Vector(box_max - box_min)
 
     # 3) build initial BMesh cube covering that box
     bm = bmesh.new()
@@ -337,112 +330,86 @@ def create_zone(zone):
     bmesh.ops.scale(    bm, vec=dims,   verts=bm.verts)
     bmesh.ops.translate(bm, vec=center, verts=bm.verts)
 
-    # 4) collect splitting planes by BFS from each LeafMesh_* whose region_tag matches
+    # 4) collect the splitting planes of every BSP node above a leaf whose region_tag matches
     region_tags = { f"R{r+1:06d}" for r in regions }
-    visited_ids = set()
-    frontier    = []
-
-    # seed with worldnode IDs from leaf meshes
-    for o in bpy.data.objects:
-        if o.type=='MESH' and o.data.name.startswith("LeafMesh_"):
-            if o.get("region_tag") in region_tags:
-                wid = o.get("worldnode")
-                if wid is not None:
-                    visited_ids.add(wid)
-                    frontier.append(wid)
-
-    # climb up to all BSPPlaneMesh parents
-    planes = []
-    while frontier:
-        cur = frontier.pop(0)
-        for o in bpy.data.objects:
-            if o.type=='MESH' and o.data.name=="BSPPlaneMesh":
-                ft, bt = o.get("front_tree"), o.get("back_tree")
-                if ft==cur or bt==cur:
-                    pid = o.get("worldnode")
-                    if pid not in visited_ids:
-                        visited_ids.add(pid)
-                        frontier.append(pid)
-                    n = Vector(o["normal"]).normalized()
-                    d = -(float(o["d"]))
-                    planes.append((n,d))
-
-    # 5) dedupe planes by rounded (nx,ny,nz,d)
-    uniq = []
-    seen = set()
-    for n,d in planes:
-        key = (round(n.x,6), round(n.y,6), round(n.z,6), round(d,6))
-        if key not in seen:
-            seen.add(key)
-            uniq.append((n,d))
+    world_tree  = world_tree_index(registry)
+    leaves      = world_tree['leaves']
+    seeds = sorted({ wid for tag in region_tags
+                     for wid in registry['region_world_nodes'].get(tag, ())
+                     if wid < len(leaves) and leaves[wid] })
+
+    # walk up from each leaf; chains shared with earlier leaves or zones are memoized
+    plane_ids = {}
+    for wid in seeds:
+        for pid in ancestor_ids(world_tree, wid):
+            plane_ids.setdefault(pid)
+    planes = world_tree['planes'][list(plane_ids)].reshape(-1, 4)
+
+    # 5) dedupe planes by rounded (nx,ny,nz,d), keeping the first of each
+    _, first = np.unique(np.round(planes, 6), axis=0, return_index=True)
+    uniq = planes[np.sort(first)]
 
     # precompute box corners
-    corners   = [ Vector((x,y,z)) 
-                  for x in (min_x,max_x)
-                  for y in (min_y,max_y)
-                  for z in (min_z,max_z) ]
+    corners = np.array([ (x,y,z)
+                         for x in (box_min[0],box_max[0])
+                         for y in (box_min[1],box_max[1])
+                         for z in (box_min[2],box_max[2]) ])
 
     # --- 5b) filter out any plane that truly bisects one of the region meshes ---
     sprite_meshes = []
     for e in empties:
         sprite = e.get("SPRITE")
-        o = bpy.data.objects.get(sprite)
+        o = registry['meshes'].get(sprite)
         if o and o.type=='MESH':
             sprite_meshes.append(o)
 
+    # world‐space vertices of every sprite mesh, plus the centers of their bounding boxes
     mesh_centers = []
+    mesh_verts   = []
     for o in sprite_meshes:
+        matrix = np.array(o.matrix_world)
         # Blender gives you 8 box corners in object‑local space:
-        bbox_corners = [o.matrix_world @ Vector(c) for c in o.bound_box]
-        center = sum(bbox_corners, Vector()) / len(bbox_corners)
-        mesh_centers.append(center)
-
-    empty_pts = [e.matrix_world.to_translation() for e in empties]
-    empty_pts.extend(mesh_centers)
-
-    # cache world‐space coords
-    mesh_verts = {
-        o: [o.matrix_world @ v.co for v in o.data.vertices]
-        for o in sprite_meshes
-    }
-
-    all_verts = []
-    for verts in mesh_verts.values():
-        all_verts.extend(verts)
+        mesh_centers.append(np.array(o.bound_box).mean(axis=0) @ matrix[:3, :3].T + matrix[:3, 3])
+        co = np.empty(len(o.data.vertices) * 3, dtype=np.float32)
+        o.data.vertices.foreach_get("co", co)
+        mesh_verts.append(co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3])
+    all_verts = np.concatenate(mesh_verts) if mesh_verts else np.empty((0, 3))
 
     # parameters you can tweak:
     MESH_EPS       = 0.05    # how close to zero counts as “on the plane”
     MIN_SLICE_FRAC = 0.05    # must have at least 5% of verts on each side to reject
 
-    empty_pts = [e.matrix_world.to_translation() for e in empties]
-    empty_pts.extend(mesh_centers)
-    empty_pts.extend(all_verts)
-
-    good_planes = []
-    for n, d in uniq:
-        # (a) skip if it misses the zone-box
-        ds = [c.dot(n) - d for c in corners]
-        if max(ds) < -EPSILON or min(ds) > EPSILON:
-            continue
-
-        # (b) decide which side to keep
-        es = [p.dot(n) - d for p in empty_pts]
-        if   all(s >= -EPSILON for s in es):
-            clear_outer, clear_inner = False, True
-        elif all(s <=  EPSILON for s in es):
-            clear_outer, clear_inner = True, False
-        else:
-            continue
+    empty_pts = np.concatenate((
+        np.array([e.matrix_world.to_translation()[:] for e in empties]),
+        np.array(mesh_centers).reshape(-1, 3),
+        all_verts,
+    ))
 
-        # (c) reject if it bisects the combined vertex cloud
-        vals  = [n.dot(co) - d for co in all_verts]
-        neg   = sum(1 for v in vals if v < -MESH_EPS)
-        pos   = sum(1 for v in vals if v > +MESH_EPS)
-        total = len(vals)
-        if neg/total > MIN_SLICE_FRAC and pos/total > MIN_SLICE_FRAC:
-            continue
+    # (a) skip planes that miss the zone-box
+    ds = plane_distances(uniq, corners)
+    crosses_box = (ds.max(axis=1) >= -EPSILON) & (ds.min(axis=1) <= EPSILON)
+
+    # (b) decide which side to keep; planes with empties on both sides are skipped
+    es = plane_distances(uniq, empty_pts)
+    keeps_front = (es >= -EPSILON).all(axis=1)
+    keeps_back  = (es <=  EPSILON).all(axis=1)
+
+    # (c) reject planes that bisect the combined vertex cloud, counted in chunks to bound memory
+    neg = np.zeros(len(uniq), dtype=np.int64)
+    pos = np.zeros(len(uniq), dtype=np.int64)
+    for start in range(0, len(all_verts), 65536):
+        vals = plane_distances(uniq, all_verts[start:start + 65536])
+        neg += (vals < -MESH_EPS).sum(axis=1)
+        pos += (vals > +MESH_EPS).sum(axis=1)
+    total = max(len(all_verts), 1)
+    bisects = (neg/total > MIN_SLICE_FRAC) & (pos/total > MIN_SLICE_FRAC)
 
-        good_planes.append((n, d, clear_outer, clear_inner))
+    good_planes = []
+    keep = crosses_box & (keeps_front | keeps_back) & ~bisects
+    for plane, front in zip(uniq[keep], keeps_front[keep]):
+        # clear the side the empties are not on
+        clear_outer, clear_inner = (False, True) if front else (True, False)
+        good_planes.append((Vector(plane[:3]), float(plane[3]), clear_outer, clear_inner))
 
     # 2) Now do your bisects in one pass, using the precomputed flags
     geom_all = bm.faces[:] + bm.edges[:] + bm.verts[:]
@@ -465,59 +432,20 @@ def create_zone(zone):
     
     # --- CLAMP ZONE VERTS TO ENCLOSE ALL SPRITE VERTICES  ---
     # 1) compute bmesh’s current AABB
-    zone_min = Vector((
-        min(v.co.x for v in bm.verts),
-        min(v.co.y for v in bm.verts),
-        min(v.co.z for v in bm.verts),
-    ))
-    zone_max = Vector((
-        max(v.co.x for v in bm.verts),
-        max(v.co.y for v in bm.verts),
-        max(v.co.z for v in bm.verts),
-    ))
+    zone_verts = np.array([v.co[:] for v in bm.verts]).reshape(-1, 3)
+    zone_min   = zone_verts.min(axis=0)
+    zone_max   = zone_verts.max(axis=0)
 
-    # 2) compute region‐cloud AABB
-    region_min = Vector((
-        min(co.x for co in all_verts),
-        min(co.y for co in all_verts),
-        min(co.z for co in all_verts),
-    ))
-    region_max = Vector((
-        max(co.x for co in all_verts),
-        max(co.y for co in all_verts),
-        max(co.z for co in all_verts),
-    ))
-
-    # 3) decide new extents (never shrink)
-    new_min = Vector((
-        min(zone_min.x, region_min.x),
-        min(zone_min.y, region_min.y),
-        min(zone_min.z, region_min.z),
-    ))
-    new_max = Vector((
-        max(zone_max.x, region_max.x),
-        max(zone_max.y, region_max.y),
-        max(zone_max.z, region_max.z),
-    ))
+    # 2) decide new extents from the region‐cloud AABB (never shrink)
+    new_min = np.minimum(zone_min, all_verts.min(axis=0)) if len(all_verts) else zone_min
+    new_max = np.maximum(zone_max, all_verts.max(axis=0)) if len(all_verts) else zone_max
 
-    # 4) only move those verts that sit on the original box‐extents
+    # 3) only move those verts that sit on the original box‐extents, per axis
     eps = 1e-3
-    for v in bm.verts:
-        # X axis
-        if abs(v.co.x - zone_min.x) < eps:
-            v.co.x = new_min.x
-        elif abs(v.co.x - zone_max.x) < eps:
-            v.co.x = new_max.x
-        # Y axis
-        if abs(v.co.y - zone_min.y) < eps:
-            v.co.y = new_min.y
-        elif abs(v.co.y - zone_max.y) < eps:
-            v.co.y = new_max.y
-        # Z axis
-        if abs(v.co.z - zone_min.z) < eps:
-            v.co.z = new_min.z
-        elif abs(v.co.z - zone_max.z) < eps:
-            v.co.z = new_max.z
+    clamped = np.where(np.abs(zone_verts - zone_min) < eps, new_min,
+              np.where(np.abs(zone_verts - zone_max) < eps, new_max, zone_verts))
+    for v, co in zip(bm.verts, clamped):
+        v.co = co
 
     # 7) write mesh & link object
     cleanup_bmesh(bm)
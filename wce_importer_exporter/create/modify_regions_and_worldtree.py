@@ -1,13 +1,13 @@
 import bpy
-import re
 import mathutils
+from .scene_registry import scene_registry_from_objects
 
-def create_bounding_volume_for_region_empties():
-    # Define a regex to match region empty names, e.g., R000007
-    pattern = re.compile(r"^R\d{6}$")
-    
-    # Collect all objects matching the pattern
-    region_empties = [obj for obj in bpy.data.objects if pattern.match(obj.name)]
+def create_bounding_volume_for_region_empties(registry=None):
+    if registry is None:
+        registry = scene_registry_from_objects()
+
+    # Region empties are registered by index, named e.g. R000007
+    region_empties = list(registry['region_empties'].values())
     if not region_empties:
         print("No region empties found.")
         return None
@@ -48,23 +48,19 @@ def create_bounding_volume_for_region_empties():
     #print(f"Created bounding empty '{bounding_empty.name}' at {bounding_empty.location} with scale {bounding_empty.scale}")
     return bounding_empty
 
-def modify_regions_and_worldtree():
-    # Build a dictionary of worldtree nodes by region tag.
-    # (Assumes that objects created by create_worldtree have a custom property "region_tag")
-    world_nodes = {}
-    for obj in bpy.data.objects:
-        if "region_tag" in obj:
-            world_nodes[obj["region_tag"]] = obj
+def modify_regions_and_worldtree(registry=None):
+    if registry is None:
+        registry = scene_registry_from_objects()
 
-    # Loop over all empties that represent regions.
-    # (Assumes region empties are type 'EMPTY' and are named with the region tag, e.g., "R000007")
-    for obj in bpy.data.objects:
-        if obj.type == 'EMPTY' and obj.name.startswith("R"):
-            region_tag = obj.name
-            if region_tag in world_nodes:
-                obj.hide_set(True)
-            else:
-                print(f"No worldtree node found for region '{obj.name}'")
+    # Worldtree nodes by region tag come from the registry.
+    # (Region empties are named with the region tag, e.g., "R000007")
+    world_nodes = registry['region_world_nodes']
+    for obj in registry['region_empties'].values():
+        region_tag = obj.name
+        if region_tag in world_nodes:
+            obj.hide_set(True)
+        else:
+            print(f"No worldtree node found for region '{obj.name}'")
 
     # -----------------------------------------------------------------------
     #  Create or retrieve the "ZoneBoundsIntersect" geometry node group
@@ -76,7 +72,7 @@ def modify_regions_and_worldtree():
     # -----------------------------------------------------------------------
     # Define your own logic to identify "non-leaf" nodes. Here, we just add
     # the modifier to every worldnode that is a mesh. Adjust as needed.
-    for obj in bpy.data.objects:
+    for obj in registry['world_nodes'].values():
         if obj.type == 'MESH' and obj.name.startswith("WorldNode_"):
             mod = obj.modifiers.new("ZoneBoundsIntersect", 'NODES')
             mod.node_group = gn_tree
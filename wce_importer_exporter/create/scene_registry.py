@@ -0,0 +1,127 @@
+import numpy as np
+import re
+try:
+    import bpy
+except ImportError:  # The world tree helpers are usable without Blender, e.g. from the tests
+    bpy = None
+
+REGION_EMPTY_PATTERN = re.compile(r"^R(\d{6})$")
+
+def new_scene_registry():
+    """
+    Name and id lookups over the objects an import creates, so region,
+    WorldTree and zone building never has to scan bpy.data.objects.
+    """
+    return {
+        'region_empties': {},    # region index as used in ZONE region lists -> "R{index+1:06d}" empty
+        'world_nodes': {},       # worldnode id -> WorldNode_ object
+        'region_world_nodes': {},  # region tag -> worldnode ids of the nodes carrying it
+        'world_tree': None,      # index_world_tree() of the WORLDTREE, built on first use if not given
+        'meshes': {},            # DMSPRITEDEF2 name -> mesh object
+        'objects': {},           # other objects looked up by name, e.g. REGION
+    }
+
+def scene_registry_from_objects():
+    """Builds a registry over the objects already in the file in a single pass."""
+    registry = new_scene_registry()
+    for obj in bpy.data.objects:
+        if obj.type == 'EMPTY':
+            if REGION_EMPTY_PATTERN.match(obj.name):
+                register_region_empty(registry, obj)
+        elif obj.type == 'MESH':
+            if "worldnode" in obj:
+                register_world_node(registry, obj)
+            else:
+                registry['meshes'].setdefault(obj.name, obj)
+    return registry
+
+def register_region_empty(registry, empty):
+    match = REGION_EMPTY_PATTERN.match(empty.name)
+    if match:
+        registry['region_empties'][int(match.group(1)) - 1] = empty
+
+def register_world_node(registry, node_obj):
+    worldnode = node_obj["worldnode"]
+    registry['world_nodes'][worldnode] = node_obj
+    region_tag = node_obj.get("region_tag")
+    if region_tag:
+        registry['region_world_nodes'].setdefault(region_tag, []).append(worldnode)
+
+def index_world_tree(nodes):
+    """
+    Array form of WORLDTREE nodes (dicts as parse_world_tree returns them),
+    indexed by worldnode id: each node's parent id (-1 for the root), its
+    plane as (nx, ny, nz, d) with the normal normalized and NORMALABCD's d
+    negated, and whether it is a leaf. Ancestor chains are memoized as they are walked.
+    """
+    size = max((node['worldnode'] for node in nodes), default=0) + 1
+    parents = np.full(size, -1, dtype=np.int64)
+    planes = np.zeros((size, 4))
+    leaves = np.zeros(size, dtype=bool)
+    for node in nodes:
+        worldnode = node['worldnode']
+        planes[worldnode] = node['normal'][:4]
+        front_tree, back_tree = node['front_tree'], node['back_tree']
+        leaves[worldnode] = front_tree == 0 and back_tree == 0
+        for child in (front_tree, back_tree):
+            if 0 < child < size:
+                parents[child] = worldnode
+
+    # Zero normals stay zero, as mathutils.Vector.normalized() leaves them
+    normals = planes[:, :3]
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    planes[:, :3] = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths != 0)
+    planes[:, 3] = -planes[:, 3]
+    return {
+        'parents': parents,
+        'planes': planes,
+        'leaves': leaves,
+        'ancestors': {},  # worldnode id -> ids of its ancestors, nearest first
+    }
+
+def world_tree_index(registry):
+    """The registry's world tree index, read from its world node objects if no WORLDTREE was given."""
+    if registry['world_tree'] is None:
+        nodes = [{
+            'worldnode': node_obj["worldnode"],
+            'normal': list(node_obj["normal"]) + [node_obj["d"]],
+            'front_tree': node_obj.get("front_tree", 0),
+            'back_tree': node_obj.get("back_tree", 0),
+        } for node_obj in registry['world_nodes'].values()]
+        registry['world_tree'] = index_world_tree(nodes)
+    return registry['world_tree']
+
+def ancestor_ids(world_tree, worldnode):
+    """Ids of the BSP nodes above worldnode, nearest first, each chain walked only once."""
+    ancestors = world_tree['ancestors']
+    parents = world_tree['parents']
+    # Climb until a node whose chain is already known, then fill in the chains on the way back
+    path = []
+    node = worldnode
+    while node not in ancestors:
+        path.append(node)
+        parent = parents[node] if 0 <= node < len(parents) else -1
+        if parent < 0:
+            ancestors[node] = ()
+            path.pop()
+            break
+        node = int(parent)
+    for child in reversed(path):
+        parent = int(parents[child])
+        ancestors[child] = (parent,) + ancestors[parent]
+    return ancestors[worldnode]
+
+def plane_distances(planes, points):
+    # Signed distances n.p - d of (N,3) points to (P,4) planes at once, as a (P,N) array
+    return planes @ np.column_stack((points, np.full(len(points), -1.0))).T
+
+def find_object(registry, name):
+    """bpy.data.objects.get(name), remembered in the registry once found."""
+    if registry is None:
+        return bpy.data.objects.get(name)
+    obj = registry['objects'].get(name)
+    if obj is None:
+        obj = bpy.data.objects.get(name)
+        if obj is not None:
+            registry['objects'][name] = obj
+    return obj
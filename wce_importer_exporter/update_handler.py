@@ -1,98 +1,128 @@
 import bpy, os
 
-@bpy.app.handlers.persistent
-def update_animated_texture_nodes(scene):
+# Animated materials by name, each with the names of its texture nodes, the image
+# of every frame and its SLEEP, so the frame-change handler only picks and swaps images.
+# Built as materials are created and rebuilt after a file load, undo or redo,
+# since node and image references do not survive those.
+animated_textures = {}
+
+def is_overlay_node(node):
+    return node.name.upper().endswith("LAYER") or node.name.upper().endswith("DETAIL")
+
+def load_frame_image(directory, file_name):
+    """Returns the image of a frame file, loading it if no image of that name exists, or None."""
+    if not file_name:
+        return None
+    image = bpy.data.images.get(file_name)
+    if image:
+        return image
+    texture_path = bpy.path.abspath(os.path.join(directory, file_name))
+    if not os.path.isfile(texture_path):
+        print(f"Animated texture frame file not found: {texture_path}")
+        return None
+    try:
+        return bpy.data.images.load(texture_path, check_existing=True)
+    except Exception as e:
+        print(f"Error loading animated texture frame '{texture_path}': {e}")
+        return None
+
+def register_animated_material(mat):
     """
-    Frame-change handler that updates animated texture nodes based on custom properties
-    (e.g. "FRAME 001", "FRAME 002", etc.) stored on materials.
-    
-    The property value is expected to be a comma-separated string:
+    Precomputes the animation of a material from its custom properties
+    ("FRAME 001", "FRAME 002", etc.), each a comma-separated string:
          <frame_tag>, <base texture file>[, <overlay texture file>]
-    
-    This version derives the base path from the base image texture node's image filepath
-    and uses the material's SLEEP value (in milliseconds) to control how long each frame is shown.
+    Frame images are looked up next to the base image texture node's image.
     """
-    for mat in bpy.data.materials:
-        if not mat.use_nodes or not mat.node_tree:
-            continue
+    animated_textures.pop(mat.name, None)
+    if not mat.use_nodes or not mat.node_tree:
+        return None
 
-        # Identify the base node (the first TEX_IMAGE node not ending with "LAYER" or "DETAIL")
-        base_node = None
-        for node in mat.node_tree.nodes:
-            if node.type == 'TEX_IMAGE' and not (node.name.upper().endswith("LAYER") or node.name.upper().endswith("DETAIL")):
+    # The base node is the first TEX_IMAGE node not ending with "LAYER" or "DETAIL", the overlay node the last one that does
+    base_node = None
+    overlay_node = None
+    for node in mat.node_tree.nodes:
+        if node.type == 'TEX_IMAGE':
+            if is_overlay_node(node):
+                overlay_node = node
+            elif base_node is None:
                 base_node = node
-                break
-        if not base_node or not base_node.image:
-            continue
+    if not base_node or not base_node.image:
+        return None
 
-        # Derive dynamic base path from the base node's image filepath.
-        dynamic_base = os.path.dirname(bpy.path.abspath(base_node.image.filepath))
+    frame_keys = sorted(key for key in mat.keys() if key.startswith("FRAME "))
+    if not frame_keys:
+        return None
 
-        # Collect custom properties with keys starting with "FRAME "
-        frame_keys = [key for key in mat.keys() if key.startswith("FRAME ")]
-        if not frame_keys:
-            continue
-        frame_keys.sort()
-        total = len(frame_keys)
+    # Derive the base path from the base node's image filepath
+    directory = os.path.dirname(bpy.path.abspath(base_node.image.filepath))
+    base_images = []
+    overlay_images = []
+    for key in frame_keys:
+        parts = [p.strip() for p in str(mat[key]).split(",")]
+        base_images.append(load_frame_image(directory, parts[1]) if len(parts) >= 2 else None)
+        overlay_images.append(load_frame_image(directory, parts[2]) if len(parts) >= 3 else None)
 
-        # Get SLEEP value from the material (in milliseconds) and calculate effective duration (in scene frames)
-        sleep_val = mat.get("SLEEP", 0)
-        fps = scene.render.fps
-        effective_duration = max(1, int(round((sleep_val * fps) / 1000))) if sleep_val else 1
+    # SLEEP is in milliseconds; materials without animation settings store "NULL"
+    sleep = mat.get("SLEEP", 0)
+    entry = animated_textures[mat.name] = {
+        'material': mat,
+        'base_node': base_node.name,
+        'overlay_node': overlay_node.name if overlay_node else None,
+        'base_images': base_images,
+        'overlay_images': overlay_images,
+        'sleep': sleep if isinstance(sleep, (int, float)) else 0,
+    }
+    return entry
 
-        # Determine the current frame index (cycling using effective_duration)
-        current_index = ((scene.frame_current - 1) // effective_duration) % total
-        current_key = frame_keys[current_index]
-        prop_value = mat[current_key]
-        # Expected format: "<frame_tag>, <base texture file>[, <overlay texture file>]"
-        parts = [p.strip() for p in prop_value.split(",")]
-        if len(parts) < 2:
-            continue
-        base_file = parts[1]
-        overlay_file = parts[2] if len(parts) >= 3 else ""
+@bpy.app.handlers.persistent
+def rebuild_animated_textures(*args):
+    """Registers every animated material in the file, e.g. after loading it."""
+    animated_textures.clear()
+    for mat in bpy.data.materials:
+        if any(key.startswith("FRAME ") for key in mat.keys()):
+            register_animated_material(mat)
 
-        # Locate the animated texture nodes.
-        base_tex_node = None
-        overlay_tex_node = None
-        for node in mat.node_tree.nodes:
-            if node.type == 'TEX_IMAGE':
-                if node.name.upper().endswith("LAYER") or node.name.upper().endswith("DETAIL"):
-                    overlay_tex_node = node
-                else:
-                    if base_tex_node is None:
-                        base_tex_node = node
+def is_valid_image(image):
+    """False for a missing frame image or one removed since it was loaded."""
+    if image is None:
+        return False
+    try:
+        image.name
+        return True
+    except ReferenceError:
+        return False
 
-        # Update the base node.
-        bp = os.path.join(dynamic_base, base_file)
-        texture_path = bpy.path.abspath(bp)
-        if os.path.isfile(texture_path):
-            image = bpy.data.images.get(base_file)
-            if not image:
-                try:
-                    image = bpy.data.images.load(texture_path)
-                except Exception as e:
-                    print(f"Error loading base image '{texture_path}': {e}")
-                    continue
-            if base_tex_node.image != image:
-                base_tex_node.image = image
-                print(f"Material '{mat.name}': Updated base node with image '{base_file}' from property '{current_key}'.")
-        else:
-            print(f"Base image file not found: {texture_path}")
+@bpy.app.handlers.persistent
+def update_animated_texture_nodes(scene):
+    """
+    Frame-change handler that shows the current frame's images on the
+    registered animated materials. Each frame is held for the material's
+    SLEEP (in milliseconds) worth of scene frames.
+    """
+    fps = scene.render.fps
+    frame = scene.frame_current - 1
+    for name, entry in list(animated_textures.items()):
+        # Only ID wrappers raise once freed, so check the material and look its nodes up again
+        try:
+            mat = entry['material']
+            mat.name
+            nodes = mat.node_tree.nodes
+        except (ReferenceError, AttributeError):
+            # The material or its node tree was removed
+            del animated_textures[name]
+            continue
+        base_node = nodes.get(entry['base_node'])
+        if base_node is None:
+            del animated_textures[name]
+            continue
+        overlay_node = nodes.get(entry['overlay_node']) if entry['overlay_node'] else None
 
-        # Update the overlay node if specified.
-        if overlay_tex_node and overlay_file:
-            op = os.path.join(dynamic_base, overlay_file)
-            texture_path = bpy.path.abspath(op)
-            if os.path.isfile(texture_path):
-                image = bpy.data.images.get(overlay_file)
-                if not image:
-                    try:
-                        image = bpy.data.images.load(texture_path)
-                    except Exception as e:
-                        print(f"Error loading overlay image '{texture_path}': {e}")
-                        continue
-                if overlay_tex_node.image != image:
-                    overlay_tex_node.image = image
-                    print(f"Material '{mat.name}': Updated overlay node with image '{overlay_file}' from property '{current_key}'.")
-            else:
-                print(f"Overlay image file not found: {texture_path}")
+        sleep = entry['sleep']
+        effective_duration = max(1, int(round((sleep * fps) / 1000))) if sleep else 1
+        index = (frame // effective_duration) % len(entry['base_images'])
+        image = entry['base_images'][index]
+        if is_valid_image(image) and base_node.image != image:
+            base_node.image = image
+        image = entry['overlay_images'][index]
+        if overlay_node is not None and is_valid_image(image) and overlay_node.image != image:
+            overlay_node.image = image
@@ -1,7 +1,7 @@
 import bpy
 import os
-from .dds_checker import check_and_fix_dds
-from wce_importer_exporter.update_handler import update_animated_texture_nodes
+from .texture_registry import fix_texture_files
+from wce_importer_exporter.update_handler import update_animated_texture_nodes, register_animated_material
 
 def add_animated_texture_nodes(material, texture_info, base_path=None):
     """
@@ -11,11 +11,11 @@ def add_animated_texture_nodes(material, texture_info, base_path=None):
       - Finds the base image texture node (the first TEX_IMAGE node that does not have a name ending with "LAYER" or "DETAIL")
         and any overlay nodes (nodes whose names end with "LAYER" or "DETAIL").
       - Sets these nodes to use sequence animation.
-      - Processes each frame in texture_info by running check_and_fix_dds on each referenced texture file.
+      - Processes each frame in texture_info by running the DDS check on each referenced texture file.
       - Creates numbered custom properties on the material (e.g. "FRAME 001") with a value formatted as:
             <frame_tag>, <base texture file name>[, <overlay texture file name>]
-      - Defines and registers a frame-change handler (update_animated_texture_nodes) that uses these custom properties
-        (and the base node’s image filepath for a dynamic base path) to update the node images at runtime.
+      - Registers the material's frame images, resolved from these custom properties and the base node’s image
+        filepath, with the frame-change handler (update_animated_texture_nodes) that swaps them at runtime.
       - The material’s "SLEEP" value (in milliseconds) is used to determine how many scene frames each texture frame is shown.
     """
     nodes = material.node_tree.nodes
@@ -39,34 +39,27 @@ def add_animated_texture_nodes(material, texture_info, base_path=None):
     assets_folder = "assets"
     base_frame_files = []
     overlay_frame_files = []
+    frame_texture_paths = []
     for frame in texture_info.get('frames', []):
         files = frame.get('frame_files', [])
         if len(files) > 0:
-            # Run DDS check on the base file.
             base_file = files[0].get('file', '')
             full_path = os.path.join(base_path, assets_folder, base_file) if base_path else os.path.join(assets_folder, base_file)
-            texture_path = bpy.path.abspath(full_path)
-            if os.path.isfile(texture_path):
-                try:
-                    check_and_fix_dds(texture_path)
-                except Exception as e:
-                    print(f"Error processing DDS for {texture_path}: {e}")
+            frame_texture_paths.append(full_path)
             base_frame_files.append(base_file)
         else:
             base_frame_files.append('')
         if len(files) > 1:
             overlay_file = files[1].get('file', '')
             full_path = os.path.join(base_path, assets_folder, overlay_file) if base_path else os.path.join(assets_folder, overlay_file)
-            texture_path = bpy.path.abspath(full_path)
-            if os.path.isfile(texture_path):
-                try:
-                    check_and_fix_dds(texture_path)
-                except Exception as e:
-                    print(f"Error processing DDS for {texture_path}: {e}")
+            frame_texture_paths.append(full_path)
             overlay_frame_files.append(overlay_file)
         else:
             overlay_frame_files.append('')
 
+    # Run the DDS check on every frame's files; files already checked and unchanged are skipped
+    fix_texture_files(frame_texture_paths)
+
     # --- 4. Create numbered custom properties on the material ---
     # For each frame, create a property key "FRAME 001", "FRAME 002", etc.
     for idx, frame in enumerate(texture_info.get("frames", [])):
@@ -86,6 +79,7 @@ def add_animated_texture_nodes(material, texture_info, base_path=None):
         material[frame_key] = value
         print(f"Set custom property {frame_key} = {value}")
 
-    # Register the update handler.
+    # Precompute the frame images the update handler swaps between, then register the handler.
+    register_animated_material(material)
     if update_animated_texture_nodes not in bpy.app.handlers.frame_change_post:
         bpy.app.handlers.frame_change_post.append(update_animated_texture_nodes)
\ No newline at end of file
@@ -1,6 +1,7 @@
 import bpy
 import os
 from .material_utils import has_dds_header, add_texture_coordinate_and_mapping_nodes
+from .texture_registry import load_image
 
 def add_detail_texture_nodes(material, texture_info, node_group_cache, base_path=None):
     """
@@ -62,7 +63,7 @@ def add_detail_texture_nodes(material, texture_info, node_group_cache, base_path
                     # Add Image Texture node for the detail
                     detail_texture_node = nodes.new(type='ShaderNodeTexImage')
                     detail_texture_node.location = (x_position - 300, y_position - 400)
-                    detail_texture_node.image = bpy.data.images.load(texture_path)
+                    detail_texture_node.image = load_image(texture_path, 'sRGB')
                     detail_texture_node.name = detail_name
                     detail_texture_node.label = detail_name
                 except RuntimeError as e:
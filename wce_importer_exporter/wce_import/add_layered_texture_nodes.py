@@ -1,6 +1,7 @@
 import bpy
 import os
 from .material_utils import has_dds_header, add_texture_coordinate_and_mapping_nodes
+from .texture_registry import load_image
 
 def add_layered_texture_nodes(material, texture_info, node_group_cache, base_path=None):
     """ 
@@ -57,7 +58,7 @@ def add_layered_texture_nodes(material, texture_info, node_group_cache, base_pat
 
                 try:
                     # Attempt to load the image
-                    image = bpy.data.images.load(texture_path)
+                    image = load_image(texture_path, 'sRGB')
                 except Exception as e:
                     print(f"Error loading image file: {texture_path}: {e}")
                     continue
@@ -1,5 +1,6 @@
 import bpy
 import os
+from .texture_registry import load_image
 
 def add_palette_mask_texture_nodes(material, texture_info, node_group_cache, base_path=None):
     """
@@ -47,8 +48,7 @@ def add_palette_mask_texture_nodes(material, texture_info, node_group_cache, bas
                     palette_mask_texture_node = nodes.new(type='ShaderNodeTexImage')
                     palette_mask_texture_node.location = (-1400, -1200)
                     palette_mask_texture_node.interpolation = 'Closest'
-                    palette_mask_texture_node.image = bpy.data.images.load(texture_path)
-                    palette_mask_texture_node.image.colorspace_settings.name = 'Non-Color'
+                    palette_mask_texture_node.image = load_image(texture_path, 'Non-Color')
                     palette_mask_texture_node.name = f"{os.path.basename(texture_path)}"
                     palette_mask_texture_node.label = f"{os.path.basename(texture_path)}"
 
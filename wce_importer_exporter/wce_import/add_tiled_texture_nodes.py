@@ -1,7 +1,7 @@
 import bpy
 import os
-import struct
 from .material_utils import has_dds_header, add_texture_coordinate_and_mapping_nodes, apply_tiled_mapping
+from .texture_registry import load_image, read_bmp_palette_color
 
 def add_tiled_texture_nodes(material, frame_data, texture_info, node_group_cache, base_path=None):
     """
@@ -81,7 +81,7 @@ def add_tiled_texture_nodes(material, frame_data, texture_info, node_group_cache
             tiled_texture_node = nodes.get(tiled_texture_name)
             if not tiled_texture_node:
                 tiled_texture_node = nodes.new(type='ShaderNodeTexImage')
-                tiled_texture_node.image = bpy.data.images.load(texture_path)
+                tiled_texture_node.image = load_image(texture_path, 'sRGB')
                 tiled_texture_node.location = (-400, -200 - (color_index + 1) * 300)
                 tiled_texture_node.name = tiled_texture_name
                 tiled_texture_node.label = tiled_texture_name
@@ -191,21 +191,6 @@ def add_tiled_texture_nodes(material, frame_data, texture_info, node_group_cache
 
 #    print(f"Linked PaletteMask node groups and palette_mask_texture_node for material: {material.name}")
 
-def read_bmp_palette_color(file_path, color_index):
-    """
-    Reads the color at the specified index from a BMP palette.
-
-    :param file_path: The path to the BMP file.
-    :param color_index: The index of the color in the BMP palette.
-    :return: The RGB color as a tuple (red, green, blue).
-    """
-    with open(file_path, 'rb') as f:
-        palette_offset = 54 + color_index * 4  # BMP header is 54 bytes + 4 bytes per color entry
-        f.seek(palette_offset)
-        palette_data = f.read(4)  # Read the color data (BGRX format)
-        blue, green, red, _ = struct.unpack('BBBB', palette_data)
-        return red / 255.0, green / 255.0, blue / 255.0
-
 def create_palette_mask_node_group(palette_mask_node_group):
     """
     Creates the PaletteMask node group used for tiled textures.
@@ -1,6 +1,6 @@
 import bpy
 
-def assign_mesh_to_armature(mesh_obj, armature_obj, armature_data, cumulative_matrices):
+def assign_mesh_to_armature(mesh_obj, armature_obj, armature_data, cumulative_matrices, pending_constraints=None):
     mesh_name = mesh_obj.name
     assigned = False
 
@@ -48,9 +48,12 @@ def assign_mesh_to_armature(mesh_obj, armature_obj, armature_data, cumulative_ma
 
                 # 3) "Clear Inverse" so the child snaps to the bone HEAD and then follows it
                 # (In UI this is Constraint > Clear Inverse; in API it's zeroing the inverse matrix)
-                # Note: needs depsgraph update so constraint has valid matrices
-                bpy.context.view_layer.update()
-                con.inverse_matrix.identity()
+                # Note: needs a depsgraph update with the mesh linked first, so it is
+                # deferred to clear_child_of_inverses() when pending_constraints is given
+                if pending_constraints is not None:
+                    pending_constraints.append(con)
+                else:
+                    clear_child_of_inverses([con])
 
                 # (Optional) If you want the mesh geometry centered exactly at the head right now
                 # without changing its origin permanently, you can zero its local transforms:
@@ -74,3 +77,16 @@ def assign_mesh_to_armature(mesh_obj, armature_obj, armature_data, cumulative_ma
         armature_mod.show_on_cage = True  # Enable "On Cage"
         armature_mod.show_in_editmode = True  # Enable "Edit Mode"
 
+
+
+def clear_child_of_inverses(constraints):
+    """
+    "Clear Inverse" for Child Of constraints, once every constrained mesh is
+    linked. A new Child Of constraint computes its inverse on the next
+    depsgraph update, so one update runs first for all of them.
+    """
+    if not constraints:
+        return
+    bpy.context.view_layer.update()
+    for con in constraints:
+        con.inverse_matrix.identity()
@@ -1,5 +1,10 @@
-import bpy
+import os
 import struct
+try:
+    import bpy
+except ImportError:  # The header checks are usable without Blender, e.g. from the tests
+    bpy = None
+from concurrent.futures import ThreadPoolExecutor
 
 DDS_HEADER_SIZE = 128  # Size of DDS header
 DDS_MAGIC = b'DDS '  # The first 4 bytes of a DDS file should be "DDS "
@@ -9,13 +14,19 @@ DDSD_MIPMAPCOUNT = 0x20000  # The flag that indicates mip maps are present
 DDS_OFFSET_COMPRESSION = 84  # Offset for compression type
 DXT1_COMPRESSION = b'DXT1'  # DXT1 compression identifier
 DXT5_COMPRESSION = b'DXT5'  # DXT5 compression identifier
+DDS_CHECK_THREADS = 8  # Header checks are pure file I/O, so threads overlap them well
+
+# Absolute path -> modification time of the file when it was last checked. Kept
+# across imports, so a texture is only opened again once it has changed
+checked_files = {}
 
 def check_and_fix_dds(texture_path):
+    # Returns True if the header was modified
     try:
         with open(texture_path, 'rb+') as f:
             header = f.read(DDS_HEADER_SIZE)
             if len(header) < DDS_HEADER_SIZE or header[:4] != DDS_MAGIC:
-                return
+                return False
             
             # Read the mip map count at offset 28
             mip_map_count = struct.unpack_from('<I', header, DDS_OFFSET_MIPMAPCOUNT)[0]
@@ -34,16 +45,53 @@ def check_and_fix_dds(texture_path):
                 # Write the modified flags back to the file
                 f.seek(DDS_OFFSET_FLAGS)
                 f.write(struct.pack('<I', flags))
+                return True
             # else:
             #     print(f"No changes needed for {texture_path}.")
     except IOError as e:
         print(f"Failed to process {texture_path}: {e}")
+    return False
+
+def _check_file(texture_path):
+    # Returns (path, modification time after the check or None if missing, whether it was fixed)
+    try:
+        mtime = os.stat(texture_path).st_mtime_ns
+    except OSError:
+        return texture_path, None, False
+    if checked_files.get(texture_path) == mtime:
+        return texture_path, mtime, False
+    fixed = check_and_fix_dds(texture_path)
+    if fixed:
+        mtime = os.stat(texture_path).st_mtime_ns
+    return texture_path, mtime, fixed
+
+def fix_dds_files(texture_paths, threads=DDS_CHECK_THREADS):
+    """
+    Runs check_and_fix_dds on each file that was not checked since it last
+    changed, in a thread pool when there are many. Returns the fixed paths.
+    """
+    paths = list(dict.fromkeys(texture_paths))
+    if threads > 1 and len(paths) > threads:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(_check_file, paths))
+    else:
+        results = [_check_file(path) for path in paths]
+
+    fixed = []
+    for path, mtime, was_fixed in results:
+        if mtime is not None:
+            checked_files[path] = mtime
+        if was_fixed:
+            fixed.append(path)
+    return fixed
 
 def scan_and_fix_dds_in_materials():
+    # Checks the images of every material in the file; imports only fix the images they load
+    texture_paths = []
     for material in bpy.data.materials:
         if material.use_nodes:
             for node in material.node_tree.nodes:
                 if node.type == 'TEX_IMAGE' and node.image:
-                    texture_path = bpy.path.abspath(node.image.filepath)
-                    # Check the file header regardless of the extension
-                    check_and_fix_dds(texture_path)
+                    # Check the file header regardless of the extension; keyed like texture_registry.texture_key
+                    texture_paths.append(os.path.normcase(os.path.abspath(bpy.path.abspath(node.image.filepath))))
+    return fix_dds_files(texture_paths)
@@ -0,0 +1,138 @@
+import contextlib
+import itertools
+import mmap
+import os
+import re
+import parse_cache
+from wce_tokenizer import FILE_ENCODING
+
+# Quail writes every definition header at column 0 and indents its properties,
+# so a newline followed by a keyword marks the start of the next definition
+_HEADER = rb'([A-Z][A-Z0-9_?]*)[ \t]*(?:"([^"\r\n]*)"|([^\r\n]*))'
+_FIRST_HEADER_RE = re.compile(_HEADER)
+_HEADER_RE = re.compile(rb'\n' + _HEADER)
+_PROPERTY_LINE_RE = re.compile(rb'\n[ \t]*[^\s/]')
+_NUM_VERTICES_RE = re.compile(rb'NUMVERTICES[ \t]+(\d+)')
+_NUM_FACES_RE = re.compile(rb'NUMFACE2S[ \t]+(\d+)')
+
+@contextlib.contextmanager
+def open_mapped(filepath):
+    """
+    Maps filepath read-only so it can be scanned and sliced without reading
+    the whole file into memory.
+    """
+    with open(filepath, 'rb') as file:
+        try:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            yield b""
+            return
+        with data:
+            yield data
+
+def build_index(data):
+    """
+    Scans the raw bytes of a WCE file once and returns its top-level
+    definitions as (kind, name, byte offset, byte length) entries. A
+    TRACKINSTANCE is folded into the TRACKDEFINITION before it, since
+    parse_track reads the pair together.
+    """
+    entries = []
+    first = _FIRST_HEADER_RE.match(data)
+    matches = [(0, first)] if first else []
+    # Header matches start on the newline before the line itself
+    matches = itertools.chain(matches, ((match.start() + 1, match) for match in _HEADER_RE.finditer(data)))
+    for offset, match in matches:
+        kind = match.group(1).decode("ascii")
+        name = match.group(2) if match.group(2) is not None else match.group(3).strip()
+        if kind == "TRACKINSTANCE" and entries and entries[-1][0] == "TRACKDEFINITION":
+            continue
+        entries.append([kind, name.decode(FILE_ENCODING, errors="replace"), offset, 0])
+
+    # Every definition the parser reads has properties below its header. One
+    # that spans a single line means the file is not indented as expected.
+    single_line_kinds = set()
+    for i, entry in enumerate(entries):
+        end = entries[i + 1][2] if i + 1 < len(entries) else len(data)
+        entry[3] = end - entry[2]
+        if not _PROPERTY_LINE_RE.search(data, entry[2], end):
+            single_line_kinds.add(entry[0])
+
+    counts = {'vertices': 0, 'faces': 0}
+    for kind, _, offset, length in entries:
+        counts[kind] = counts.get(kind, 0) + 1
+        if kind == "DMSPRITEDEF2":
+            match = _NUM_VERTICES_RE.search(data, offset, offset + length)
+            if match:
+                counts['vertices'] += int(match.group(1))
+            match = _NUM_FACES_RE.search(data, offset, offset + length)
+            if match:
+                counts['faces'] += int(match.group(1))
+
+    return {
+        'entries': [tuple(entry) for entry in entries],
+        'single_line_kinds': single_line_kinds,
+        'counts': counts,
+    }
+
+def load_index(filepath, data=None):
+    """
+    Returns the index of filepath, reusing the persisted one while the file
+    is unchanged. data may be the file's bytes or its mmap.
+    """
+    index = parse_cache.load(filepath, parse_cache.INDEX_SUFFIX)
+    if index is None:
+        if data is None:
+            with open_mapped(filepath) as data:
+                index = build_index(data)
+        else:
+            index = build_index(data)
+        parse_cache.store(filepath, [], index, parse_cache.INDEX_SUFFIX)
+    return index
+
+def select_lines(data, index, kinds):
+    """
+    Returns the raw lines of only the definitions whose kind is in kinds,
+    skipping everything else (ACTORINST, lights, ...) without copying or
+    decoding it. data may be the file's bytes or its mmap.
+    """
+    if index['single_line_kinds'] & (set(kinds) - {"INCLUDE"}):
+        # Offsets cannot be trusted without indentation, read the whole file
+        return data[:].splitlines()
+    lines = []
+    span = None
+    for kind, _, offset, length in index['entries']:
+        if kind not in kinds:
+            continue
+        # Merge neighbouring spans so the common case copies one large slice
+        if span and span[1] == offset:
+            span[1] = offset + length
+        else:
+            if span:
+                lines.extend(data[span[0]:span[1]].splitlines())
+            span = [offset, offset + length]
+    if span:
+        lines.extend(data[span[0]:span[1]].splitlines())
+    return lines
+
+def summarize(filepath, _seen=None):
+    """
+    Totals the definition counts of filepath and everything it INCLUDEs,
+    e.g. for showing vertex/face/track counts before a model is imported.
+    """
+    if _seen is None:
+        _seen = set()
+    filepath = os.path.normpath(filepath)
+    if filepath in _seen or not os.path.isfile(filepath):
+        return {}
+    _seen.add(filepath)
+
+    index = load_index(filepath)
+    totals = dict(index['counts'])
+    file_dir = os.path.dirname(filepath)
+    for kind, name, _, _ in index['entries']:
+        if kind == "INCLUDE":
+            for key, value in summarize(os.path.join(file_dir, name), _seen).items():
+                totals[key] = totals.get(key, 0) + value
+    return totals
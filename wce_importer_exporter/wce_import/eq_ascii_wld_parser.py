@@ -1,45 +1,155 @@
-import io
+import logging
 import os
-import shlex
-import sys
-
-def clear_console():
-    if sys.platform.startswith('win'):
-        os.system('cls')
-    else:
-        os.system('clear')
-
-# Call the function to clear the console
-clear_console()
-
-# Manually set the directory containing your scripts
-script_dir = r'C:\Users\dariu\Documents\Quail\Importer'  # Replace with the actual path
-#print(f"Script directory: {script_dir}")  # Check the path
-if script_dir not in sys.path:
-    sys.path.append(script_dir)
+import time
+import parse_cache
+import parse_pool
+import parse_stats
+from definition_index import load_index, open_mapped, select_lines
+from wce_tokenizer import WCETokenizer
+
+# Top-level definitions parse_definitions knows how to read; anything else is skipped
+PARSED_KINDS = frozenset((
+    "INCLUDE", "ACTORDEF", "MATERIALPALETTE", "DMSPRITEDEF2", "TRACKDEFINITION",
+    "HIERARCHICALSPRITEDEF", "POLYHEDRONDEFINITION", "SIMPLESPRITEDEF", "MATERIALDEFINITION",
+    "DMTRACKDEF2", "WORLDTREE", "REGION", "WORLDDEF", "ZONE", "AMBIENTLIGHT",
+))
+
+log = logging.getLogger("wce_importer")
+
+# Every file opened by parse(), so the parse cache can key on INCLUDEs too
+opened_files = []
+
+# Opens a file and returns a tokenizer over the definitions that will be parsed
+def open_definitions(filepath: str, kinds=None):
+    start = time.perf_counter()
+    kinds = PARSED_KINDS if kinds is None else PARSED_KINDS & set(kinds)
+    # The file is mapped rather than read; only the definitions that will be parsed are copied out
+    with open_mapped(filepath) as data:
+        index = load_index(filepath, data)
+        lines = select_lines(data, index, kinds)
+    if parse_stats.active_stats is not None:
+        parse_stats.active_stats.add_open(filepath, time.perf_counter() - start)
+    return WCETokenizer(lines), kinds
 
 # Function to open and initiate the parsing
-def parse(filepath: str):
+def parse(filepath: str, kinds=None, workers=1):
     #print(f"Opening file: {filepath}")
-    with open(filepath, 'r') as file:
-        data = file.read()
-    r = io.StringIO(data)
+    opened_files.append(filepath)
+    r, kinds = open_definitions(filepath, kinds)
     file_dir = os.path.dirname(filepath)  # Get the directory
     try:
-        return parse_definitions(r, file_dir, os.path.basename(filepath))
+        return parse_definitions(r, file_dir, os.path.basename(filepath), kinds, workers, filepath)
     except Exception as e:
         raise Exception(f"Error while parsing: {e}") from e
 
-# Main function to handle definition switching and return results
-def parse_definitions(r: io.TextIOWrapper = None, file_dir: str = None, filename: str = None):
-    if r is None:
-        raise Exception("reader is none")
+# Reads each top-level definition and yields it as a (keyword, definition) pair
+def read_definitions(r: WCETokenizer, filepath: str = None):
+    for records in r:
+        keyword = records[0]
+        start = time.perf_counter()
+        start_line = r.pos - 1
 
-#    print(f"Parsing file: {filename}")
+        if keyword == "INCLUDE":
+            definition = records[1]
+
+        elif keyword == "ACTORDEF":
+            from parse_actor_def import parse_actor_def
+            definition = parse_actor_def(r, parse_property, records)
+
+        elif keyword == "MATERIALPALETTE":
+            from parse_material_palette import parse_material_palette
+            definition = parse_material_palette(r, parse_property, records)
+
+        elif keyword == "DMSPRITEDEF2":
+            from parse_dm_sprite_def_2 import parse_dm_sprite_def_2
+            definition = parse_dm_sprite_def_2(r, parse_property, records)
+
+        elif keyword == "TRACKDEFINITION":
+            from parse_track import parse_track
+            # Animation prefixes are resolved once the ACTORDEF is known
+            definition = parse_track(r, parse_property, None, records)
+
+        elif keyword == "HIERARCHICALSPRITEDEF":
+            from parse_hierarchical_sprite_def import parse_hierarchical_sprite_def
+            definition = parse_hierarchical_sprite_def(r, parse_property, records)
+
+        elif keyword == "POLYHEDRONDEFINITION":
+            from parse_polyhedron_definition import parse_polyhedron_definition
+            definition = parse_polyhedron_definition(r, parse_property, records)
+
+        elif keyword == "SIMPLESPRITEDEF":
+            from parse_simple_sprite_def import parse_simple_sprite_def
+            definition = parse_simple_sprite_def(r, parse_property, records)
+
+        elif keyword == "MATERIALDEFINITION":
+            from parse_material_definition import parse_material_definition
+            definition = parse_material_definition(r, parse_property, records)
+
+        elif keyword == "DMTRACKDEF2":
+            from parse_dm_track_def_2 import parse_dm_track_def_2
+            definition = parse_dm_track_def_2(r, parse_property, records)
+
+        elif keyword == "WORLDTREE":
+            from parse_world_tree import parse_world_tree
+            definition = parse_world_tree(r, parse_property, records)
+
+        elif keyword == "REGION":
+            from parse_region import parse_region
+            definition = parse_region(r, parse_property, records)
+
+        elif keyword == "WORLDDEF":
+            from parse_world_def import parse_world_def
+            definition = parse_world_def(r, parse_property, records)
+
+        elif keyword == "ZONE":
+            from parse_zone import parse_zone
+            definition = parse_zone(r, parse_property, records)
+
+        elif keyword == "AMBIENTLIGHT":
+            from parse_ambient_light import parse_ambient_light
+            definition = parse_ambient_light(r, parse_property, records)
+
+        else:
+            continue
+
+        if parse_stats.active_stats is not None:
+            parse_stats.active_stats.add_block(filepath, keyword, time.perf_counter() - start, r.byte_count(start_line, r.pos))
+        yield keyword, definition
+
+def iter_definitions(filepath: str, kinds=None, expand_includes=True):
+    """
+    Streams the definitions of filepath as (keyword, definition) pairs, each
+    yielded as soon as its block is parsed. With expand_includes the
+    definitions of an INCLUDE file are yielded in place of its INCLUDE line;
+    otherwise ("INCLUDE", path relative to filepath) is yielded instead.
+
+    TRACKDEFINITION animations come back unresolved; pass them to
+    parse_track.resolve_track_animation with model_prefix_for() once the
+    ACTORDEF has been seen.
+    """
+    r, kinds = open_definitions(filepath, kinds)
+    file_dir = os.path.dirname(filepath)
+    for keyword, definition in read_definitions(r, filepath):
+        if keyword == "INCLUDE" and expand_includes:
+            yield from iter_definitions(os.path.join(file_dir, definition), kinds, expand_includes)
+        else:
+            yield keyword, definition
+
+# Model code animation tracks are named after: the ACTORDEF's sprite prefix, or else the file's base name
+def model_prefix_for(actordef_data, filename):
+    if actordef_data:
+        return actordef_data["actions"][0]["levelsofdetail"][0]["sprite"].split("_")[0]
     base_name = os.path.splitext(filename)[0].upper()  # Define base_name from the file name
     if "_" in base_name:
         base_name = base_name.split("_", 1)[1]
+    return base_name
+
+# Main function to handle definition switching and return results
+def parse_definitions(r: WCETokenizer = None, file_dir: str = None, filename: str = None, kinds=None, workers=1, filepath=None):
+    if r is None:
+        raise Exception("reader is none")
 
+#    print(f"Parsing file: {filename}")
     actordef_data = None
     material_palettes = {}
     meshes = []
@@ -48,7 +158,7 @@ def parse_definitions(r: io.TextIOWrapper = None, file_dir: str = None, filename
     textures = {}
     materials = []
     track_definitions = {'animations': {}, 'armature_tracks': {}}  # Use dictionaries for track_definitions
-    vertex_animations = []
+    vertex_animations = {}  # DMTRACKDEF2 by name, the first definition of a name wins
     includes = []
     worldtree_data = None
     regions = []
@@ -56,149 +166,135 @@ def parse_definitions(r: io.TextIOWrapper = None, file_dir: str = None, filename
     zones = []
     ambient_light = None
 
-    # First Pass: Process all INCLUDE files
-    for line in r:
-        line = line.strip()
-        if line.startswith("INCLUDE"):
-            include = shlex.split(line)[1].strip('"')
-            includes.append(include)
-            include_filepath = os.path.join(file_dir, include)
-            
-            # Recursively parse the INCLUDE file
-            include_results = parse(include_filepath)
-            meshes.extend(include_results[0])
-            if include_results[1]:
-                armature_data = include_results[1]
-            track_definitions['animations'].update(include_results[2]['animations'])
-            track_definitions['armature_tracks'].update(include_results[2]['armature_tracks'])
-            material_palettes.update(include_results[3])
-            polyhedrons.extend(include_results[5])
-            textures.update(include_results[6])
-            materials.extend(include_results[7])
-            vertex_animations.extend(include_results[8])
-            if include_results[9]:
-                actordef_data = include_results[9]
-            if include_results[10]:
-                worldtree_data = include_results[10]
-            regions.extend(include_results[11])
-            if include_results[12]:
-                worlddef_data = include_results[12]
-            zones.extend(include_results[13])
-            if include_results[14]:
-                ambient_light = include_results[14]
-
-    # Reset reader to the beginning for the next pass
-    r.seek(0)
-
-    # Second Pass: Parse ACTORDEF if present
-    for line in r:
-        if line.strip().startswith("ACTORDEF"):
-            from parse_actor_def import parse_actor_def
-            actordef_data = parse_actor_def(r, parse_property, line)
-            print(f"Parsed ACTORDEF: {actordef_data}")
-            break  # Stop after parsing ACTORDEF
+    # Animation tracks wait here until the ACTORDEF model prefix is known
+    pending_animations = []
 
-    # Determine model_prefix based on actordef_data if present
-    model_prefix = actordef_data["actions"][0]["levelsofdetail"][0]["sprite"].split("_")[0] if actordef_data else base_name
+    # Single pass: INCLUDE lines are collected and parsed once this file is done
+    for keyword, definition in read_definitions(r, filepath or filename):
+        if keyword == "INCLUDE":
+            includes.append(definition)
 
-    # Third Pass: Parse all remaining definitions except INCLUDE and ACTORDEF
-    r.seek(0)
-    for line in r:
-        line = line.strip()
-        if not line or line.startswith("//") or line.startswith("INCLUDE") or line.startswith("ACTORDEF"):
-            continue
+        elif keyword == "ACTORDEF":
+            actordef_data = definition
+            log.debug("Parsed ACTORDEF: %s", actordef_data)
 
-        elif line.startswith("MATERIALPALETTE"):
-            from parse_material_palette import parse_material_palette
-            material_palette = parse_material_palette(r, parse_property, line)
-            if material_palette['name']:
-                material_palettes[material_palette['name']] = material_palette['materials']
-#            print(f"Parsed MATERIALPALETTE: {material_palette}")
+        elif keyword == "MATERIALPALETTE":
+            if definition['name']:
+                material_palettes[definition['name']] = definition['materials']
 
-        elif line.startswith("DMSPRITEDEF2"):
-            from parse_dm_sprite_def_2 import parse_dm_sprite_def_2
-            dmsprite = parse_dm_sprite_def_2(r, parse_property, line)
-            meshes.append(dmsprite)
-#            print(f"Parsed DMSPRITEDEF2: {dmsprite}")
+        elif keyword == "DMSPRITEDEF2":
+            meshes.append(definition)
 
-        elif line.startswith("TRACKDEFINITION"):
-            from parse_track import parse_track
-            #print(f"Parsing TRACKDEFINITION in {filename}")
-            track_data = parse_track(r, parse_property, model_prefix, line)  # Pass the current line to parse_track
+        elif keyword == "TRACKDEFINITION":
             # Merge the track data for both animations and armature_tracks
-            track_definitions['animations'].update(track_data['animations'])
-            track_definitions['armature_tracks'].update(track_data['armature_tracks'])
-#            print(f"Parsed TRACKDEFINITION: {track_data}")
+            track_definitions['animations'].update(definition['animations'])
+            track_definitions['armature_tracks'].update(definition['armature_tracks'])
+            pending_animations.extend(definition['animations'].values())
 
-        elif line.startswith("HIERARCHICALSPRITEDEF"):
-            from parse_hierarchical_sprite_def import parse_hierarchical_sprite_def
-            armature_data = parse_hierarchical_sprite_def(r, parse_property, line)
-            # print(f"Parsed HIERARCHICALSPRITEDEF: {armature_data}")
+        elif keyword == "HIERARCHICALSPRITEDEF":
+            armature_data = definition
 
-        elif line.startswith("POLYHEDRONDEFINITION"):
-            from parse_polyhedron_definition import parse_polyhedron_definition
-            polyhedron = parse_polyhedron_definition(r, parse_property, line)
-            polyhedrons.append(polyhedron)
-#            print(f"Parsed POLYHEDRONDEFINITION: {polyhedron}")
+        elif keyword == "POLYHEDRONDEFINITION":
+            polyhedrons.append(definition)
 
-        elif line.startswith("SIMPLESPRITEDEF"):
-            from parse_simple_sprite_def import parse_simple_sprite_def
-            sprite_textures = parse_simple_sprite_def(r, parse_property, line)
-            if sprite_textures:
-                textures[sprite_textures['name']] = sprite_textures
-#            print(f"Parsed SIMPLESPRITEDEF: {sprite_textures}")
+        elif keyword == "SIMPLESPRITEDEF":
+            if definition:
+                textures[definition['name']] = definition
 
-        elif line.startswith("MATERIALDEFINITION"):
-            from parse_material_definition import parse_material_definition
-            material_defs = parse_material_definition(r, parse_property, line)
-            materials.append(material_defs)
-#            print(f"Parsed MATERIALDEFINITION: {material_defs}")
+        elif keyword == "MATERIALDEFINITION":
+            materials.append(definition)
 
-        elif line.startswith("DMTRACKDEF2"):
-            from parse_dm_track_def_2 import parse_dm_track_def_2
-            dmtrack = parse_dm_track_def_2(r, parse_property, line)
-            vertex_animations.append(dmtrack)
-#            print(f"Parsed DMTRACKDEF2: {dmtrack}")
+        elif keyword == "DMTRACKDEF2":
+            vertex_animations.setdefault(definition['name'], definition)
 
-        elif line.startswith("WORLDTREE"):
-            from parse_world_tree import parse_world_tree
-            worldtree_data = parse_world_tree(r, parse_property, line)
+        elif keyword == "WORLDTREE":
+            worldtree_data = definition
             #print(f"Parsed WORLDTREE with {len(worldtree_data['nodes'])} nodes")
-        
-        elif line.startswith("REGION"):
-            from parse_region import parse_region
-            region = parse_region(r, parse_property, line)
-            regions.append(region)
-            #print(f"Parsed REGION with {region}")
 
-        elif line.startswith("WORLDDEF"):
-            from parse_world_def import parse_world_def
-            worlddef_data = parse_world_def(r, parse_property, line)
-            print(f"Parsed WORLDDEF with {worlddef_data}")
+        elif keyword == "REGION":
+            regions.append(definition)
+
+        elif keyword == "WORLDDEF":
+            worlddef_data = definition
+            log.debug("Parsed WORLDDEF with %s", worlddef_data)
+
+        elif keyword == "ZONE":
+            zones.append(definition)
+            log.debug("Parsed ZONE %s", definition['name'])
+
+        elif keyword == "AMBIENTLIGHT":
+            ambient_light = definition
+            log.debug("Parsed AMBIENTLIGHT with %s", ambient_light)
+
+    results = (meshes, armature_data, track_definitions, material_palettes, includes, polyhedrons, textures, materials, vertex_animations, actordef_data, worldtree_data, regions, worlddef_data, zones, ambient_light)
+
+    merged = results
+    if includes:
+        # INCLUDE files come first so their data merges in ahead of this file's own
+        merged = ([], None, {'animations': {}, 'armature_tracks': {}}, {}, includes, [], {}, [], {}, None, None, [], None, [], None)
+        include_filepaths = [os.path.join(file_dir, include) for include in includes]
+        # Independent INCLUDEs can be parsed in worker processes; nested ones stay serial there
+        parsed = [None] * len(includes)
+        if workers > 1 and len(includes) > 1:
+            parsed = parse_pool.parse_includes(include_filepaths, kinds, workers)
+        for include_filepath, worker_result in zip(include_filepaths, parsed):
+            if worker_result is not None:
+                include_results, include_files = worker_result
+                opened_files.extend(include_files)
+            else:
+                # Recursively parse the INCLUDE file
+                include_results = parse(include_filepath, kinds)
+            # Merged in INCLUDE order however the files were parsed
+            merged = merge_results(merged, include_results)
+        merged = merge_results(merged, results)
 
-        elif line.startswith("ZONE"):
-            from parse_zone import parse_zone
-            zone = parse_zone(r, parse_property, line)
-            zones.append(zone)
-            print(f"Parsed ZONE with {zones}")
+    # Determine model_prefix based on actordef_data if present
+    model_prefix = model_prefix_for(merged[9], filename)
 
-        elif line.startswith("AMBIENTLIGHT"):
-            from parse_ambient_light import parse_ambient_light
-            ambient_light = parse_ambient_light(r, parse_property, line)
-            print(f"Parsed AMBIENTLIGHT with {ambient_light}")
+    if pending_animations:
+        from parse_track import resolve_track_animation, reset_track_state
+        # Each file resolves its tracks from a clean state, so the result does
+        # not depend on which files were parsed before it or in which process
+        reset_track_state()
+        for animation in pending_animations:
+            resolve_track_animation(animation, model_prefix)
 
     # Debug print to track final merged data from this file
 #    print(f"Final parsed results for {filename}:")
-#    print(f"Meshes: {meshes}")
-    #  print(f"Armature Data: {armature_data}")
-#    print(f"Track Definitions: {track_definitions}")
-#    print(f"Material Palettes: {material_palettes}")
-#    print(f"Polyhedrons: {polyhedrons}")
-#    print(f"Textures: {textures}")
-#    print(f"Materials: {materials}")
+#    print(f"Meshes: {merged[0]}")
+    #  print(f"Armature Data: {merged[1]}")
+#    print(f"Track Definitions: {merged[2]}")
 
     # print(f"actordef_data in eq_ascii_parse: {actordef_data}")
 
+    return merged
+
+# Merges the 15-tuple of one parse into another, later values winning for single definitions
+def merge_results(results, other):
+    meshes, armature_data, track_definitions, material_palettes, includes, polyhedrons, textures, materials, vertex_animations, actordef_data, worldtree_data, regions, worlddef_data, zones, ambient_light = results
+
+    meshes.extend(other[0])
+    if other[1]:
+        armature_data = other[1]
+    track_definitions['animations'].update(other[2]['animations'])
+    track_definitions['armature_tracks'].update(other[2]['armature_tracks'])
+    material_palettes.update(other[3])
+    polyhedrons.extend(other[5])
+    textures.update(other[6])
+    materials.extend(other[7])
+    for name, vertex_animation in other[8].items():
+        vertex_animations.setdefault(name, vertex_animation)
+    if other[9]:
+        actordef_data = other[9]
+    if other[10]:
+        worldtree_data = other[10]
+    regions.extend(other[11])
+    if other[12]:
+        worlddef_data = other[12]
+    zones.extend(other[13])
+    if other[14]:
+        ambient_light = other[14]
+
     return meshes, armature_data, track_definitions, material_palettes, includes, polyhedrons, textures, materials, vertex_animations, actordef_data, worldtree_data, regions, worlddef_data, zones, ambient_light
 
 # Shared utility function to parse a single property and validate it
@@ -208,31 +304,27 @@ def parse_property(r, property: str, num_args: int = -1):
     if property == "":
         raise Exception("empty property")
 
-    for line in r:
-        # Debugging: Print out the line being parsed
-#        print(f"Parsing line for property '{property}': {line.strip()}")
-        
-        if "//" in line:
-            line = line.split("//")[0]
-        line = line.strip()
-        if not line:
-            continue
-        records = shlex.split(line)
-#        print(f"Parsed records for '{property}': {records}")
-        
-        if len(records) == 0:
-            raise Exception(f"{property}: empty records ({line})")
-        if records[0] != property:
-            raise Exception(f"{property}: expected {property} got {records[0]}")
-        if num_args != -1 and len(records) - 1 != num_args:
-            raise Exception(f"{property}: expected {num_args} arguments, got {len(records) - 1}")
-        
-        return records
+    records = r.expect(property, num_args)
+#    print(f"Parsed records for '{property}': {records}")
+
+    return records
 
 # Main function to start parsing from the main file
-def eq_ascii_parse(filepath):
-    # Start parsing the main file
-    meshes, armature_data, track_definitions, material_palettes, includes, polyhedrons, textures, materials, vertex_animations, actordef_data, worldtree_data, regions, worlddef_data, zones, ambient_light = parse(filepath)
+def eq_ascii_parse(filepath, kinds=None):
+    # kinds limits parsing to those definition keywords, e.g. {"INCLUDE", "DMSPRITEDEF2"}
+    if kinds is not None:
+        return parse(filepath, kinds)
+
+    # Reuse the cached results when neither the file nor its INCLUDEs changed
+    results = parse_cache.load(filepath)
+    if parse_stats.active_stats is not None:
+        parse_stats.active_stats.cache['hits' if results is not None else 'misses'] += 1
+    if results is None:
+        # Start parsing the main file
+        opened_files.clear()
+        results = parse(filepath, workers=parse_pool.pool_settings['workers'])
+        parse_cache.store(filepath, opened_files, results)
+    meshes, armature_data, track_definitions, material_palettes, includes, polyhedrons, textures, materials, vertex_animations, actordef_data, worldtree_data, regions, worlddef_data, zones, ambient_light = results
 
     return meshes, armature_data, track_definitions, material_palettes, includes, polyhedrons, textures, materials, vertex_animations, actordef_data, worldtree_data, regions, worlddef_data, zones, ambient_light
 
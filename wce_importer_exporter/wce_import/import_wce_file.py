@@ -9,18 +9,20 @@ modules_loaded = False
 def load_modules():
     global eq_ascii_parse, create_materials, register_passable_editor, unregister_passable_editor, create_region
     global apply_passable_to_all_meshes, apply_passable_to_mesh, create_passable_geometry_node_group, create_passable_material
-    global create_mesh, create_armature, assign_mesh_to_armature, create_animation, add_actordef_to_object, create_worldtree
+    global create_mesh, create_armature, assign_mesh_to_armature, clear_child_of_inverses, create_animation, add_actordef_to_object, create_worldtree
     global create_default_pose, create_polyhedron, create_bounding_sphere, create_bounding_box, parent_polyhedron
     global modify_regions_and_worldtree, create_bounding_volume_for_region_empties, create_worlddef,create_zone
+    global scene_registry_from_objects, reset_texture_registry, reset_shared_materials
     global modules_loaded
 
     if not modules_loaded:
         from .eq_ascii_wld_parser import eq_ascii_parse
-        from .material_creator import create_materials
+        from .material_creator import create_materials, reset_shared_materials
+        from .texture_registry import reset as reset_texture_registry
         from .apply_passable_to_all_meshes import apply_passable_to_all_meshes, apply_passable_to_mesh, create_passable_geometry_node_group, create_passable_material
         from ..create.create_mesh import create_mesh
         from ..create.create_armature import create_armature
-        from .assign_mesh_to_armature import assign_mesh_to_armature
+        from .assign_mesh_to_armature import assign_mesh_to_armature, clear_child_of_inverses
         from ..create.create_animation import create_animation
         from ..create.create_default_pose import create_default_pose
         from ..create.create_polyhedron import create_polyhedron
@@ -32,20 +34,107 @@ def load_modules():
         from ..create.create_region import create_region
         from ..create.create_zone import create_zone
         from ..create.modify_regions_and_worldtree import modify_regions_and_worldtree, create_bounding_volume_for_region_empties
+        from ..create.scene_registry import scene_registry_from_objects
 
         # Set the flag to True to prevent re-loading
         modules_loaded = True
 
+# Point the parse cache at the add-on's user folder using the current preferences
+def configure_parse_cache(enabled, max_megabytes):
+    import parse_cache  # Same module instance the parser imports
+    directory = os.path.join(bpy.utils.user_resource('DATAFILES', path="wce_importer", create=True), "parse_cache")
+    parse_cache.configure(enabled=enabled, directory=directory, max_bytes=max_megabytes * 1024 * 1024)
+    return parse_cache
+
+# Number of worker processes eq_ascii_parse may use for the INCLUDE files of one import
+def configure_parse_workers(workers):
+    import parse_pool  # Same module instance the parser imports
+    parse_pool.configure(workers=workers)
+
+# Definition counts of an INCLUDE and everything it includes, read from the byte-offset index
+def summarize_include(include_line, file_dir):
+    import definition_index  # Same module instance the parser imports
+    try:
+        return definition_index.summarize(os.path.join(file_dir, include_line))
+    except OSError as e:
+        print(f"Failed to index {include_line}: {e}")
+        return {}
+
+# Records parse time, blocks and bytes per definition keyword and per file for the with block
+def collect_parse_stats():
+    import parse_stats  # Same module instance the parser imports
+    return parse_stats.collect()
+
+# Writes the statistics of an import as JSON to the add-on's user folder, so runs can be compared
+def write_parse_stats(stats):
+    stats_path = os.path.join(bpy.utils.user_resource('DATAFILES', path="wce_importer", create=True), "last_import_parse_stats.json")
+    try:
+        with open(stats_path, 'w') as file:
+            file.write(stats.to_json())
+    except OSError as e:
+        print(f"Failed to write parse statistics: {e}")
+        return None
+    print(f"Parsed in {stats.to_dict()['total_seconds']:.2f}s, statistics written to {stats_path}")
+    return stats_path
+
+# Shared state of an import of several models: one node group cache and texture registry, Child Of
+# fixups and WORLDDEF parenting done once at the end, and a single undo step
+def begin_import_session(root_file_path):
+    load_modules()  # Ensure modules are loaded before use
+    reset_texture_registry()  # Images and texture headers are shared by every material of the session
+    reset_shared_materials()  # So are materials differing only by name
+    return {
+        'root_file_path': root_file_path,
+        'node_group_cache': {},
+        'pending_constraints': [],
+        'collections': {},  # model collection name -> the collection its objects were linked into
+        'registry': scene_registry_from_objects(),  # region, WorldTree and mesh lookups shared by every model
+    }
+
+def end_import_session(session):
+    clear_child_of_inverses(session['pending_constraints'])
+    parent_to_worlddef()
+    bpy.ops.ed.undo_push(message=f"Imported models: {', '.join(session['collections'])}")
+
+# Parents zone, WorldTree and region objects under the (last) WORLDDEF object in one pass
+def parent_to_worlddef():
+    worlddef_obj = None
+    for obj in bpy.data.objects:
+        if obj.name.upper().endswith("_WORLDDEF"):
+            worlddef_obj = obj
+    if worlddef_obj is None:
+        return
+    for obj in bpy.data.objects:
+        if "_ZONE" in obj.name or obj.name == "WorldTree_Root" or obj.name == "REGION" or obj.name == "REGION_MESHES":
+            # Parent without changing world transform:
+            obj.parent = worlddef_obj
+
+# Makes collection (a child of the active collection) the one new objects are linked into
+def activate_model_collection(collection):
+    view_layer = bpy.context.view_layer
+    previous = view_layer.active_layer_collection
+    previous.collection.children.link(collection)
+    view_layer.active_layer_collection = previous.children[collection.name]
+    return previous
+
 # Process INCLUDE files
-def process_include_file(include_line, file_dir, root_file_path, node_group_cache):
+def process_include_file(include_line, file_dir, root_file_path, node_group_cache, session=None, parsed=None):
     load_modules()  # Ensure modules are loaded before use
     pending_objects = []
+    pending_constraints = session['pending_constraints'] if session else []  # Child Of constraints cleared once their meshes are linked
+    if session:
+        node_group_cache = session['node_group_cache']
+        registry = session['registry']
+    else:
+        registry = scene_registry_from_objects()
 
     # Normalize and construct the full path
     include_filepath = os.path.normpath(os.path.join(file_dir, include_line))
 
-    # Call eq_ascii_parse after ensuring modules are loaded
-    meshes, armature_data, track_definitions, material_palettes, includes, polyhedrons, textures, materials, vertex_animations, actordef_data, worldtree_data, regions, worlddef_data, zones, ambient_light = eq_ascii_parse(include_filepath)
+    # Call eq_ascii_parse after ensuring modules are loaded, unless a background worker already parsed the file
+    if parsed is None:
+        parsed = eq_ascii_parse(include_filepath)
+    meshes, armature_data, track_definitions, material_palettes, includes, polyhedrons, textures, materials, vertex_animations, actordef_data, worldtree_data, regions, worlddef_data, zones, ambient_light = parsed
     
     print(f"actordef_data in process_include_file: {actordef_data}")
 
@@ -58,105 +147,187 @@ def process_include_file(include_line, file_dir, root_file_path, node_group_cach
     else:
         main_obj_name = folder_name
 
-    main_obj = bpy.data.objects.new(main_obj_name, None)
-    bpy.context.collection.objects.link(main_obj)
-
-    # Add actordef properties if available
-    if actordef_data:
-        add_actordef_to_object(main_obj, actordef_data)
-
-    # Determine model prefix
-    if actordef_data:
-        model_prefix = actordef_data["actions"][0]["levelsofdetail"][0]["sprite"].split("_")[0]
-    else:
-        model_prefix = folder_name
-
-    print(f"Model prefix: {model_prefix}")
-
-    # Create materials
-    created_materials = create_materials(materials, textures, file_dir, node_group_cache)
+    # In a session every model gets its own collection, so linking stays cheap as the scene grows
+    previous_layer_collection = None
+    if session:
+        model_collection = bpy.data.collections.new(main_obj_name)
+        previous_layer_collection = activate_model_collection(model_collection)
+        session['collections'][model_collection.name] = model_collection  # Unique even if models share a name
+
+    try:
+        main_obj = bpy.data.objects.new(main_obj_name, None)
+        bpy.context.collection.objects.link(main_obj)
+
+        # Add actordef properties if available
+        if actordef_data:
+            add_actordef_to_object(main_obj, actordef_data)
+
+        # Determine model prefix
+        if actordef_data:
+            model_prefix = actordef_data["actions"][0]["levelsofdetail"][0]["sprite"].split("_")[0]
+        else:
+            model_prefix = folder_name
+
+        print(f"Model prefix: {model_prefix}")
+
+        # Create materials
+        created_materials = create_materials(materials, textures, file_dir, node_group_cache)
+
+        armature_obj = None
+        mesh_objects = {}  # DMSPRITEDEF2 name -> created object, even if Blender renamed it
+
+        if armature_data and track_definitions:
+            armature_tracks = track_definitions['armature_tracks']
+            armature_obj, bone_map, cumulative_matrices = create_armature(armature_data, armature_tracks, main_obj)
+            for mesh_data in meshes:
+                mesh_obj = create_mesh(mesh_data, main_obj, armature_obj, armature_data, material_palettes, created_materials, vertex_animations, pending_objects, registry)
+                mesh_objects[mesh_data['name']] = mesh_obj
+                registry['meshes'][mesh_data['name']] = mesh_obj
+                geo_node_group = create_passable_geometry_node_group()
+                passable_mat = create_passable_material()
+                apply_passable_to_mesh(mesh_obj, geo_node_group, passable_mat)
+                assign_mesh_to_armature(mesh_obj, armature_obj, armature_data, cumulative_matrices, pending_constraints)
+            create_default_pose(armature_obj, track_definitions, armature_data, cumulative_matrices, model_prefix)
+            create_animation(armature_obj, track_definitions, armature_data, model_prefix)
+        else:
+            for mesh_data in meshes:
+                mesh_obj = create_mesh(mesh_data, main_obj, None, None, material_palettes, created_materials, vertex_animations, pending_objects, registry)
+                mesh_objects[mesh_data['name']] = mesh_obj
+                registry['meshes'][mesh_data['name']] = mesh_obj
+                geo_node_group = create_passable_geometry_node_group()
+                passable_mat = create_passable_material()
+                apply_passable_to_mesh(mesh_obj, geo_node_group, passable_mat)
 
-    armature_obj = None
-
-    if armature_data and track_definitions:
-        armature_tracks = track_definitions['armature_tracks']
-        armature_obj, bone_map, cumulative_matrices = create_armature(armature_data, armature_tracks, main_obj)
-        for mesh_data in meshes:
-            mesh_obj = create_mesh(mesh_data, main_obj, armature_obj, armature_data, material_palettes, created_materials, vertex_animations, pending_objects)
-            geo_node_group = create_passable_geometry_node_group()
-            passable_mat = create_passable_material()
-            apply_passable_to_mesh(mesh_obj, geo_node_group, passable_mat)
-            assign_mesh_to_armature(mesh_obj, armature_obj, armature_data, cumulative_matrices)
-        create_default_pose(armature_obj, track_definitions, armature_data, cumulative_matrices, model_prefix)
-        create_animation(armature_obj, track_definitions, armature_data, model_prefix)
-    else:
         for mesh_data in meshes:
-            mesh_obj = create_mesh(mesh_data, main_obj, None, None, material_palettes, created_materials, vertex_animations, pending_objects)
-            geo_node_group = create_passable_geometry_node_group()
-            passable_mat = create_passable_material()
-            apply_passable_to_mesh(mesh_obj, geo_node_group, passable_mat)
-
-    for mesh_data in meshes:
-        mesh_obj = bpy.data.objects.get(mesh_data['name'])
-        if mesh_obj:
-            bounding_radius = mesh_data.get('bounding_radius', 0)
-            if bounding_radius > 0:
-                bounding_sphere = create_bounding_sphere(mesh_obj, bounding_radius)
-                bounding_sphere.hide_set(True)
-            bounding_box_data = mesh_data.get('bounding_box', None)
-            if bounding_box_data and any(v != 0 for pair in bounding_box_data for v in pair):
-                bounding_box = create_bounding_box(mesh_obj, bounding_box_data)
-                if bounding_box:
-                    bounding_box.hide_set(True)
+            mesh_obj = mesh_objects.get(mesh_data['name'])
+            if mesh_obj:
+                bounding_radius = mesh_data.get('bounding_radius', 0)
+                if bounding_radius > 0:
+                    bounding_sphere = create_bounding_sphere(mesh_obj, bounding_radius)
+                    bounding_sphere.hide_set(True)
+                bounding_box_data = mesh_data.get('bounding_box', None)
+                if bounding_box_data and any(v != 0 for pair in bounding_box_data for v in pair):
+                    bounding_box = create_bounding_box(mesh_obj, bounding_box_data)
+                    if bounding_box:
+                        bounding_box.hide_set(True)
     
-    for polyhedron_data in polyhedrons:
-        polyhedron_obj = create_polyhedron(polyhedron_data)
-        polyhedron_name = polyhedron_data['name']
-        base_name = polyhedron_name.split('.')[0]
-        parent_polyhedron(polyhedron_obj, base_name, main_obj, armature_obj, meshes, armature_data)
-
-    if regions:
-        for region in regions:
-            region_obj = create_region(region, pending_objects)
-
-    # Process WorldTree if data is present
-    if worldtree_data:
-        worldtree_root = create_worldtree(worldtree_data, pending_objects)
-        if worldtree_root:
-            print(f"WorldTree created with root: {worldtree_root.name}")
-
-    for obj in pending_objects:
-        bpy.context.collection.objects.link(obj)
-
-    if bpy.data.objects.get("WorldTree_Root") and bpy.data.objects.get("REGION") and not bpy.data.objects.get("WORLD_BOUNDS"):
-        create_bounding_volume_for_region_empties()
-        modify_regions_and_worldtree()
-    else:
-        print("WorldTree_Root or REGION not found, skipping region-to-worldtree parenting.")
-
-    if zones:
-        for zone in zones:
-            zone_obj = create_zone(zone)
-
-    quail_folder = os.path.basename(file_dir)
-
-    if worlddef_data:
-        worlddef_obj = create_worlddef(worlddef_data, quail_folder)
-
-    worlddef_obj = None
-    for obj in bpy.data.objects:
-        if obj.name.upper().endswith("_WORLDDEF"):
-            worlddef_obj = obj
-            for obj in bpy.data.objects:
-                if "_ZONE" in obj.name or obj.name == "WorldTree_Root" or obj.name == "REGION" or obj.name == "REGION_MESHES":
-                    # Parent without changing world transform:
-                    obj.parent = worlddef_obj  
+        for polyhedron_data in polyhedrons:
+            polyhedron_obj = create_polyhedron(polyhedron_data)
+            polyhedron_name = polyhedron_data['name']
+            base_name = polyhedron_name.split('.')[0]
+            parent_polyhedron(polyhedron_obj, base_name, main_obj, armature_obj, meshes, armature_data, registry)
+
+        if regions:
+            for region in regions:
+                region_obj = create_region(region, pending_objects, registry)
+
+        # Process WorldTree if data is present
+        if worldtree_data:
+            worldtree_root = create_worldtree(worldtree_data, pending_objects, registry)
+            if worldtree_root:
+                print(f"WorldTree created with root: {worldtree_root.name}")
+
+        for obj in pending_objects:
+            bpy.context.collection.objects.link(obj)
+        if not session:
+            clear_child_of_inverses(pending_constraints)
+
+        if bpy.data.objects.get("WorldTree_Root") and bpy.data.objects.get("REGION") and not bpy.data.objects.get("WORLD_BOUNDS"):
+            create_bounding_volume_for_region_empties(registry)
+            modify_regions_and_worldtree(registry)
+        else:
+            print("WorldTree_Root or REGION not found, skipping region-to-worldtree parenting.")
+
+        if zones:
+            for zone in zones:
+                zone_obj = create_zone(zone, registry)
+
+        quail_folder = os.path.basename(file_dir)
+
+        if worlddef_data:
+            worlddef_obj = create_worlddef(worlddef_data, quail_folder)
+    finally:
+        # Restored even if building the model fails, so later objects don't land in its collection
+        if previous_layer_collection is not None:
+            bpy.context.view_layer.active_layer_collection = previous_layer_collection
+
+    if session:
+        # WORLDDEF parenting, Child Of fixups and the undo step happen once in end_import_session
+        return main_obj
+
+    parent_to_worlddef()
 
     # Set an undo point for each model import
     bpy.ops.ed.undo_push(message=f"Imported model: {main_obj_name}")
 
     return main_obj
 
+# An import whose INCLUDE files are parsed by background workers while the main
+# thread builds the models already parsed, one per call to step_pipelined_import
+def start_pipelined_import(root_file_path, include_lines, workers):
+    import parse_pool  # Same module instance the parser imports
+    import parse_stats
+    session = begin_import_session(root_file_path)
+    file_dir = os.path.dirname(root_file_path)
+    filepaths = [os.path.normpath(os.path.join(file_dir, include_line)) for include_line in include_lines]
+    executor, futures = parse_pool.start_model_parses(filepaths, workers)
+    return {
+        'session': session,
+        'file_dir': file_dir,
+        'include_lines': list(include_lines),
+        'executor': executor,
+        'futures': futures,  # None when every model is parsed on the main thread
+        'built': 0,  # Models built so far, in INCLUDE order
+        'stats': parse_stats.ParseStats(),
+    }
+
+# Builds the next model if its parse is ready. Returns True once every model is built
+def step_pipelined_import(pipeline):
+    index = pipeline['built']
+    if index >= len(pipeline['include_lines']):
+        return True
+    include_line = pipeline['include_lines'][index]
+    futures = pipeline['futures']
+
+    parsed = None
+    if futures is not None:
+        future = futures[index]
+        if not future.done():
+            return False
+        try:
+            parsed, worker_stats = future.result()
+            pipeline['stats'].merge(worker_stats)
+        except Exception as e:
+            print(f"Worker failed to parse {include_line}, parsing it in-process: {e}")
+    if parsed is None:
+        with collect_parse_stats() as stats:
+            parsed = eq_ascii_parse(os.path.normpath(os.path.join(pipeline['file_dir'], include_line)))
+        pipeline['stats'].merge(stats)
+
+    session = pipeline['session']
+    process_include_file(include_line, pipeline['file_dir'], session['root_file_path'], session['node_group_cache'], session, parsed)
+    pipeline['built'] = index + 1
+    return pipeline['built'] >= len(pipeline['include_lines'])
+
+# Stops the workers and closes the session over whatever was built, cancelled or not
+def finish_pipelined_import(pipeline):
+    if pipeline['executor'] is not None:
+        pipeline['executor'].shutdown(wait=False, cancel_futures=True)
+        pipeline['executor'] = None
+    end_import_session(pipeline['session'])
+    write_parse_stats(pipeline['stats'])
+
+# Stops the workers and drops the session without touching any of its objects, materials or
+# constraints, for when an undo or file load is about to free them. Models built so far stay as they are
+def abort_pipelined_import(pipeline):
+    if pipeline['executor'] is not None:
+        pipeline['executor'].shutdown(wait=False, cancel_futures=True)
+        pipeline['executor'] = None
+    pipeline['session'] = None
+    reset_texture_registry()
+    reset_shared_materials()
+    write_parse_stats(pipeline['stats'])
+
 # Process the root file and includes
 def process_root_file(file_path):
     load_modules()  # Ensure modules are loaded before use
@@ -166,9 +337,11 @@ def process_root_file(file_path):
 
     print(f"actordef in process_root_file: {actordef_data}")
     
-    node_group_cache = {}
+    session = begin_import_session(file_path)
 
     for include_line in include_files:
-        process_include_file(include_line, file_dir, file_path, node_group_cache)
+        process_include_file(include_line, file_dir, file_path, session['node_group_cache'], session)
+
+    end_import_session(session)
 
 
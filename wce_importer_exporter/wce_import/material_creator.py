@@ -1,34 +1,80 @@
 import bpy
+import importlib
 import os
-from .solidfillambientgouraud1 import create_node_group_sfag1, create_material_with_node_group_sfag1
-from .texture5ambientgouraud1 import create_node_group_t5ag1, create_material_with_node_group_t5ag1
-from .texture5ambientgouraud2 import create_node_group_t5ag2, create_material_with_node_group_t5ag2
-from .transparent import create_node_group_transparent, create_material_with_node_group_transparent
-from .userdefined_02 import create_node_group_ud02, create_material_with_node_group_ud02
-from .userdefined_06 import create_node_group_ud06, create_material_with_node_group_ud06
-from .userdefined_08 import create_node_group_ud08, create_material_with_node_group_ud08
-from .userdefined_10 import create_node_group_ud10, create_material_with_node_group_ud10
-from .userdefined_11 import create_node_group_ud11, create_material_with_node_group_ud11
-from .userdefined_12 import create_node_group_ud12, create_material_with_node_group_ud12
-from .userdefined_17 import create_node_group_ud17, create_material_with_node_group_ud17
-from .userdefined_19 import create_node_group_ud19, create_material_with_node_group_ud19
-from .userdefined_20 import create_node_group_ud20, create_material_with_node_group_ud20
-from .userdefined_21 import create_node_group_ud21, create_material_with_node_group_ud21
-from .userdefined_22 import create_node_group_ud22, create_material_with_node_group_ud22
-from .userdefined_24 import create_node_group_ud24, create_material_with_node_group_ud24
-from .userdefined_25 import create_node_group_ud25, create_material_with_node_group_ud25
-from .userdefined_26 import create_node_group_ud26, create_material_with_node_group_ud26
 from .add_animated_texture_nodes import add_animated_texture_nodes
 from .add_layered_texture_nodes import add_layered_texture_nodes
 from .add_detail_texture_nodes import add_detail_texture_nodes
 from .add_palette_mask_texture_nodes import add_palette_mask_texture_nodes
 from .add_tiled_texture_nodes import add_tiled_texture_nodes
-from .dds_checker import scan_and_fix_dds_in_materials
+from .node_group_library import append_node_group, write_node_group_library
+from .render_methods import RENDER_METHODS, material_signature
+from .texture_registry import fix_loaded_dds, has_dds_header
+from wce_importer_exporter.update_handler import register_animated_material
+
+render_method_functions = {}  # Render method -> (create_node_group, create_material) once imported
+
+# Materials built during the current import session by content signature, so
+# MATERIALDEFINITIONs differing only by name become copies of the first one.
+# A copy still has its own node tree: the exporter and the animation handler
+# read the image nodes of each material's tree, so it can't be a shared group.
+# Copying saves rebuilding the tree and loading its images, not file size.
+shared_materials = {}
+
+def reset_shared_materials():
+    """Forgets the materials of the previous import session."""
+    shared_materials.clear()
+
+def shared_material(signature):
+    """The session's material with this signature, if it still exists."""
+    mat = shared_materials.get(signature)
+    if mat is not None:
+        try:
+            mat.name  # Still valid unless it was removed since it was built
+            return mat
+        except ReferenceError:
+            del shared_materials[signature]
+    return None
+
+def get_render_method_functions(rendermethod):
+    """Imports the render method's module on first use and returns its node group and material functions."""
+    functions = render_method_functions.get(rendermethod)
+    if functions is None:
+        module_name, suffix, _, _ = RENDER_METHODS[rendermethod]
+        module = importlib.import_module(f".{module_name}", __package__)
+        functions = render_method_functions[rendermethod] = (
+            getattr(module, f"create_node_group_{suffix}"),
+            getattr(module, f"create_material_with_node_group_{suffix}"),
+        )
+    return functions
+
+def node_group_name(rendermethod, texture_path):
+    """The node group a material uses; texture dependent groups have a DXT5 DDS and an indexed color BMP variant."""
+    if RENDER_METHODS[rendermethod][3]:
+        return f"{rendermethod}(DXT5DDS)" if has_dds_header(texture_path) else f"{rendermethod}(NDXCLRBMP)"
+    return rendermethod
+
+
+def build_node_group_library():
+    """
+    Builds the node group of every render method, both variants of texture
+    dependent ones, and writes them to the node group library so later imports
+    append them instead. Returns the number of groups written.
+    """
+    node_groups = []
+    for rendermethod, (_, _, _, texture_dependent) in RENDER_METHODS.items():
+        create_node_group, _ = get_render_method_functions(rendermethod)
+        if texture_dependent:
+            node_groups.append(create_node_group(is_dds=True))
+            node_groups.append(create_node_group(is_dds=False))
+        else:
+            node_groups.append(bpy.data.node_groups.get(rendermethod) or create_node_group())
+    return write_node_group_library(node_groups)
 
 
 def get_or_create_node_group(group_name, create_function, node_group_cache, texture_path=None):
     """
-    Retrieves an existing node group or creates a new one if it doesn't exist.
+    Retrieves an existing node group, appends it from the node group library,
+    or creates a new one if neither has it.
     """
     if group_name in node_group_cache:
         return node_group_cache[group_name]
@@ -36,6 +82,9 @@ def get_or_create_node_group(group_name, create_function, node_group_cache, text
     if group_name in bpy.data.node_groups:
         node_group = bpy.data.node_groups[group_name]
     else:
+        node_group = append_node_group(group_name)
+
+    if node_group is None:
         if texture_path is not None:
             node_group = create_function(texture_path)
         else:
@@ -73,60 +122,29 @@ def create_materials(materials, textures, file_path, node_group_cache):
         texture_full_path = os.path.join(base_path, assets_folder, texture_file)
 
         rendermethod = mat_data['rendermethod']
-        if rendermethod == 'SOLIDFILLAMBIENTGOURAUD1':
-            node_group = get_or_create_node_group('SOLIDFILLAMBIENTGOURAUD1', create_node_group_sfag1, node_group_cache)
-            mat = create_material_with_node_group_sfag1(mat_name, mat_data, node_group)
-        elif rendermethod == 'TEXTURE5AMBIENTGOURAUD1':
-            node_group = get_or_create_node_group('TEXTURE5AMBIENTGOURAUD1', create_node_group_t5ag1, node_group_cache)
-            mat = create_material_with_node_group_t5ag1(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'TEXTURE5AMBIENTGOURAUD2':
-            node_group = get_or_create_node_group('TEXTURE5AMBIENTGOURAUD2', create_node_group_t5ag2, node_group_cache)
-            mat = create_material_with_node_group_t5ag2(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'TRANSPARENT':
-            node_group = get_or_create_node_group('TRANSPARENT', create_node_group_transparent, node_group_cache)
-            mat = create_material_with_node_group_transparent(mat_name, node_group)
-        elif rendermethod == 'USERDEFINED_2':
-            node_group = get_or_create_node_group('USERDEFINED_2', create_node_group_ud02, node_group_cache)
-            mat = create_material_with_node_group_ud02(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_6':
-            node_group = get_or_create_node_group('USERDEFINED_6', create_node_group_ud06, node_group_cache)
-            mat = create_material_with_node_group_ud06(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_8':
-            node_group = get_or_create_node_group('USERDEFINED_8', create_node_group_ud08, node_group_cache, texture_full_path)
-            mat = create_material_with_node_group_ud08(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_10':
-            node_group = get_or_create_node_group('USERDEFINED_10', create_node_group_ud10, node_group_cache)
-            mat = create_material_with_node_group_ud10(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_11':
-            node_group = get_or_create_node_group('USERDEFINED_11', create_node_group_ud11, node_group_cache)
-            mat = create_material_with_node_group_ud11(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_12':
-            node_group = get_or_create_node_group('USERDEFINED_12', create_node_group_ud12, node_group_cache)
-            mat = create_material_with_node_group_ud12(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_17':
-            node_group = get_or_create_node_group('USERDEFINED_17', create_node_group_ud17, node_group_cache)
-            mat = create_material_with_node_group_ud17(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_19':
-            node_group = get_or_create_node_group('USERDEFINED_19', create_node_group_ud19, node_group_cache)
-            mat = create_material_with_node_group_ud19(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_20':
-            node_group = get_or_create_node_group('USERDEFINED_20', create_node_group_ud20, node_group_cache, texture_full_path)
-            mat = create_material_with_node_group_ud20(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_21':
-            node_group = get_or_create_node_group('USERDEFINED_21', create_node_group_ud21, node_group_cache)
-            mat = create_material_with_node_group_ud21(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_22':
-            node_group = get_or_create_node_group('USERDEFINED_22', create_node_group_ud22, node_group_cache)
-            mat = create_material_with_node_group_ud22(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_24':
-            node_group = get_or_create_node_group('USERDEFINED_24', create_node_group_ud24, node_group_cache)
-            mat = create_material_with_node_group_ud24(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_25':
-            node_group = get_or_create_node_group('USERDEFINED_25', create_node_group_ud25, node_group_cache)
-            mat = create_material_with_node_group_ud25(mat_name, texture_full_path, node_group)
-        elif rendermethod == 'USERDEFINED_26':
-            node_group = get_or_create_node_group('USERDEFINED_26', create_node_group_ud26, node_group_cache, texture_full_path)
-            mat = create_material_with_node_group_ud26(mat_name, texture_full_path, node_group)
+        signature = None
+        source = None
+        if rendermethod in RENDER_METHODS:
+            group_name = node_group_name(rendermethod, texture_full_path)
+            signature = material_signature(mat_data, texture_info, group_name, base_path)
+            source = shared_material(signature) if signature is not None else None
+
+        if source is not None:
+            # An equivalent material was built already: copy it, with its own copy of the node tree
+            # that references the same images and node groups
+            mat = source.copy()
+            mat.name = mat_name
+        elif rendermethod in RENDER_METHODS:
+            create_node_group, create_material = get_render_method_functions(rendermethod)
+            material_args = RENDER_METHODS[rendermethod][2]
+            group_texture_path = texture_full_path if RENDER_METHODS[rendermethod][3] else None
+            node_group = get_or_create_node_group(group_name, create_node_group, node_group_cache, group_texture_path)
+            if material_args == 'mat_data':
+                mat = create_material(mat_name, mat_data, node_group)
+            elif material_args == 'texture':
+                mat = create_material(mat_name, texture_full_path, node_group)
+            else:
+                mat = create_material(mat_name, node_group)
         else:
             mat = bpy.data.materials.new(name=mat_name)
             mat.use_nodes = True
@@ -157,8 +175,13 @@ def create_materials(materials, textures, file_path, node_group_cache):
         mat["ANIMATED"] = texture_info.get('animated_flag', "NULL")
         mat["CURRENTFRAME"] = texture_info.get('current_frame', "NULL")
         
+        # A copy already has the overlay nodes and FRAME properties of its source; only its animation needs registering
+        if source is not None:
+            if texture_info.get('animated', False):
+                register_animated_material(mat)
+
         # Process overlay nodes regardless of animation
-        if 'frames' in texture_info and texture_info['frames']:
+        elif 'frames' in texture_info and texture_info['frames']:
             # We assume the overlays (layer/detail/palette_mask/tiled) are in the first frame's file entries.
             for file_entry in texture_info['frames'][0].get('frame_files', []):
                 file_type = file_entry.get('type', '').lower()
@@ -177,8 +200,11 @@ def create_materials(materials, textures, file_path, node_group_cache):
                 mat["FRAME"] = texture_info['frames'][0].get('tag', "")
         
 
+        if signature is not None and source is None:
+            shared_materials[signature] = mat
         created_materials[mat_name] = mat
 
-    scan_and_fix_dds_in_materials()
+    # Only the images loaded by these materials are checked, each file once until it changes
+    fix_loaded_dds()
 
     return created_materials
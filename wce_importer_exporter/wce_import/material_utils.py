@@ -1,27 +1,5 @@
-DDS_HEADER_SIZE = 128  # Size of DDS header
-DDS_MAGIC = b'DDS '  # The first 4 bytes of a DDS file should be "DDS "
-
-def has_dds_header(texture_path):
-    try:
-        with open(texture_path, 'rb') as f:
-            header = f.read(DDS_HEADER_SIZE)
-            return len(header) >= DDS_HEADER_SIZE and header[:4] == DDS_MAGIC
-    except IOError:
-        return False
-
-def is_dxt5_dds(texture_path):
-    # Check if the texture is a DDS with DXT5 compression
-    try:
-        with open(texture_path, 'rb') as f:
-            header = f.read(DDS_HEADER_SIZE)
-            if len(header) < DDS_HEADER_SIZE:
-                return False
-            
-            # The 'fourCC' for DXT5 starts at byte offset 84 in the header
-            dxt5_indicator = header[84:88]
-            return dxt5_indicator == b'DXT5'
-    except IOError:
-        return False
+# Header checks read each texture file once per import session
+from .texture_registry import has_dds_header, is_dxt5_dds
 
 def add_texture_coordinate_and_mapping_nodes(nodes, links, image_texture_node, texture_path):
     """
@@ -0,0 +1,50 @@
+import numpy as np
+
+class MeshRecord:
+    """
+    Contiguous geometry arrays of one DMSPRITEDEF2. Run-length groups from
+    the file are expanded so every face and vertex carries its own index;
+    entries not covered by any group are -1.
+    """
+    __slots__ = (
+        'verts',             # (N, 3) float32
+        'uvs',               # (N, 2) float32
+        'normals',           # (N, 3) float32
+        'colors',            # (N, 4) uint8 RGBA
+        'tris',              # (F, 3) int32, winding already reversed for Blender
+        'passable',          # (F,) uint8
+        'face_materials',    # (F,) int32 material palette index
+        'vertex_materials',  # (N,) int32 material palette index
+        'vertex_bones',      # (N,) int32 bone (DAG) index
+    )
+
+    def __init__(self, verts, uvs, normals, colors, tris, passable, face_materials, vertex_materials, vertex_bones):
+        self.verts = verts
+        self.uvs = uvs
+        self.normals = normals
+        self.colors = colors
+        self.tris = tris
+        self.passable = passable
+        self.face_materials = face_materials
+        self.vertex_materials = vertex_materials
+        self.vertex_bones = vertex_bones
+
+    @property
+    def num_vertices(self):
+        return len(self.verts)
+
+    @property
+    def num_faces(self):
+        return len(self.tris)
+
+def expand_groups(parts, total):
+    """
+    Expands a WCE group list (count, then count/index pairs) into one index
+    per element, e.g. SKINASSIGNMENTGROUPS or FACEMATERIALGROUPS.
+    """
+    num_groups = int(parts[0])
+    pairs = np.array(parts[1:num_groups * 2 + 1], dtype=np.int32).reshape(num_groups, 2)
+    expanded = np.repeat(pairs[:, 1], pairs[:, 0])[:total]
+    if len(expanded) < total:
+        expanded = np.concatenate((expanded, np.full(total - len(expanded), -1, dtype=np.int32)))
+    return expanded
@@ -0,0 +1,46 @@
+import bpy
+import os
+
+# Prebuilt render method node groups, appended on first use instead of being
+# built node by node in Python. The library is written next to the parse cache
+# by build_node_group_library() (Build Node Group Library in the add-on
+# preferences); groups missing from it are built by their render method module.
+LIBRARY_FILE_NAME = "node_groups.blend"
+
+library_names = None  # Node group names in the library, read on first use
+
+def library_path():
+    return os.path.join(bpy.utils.user_resource('DATAFILES', path="wce_importer", create=True), LIBRARY_FILE_NAME)
+
+def library_node_group_names():
+    """Names of the node groups in the library, empty if it hasn't been built."""
+    global library_names
+    if library_names is None:
+        library_names = frozenset()
+        filepath = library_path()
+        if os.path.isfile(filepath):
+            try:
+                with bpy.data.libraries.load(filepath, link=False) as (data_from, data_to):
+                    library_names = frozenset(data_from.node_groups)
+            except (OSError, RuntimeError) as e:
+                print(f"Error reading node group library '{filepath}': {e}")
+    return library_names
+
+def append_node_group(group_name):
+    """Appends group_name from the library and returns it, or None if the library doesn't have it."""
+    if group_name not in library_node_group_names():
+        return None
+    with bpy.data.libraries.load(library_path(), link=False) as (data_from, data_to):
+        data_to.node_groups = [group_name]
+    node_group = data_to.node_groups[0]
+    if node_group is not None:
+        node_group.use_fake_user = True
+    return node_group
+
+def write_node_group_library(node_groups):
+    """Writes node_groups to the library, replacing it, and returns how many were written."""
+    global library_names
+    node_groups = set(node_groups)
+    bpy.data.libraries.write(library_path(), node_groups, fake_user=True)
+    library_names = None  # Read again on next use
+    return len(node_groups)
@@ -1,12 +1,15 @@
 import bpy
 
-def parent_polyhedron(polyhedron_obj, base_name, main_obj, armature_obj, meshes, armature_data):
+def parent_polyhedron(polyhedron_obj, base_name, main_obj, armature_obj, meshes, armature_data, registry=None):
     assigned = False
 
     # 1. Search for a matching mesh
     for mesh_data in meshes:
         if mesh_data.get('polyhedron') == base_name:
-            mesh_obj = bpy.data.objects.get(mesh_data['name'])
+            if registry is not None:
+                mesh_obj = registry['meshes'].get(mesh_data['name'])
+            else:
+                mesh_obj = bpy.data.objects.get(mesh_data['name'])
             if mesh_obj:
                 polyhedron_obj.parent = mesh_obj
                 print(f"Polyhedron '{base_name}' parented to matching mesh '{mesh_obj.name}'")
@@ -1,6 +1,4 @@
-import shlex
-
-def parse_actor_def(r, parse_property, current_line):
+def parse_actor_def(r, parse_property, header):
     actordef_data = {
         "name": "",
         "callback": "",
@@ -14,8 +12,8 @@ def parse_actor_def(r, parse_property, current_line):
         "haseightyflag": False
     }
 
-    # Parse ACTORDEF from the current line
-    records = shlex.split(current_line)
+    # The ACTORDEF header line is already split into records
+    records = header
     if records[0] != "ACTORDEF":
         raise Exception(f"Expected ACTORDEF, got {records[0]}")
     actordef_data["name"] = records[1]
@@ -1,13 +1,11 @@
-import shlex
-
-def parse_ambient_light(r, parse_property, current_line):
+def parse_ambient_light(r, parse_property, header):
     """
     Parses the AMBIENTLIGHT and its properties.
     """
 
     ambient_light = {}
 
-    records = shlex.split(current_line)
+    records = header
     if records[0] != "AMBIENTLIGHT":
         raise Exception(f"Expected AMBIENTLIGHT, got {records[0]}")
     ambient_light['name'] = records[1]
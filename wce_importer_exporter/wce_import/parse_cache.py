@@ -0,0 +1,154 @@
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+
+# Bump whenever the parser output changes shape so stale entries are ignored
+CACHE_VERSION = 4
+CACHE_SUFFIX = ".wcecache"
+INDEX_SUFFIX = ".wceindex"
+
+# Configured by the add-on from its preferences; off by default for scripts and tools
+cache_settings = {
+    'enabled': False,
+    'directory': os.path.join(tempfile.gettempdir(), "wce_importer_cache"),
+    'max_bytes': 512 * 1024 * 1024,
+}
+
+def configure(enabled=None, directory=None, max_bytes=None):
+    if enabled is not None:
+        cache_settings['enabled'] = enabled
+    if directory:
+        cache_settings['directory'] = directory
+    if max_bytes is not None:
+        cache_settings['max_bytes'] = max_bytes
+
+def file_signature(filepath):
+    """Returns the (absolute path, size, mtime) triple a cache entry is keyed on."""
+    filepath = os.path.abspath(filepath)
+    stat = os.stat(filepath)
+    return (filepath, stat.st_size, stat.st_mtime_ns)
+
+def _entry_path(filepath, suffix):
+    digest = hashlib.sha1(os.path.normcase(os.path.abspath(filepath)).encode("utf-8")).hexdigest()
+    return os.path.join(cache_settings['directory'], digest + suffix)
+
+def load(filepath, suffix=CACHE_SUFFIX):
+    """
+    Returns the cached parse results for filepath, or None when caching is
+    off, there is no entry, or the file or any file it included has changed.
+    Definition indexes are stored the same way under INDEX_SUFFIX.
+    """
+    if not cache_settings['enabled']:
+        return None
+    entry_path = _entry_path(filepath, suffix)
+    try:
+        with open(entry_path, 'rb') as file:
+            meta_length, = struct.unpack("<Q", file.read(8))
+            version, signatures, payload_length, buffer_lengths = pickle.loads(file.read(meta_length))
+            if version != CACHE_VERSION:
+                return None
+            for signature in signatures:
+                if file_signature(signature[0]) != signature:
+                    return None
+            # NumPy arrays come back as views into this one buffer instead of copies
+            data = bytearray(file.read())
+    except (OSError, EOFError, struct.error, pickle.UnpicklingError, ValueError):
+        return None
+
+    view = memoryview(data)
+    buffers = []
+    offset = payload_length
+    for length in buffer_lengths:
+        buffers.append(view[offset:offset + length])
+        offset += length
+    try:
+        results = pickle.loads(view[:payload_length], buffers=buffers)
+    except Exception as e:
+        print(f"Ignoring unreadable parse cache entry for {filepath}: {e}")
+        return None
+
+    # Touch the entry so eviction treats it as recently used
+    try:
+        os.utime(entry_path)
+    except OSError:
+        pass
+    return results
+
+def store(filepath, source_files, results, suffix=CACHE_SUFFIX):
+    """
+    Writes results to the cache. source_files lists every file read while
+    parsing filepath, so an edit to any INCLUDE invalidates the entry too.
+    """
+    if not cache_settings['enabled']:
+        return
+    buffers = []
+    try:
+        payload = pickle.dumps(results, protocol=5, buffer_callback=buffers.append)
+    except (pickle.PicklingError, TypeError, AttributeError) as e:
+        print(f"Parse results for {filepath} cannot be cached: {e}")
+        return
+    raw_buffers = [buffer.raw() for buffer in buffers]
+    signatures = [file_signature(path) for path in dict.fromkeys([filepath] + list(source_files))]
+    meta = pickle.dumps((CACHE_VERSION, signatures, len(payload), [len(raw) for raw in raw_buffers]), protocol=5)
+
+    directory = cache_settings['directory']
+    entry_path = _entry_path(filepath, suffix)
+    temp_path = f"{entry_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(temp_path, 'wb') as file:
+            file.write(struct.pack("<Q", len(meta)))
+            file.write(meta)
+            file.write(payload)
+            for raw in raw_buffers:
+                file.write(raw)
+        os.replace(temp_path, entry_path)
+    except OSError as e:
+        print(f"Failed to write parse cache entry for {filepath}: {e}")
+        return
+
+    evict(cache_settings['max_bytes'])
+
+def _entries():
+    directory = cache_settings['directory']
+    if not os.path.isdir(directory):
+        return []
+    entries = []
+    for name in os.listdir(directory):
+        if name.endswith(CACHE_SUFFIX) or name.endswith(INDEX_SUFFIX):
+            path = os.path.join(directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+def evict(max_bytes):
+    """Deletes the least recently used entries until the cache fits in max_bytes."""
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+def cache_size():
+    return sum(size for _, size, _ in _entries())
+
+def clear():
+    """Removes every cache entry and returns how many were deleted."""
+    removed = 0
+    for _, _, path in _entries():
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
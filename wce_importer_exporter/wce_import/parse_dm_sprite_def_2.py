@@ -1,10 +1,11 @@
-import shlex
+import numpy as np
+from mesh_record import MeshRecord, expand_groups
 
-def parse_dm_sprite_def_2(r, parse_property, current_line):
+def parse_dm_sprite_def_2(r, parse_property, header):
     mesh = {}
 
-    # Parse DMSPRITEDEF2 from the current line
-    records = shlex.split(current_line)
+    # The DMSPRITEDEF2 header line is already split into records
+    records = header
     if records[0] != "DMSPRITEDEF2":
         raise Exception(f"Expected DMSPRITEDEF2, got {records[0]}")
     mesh['name'] = records[1]
@@ -21,56 +22,26 @@ def parse_dm_sprite_def_2(r, parse_property, current_line):
     # Parse NUMVERTICES and the XYZ coordinates of each vertex
     records = parse_property(r, "NUMVERTICES", 1)
     num_vertices = int(records[1])
-    vertices = []
-    for i in range(num_vertices):
-        records = parse_property(r, "VXYZ", 3)
-        vertices.append(tuple(map(float, records[1:])))
-    mesh['vertices'] = vertices
+    verts = r.read_block("VXYZ", 3, num_vertices)
 
     # Parse NUMUVS and the UV coordinates
     records = parse_property(r, "NUMUVS", 1)
     num_uvs = int(records[1])
-    uvs = []
-    for i in range(num_uvs):
-        records = parse_property(r, "UV", 2)
-        uvs.append(tuple(map(float, records[1:])))
-    mesh['uvs'] = uvs
+    uvs = r.read_block("UV", 2, num_uvs)
 
     # Parse NUMVERTEXNORMALS and the XYZ normals
     records = parse_property(r, "NUMVERTEXNORMALS", 1)
     num_normals = int(records[1])
-    normals = []
-    for i in range(num_normals):
-        records = parse_property(r, "NXYZ", 3)
-        normals.append(tuple(map(float, records[1:])))
-    mesh['normals'] = normals
+    normals = r.read_block("NXYZ", 3, num_normals)
 
     # Parse NUMVERTEXCOLORS and the BGRA values
     records = parse_property(r, "NUMVERTEXCOLORS", 1)
     num_colors = int(records[1])
-    colors = []
-    for i in range(num_colors):
-        records = parse_property(r, "RGBA", 4)
-        red = float(records[1])
-        green = float(records[2])
-        blue = float(records[3])
-        alpha = float(records[4])
-        colors.append((red, green, blue, alpha))
-    mesh['colors'] = colors
+    colors = r.read_block("RGBA", 4, num_colors, np.uint8)
 
     # Parse SKINASSIGNMENTGROUPS
     records = parse_property(r, "SKINASSIGNMENTGROUPS", -1)
-    parts = records[1:]
-    num_groups = int(parts[0])
-    vertex_groups = []
-    vertex_start = 0
-    for i in range(num_groups):
-        num_vertices = int(parts[i * 2 + 1])
-        bone_index = int(parts[i * 2 + 2])
-        vertex_end = vertex_start + num_vertices
-        vertex_groups.append((vertex_start, vertex_end, bone_index))
-        vertex_start = vertex_end
-    mesh['vertex_groups'] = vertex_groups
+    vertex_bones = expand_groups(records[1:], num_vertices)
 
     # Parse MATERIALPALETTE
     records = parse_property(r, "MATERIALPALETTE", 1)
@@ -94,15 +65,9 @@ def parse_dm_sprite_def_2(r, parse_property, current_line):
     # Parse NUMFACE2S and the TRIANGLE indices
     records = parse_property(r, "NUMFACE2S", 1)
     num_faces = int(records[1])
-    faces = []
-    for i in range(num_faces):
-        records = parse_property(r, "DMFACE2", 0)
-        records = parse_property(r, "PASSABLE", 1)
-        passable = int(records[1])  # Passable flag
-        records = parse_property(r, "TRIANGLE", 3)
-        face = (int(records[3]), int(records[2]), int(records[1]), passable)  # Reverse order and include passable
-        faces.append(face)
-    mesh['faces'] = faces
+    face_records = r.read_records((("DMFACE2", 0), ("PASSABLE", 1), ("TRIANGLE", 3)), num_faces, np.int32)
+    tris = np.ascontiguousarray(face_records[:, [3, 2, 1]])  # Reverse triangle order
+    passable = face_records[:, 0].astype(np.uint8)
 
     # Parse MESHOPS
     records = parse_property(r, "NUMMESHOPS", 1)
@@ -154,31 +119,13 @@ def parse_dm_sprite_def_2(r, parse_property, current_line):
 
     # Parse FACEMATERIALGROUPS
     records = parse_property(r, "FACEMATERIALGROUPS", -1)
-    parts = records[1:]
-    num_groups = int(parts[0])
-    face_material_groups = []
-    face_start = 0
-    for i in range(num_groups):
-        num_faces = int(parts[i * 2 + 1])
-        material_index = int(parts[i * 2 + 2])
-        face_end = face_start + num_faces
-        face_material_groups.append((face_start, face_end, material_index))
-        face_start = face_end
-    mesh['face_materials'] = face_material_groups
+    face_materials = expand_groups(records[1:], num_faces)
 
     # Parse VERTEXMATERIALGROUPS
     records = parse_property(r, "VERTEXMATERIALGROUPS", -1)
-    parts = records[1:]
-    num_groups = int(parts[0])
-    vertex_material_groups = []
-    vertex_start = 0
-    for i in range(num_groups):
-        num_vertices = int(parts[i * 2 + 1])
-        material_index = int(parts[i * 2 + 2])
-        vertex_end = vertex_start + num_vertices
-        vertex_material_groups.append((vertex_start, vertex_end, material_index))
-        vertex_start = vertex_end
-    mesh['vertex_materials'] = vertex_material_groups
+    vertex_materials = expand_groups(records[1:], num_vertices)
+
+    mesh['record'] = MeshRecord(verts, uvs, normals, colors, tris, passable, face_materials, vertex_materials, vertex_bones)
 
     # Parse PARAMS2
     records = parse_property(r, "PARAMS2", 3)
@@ -1,10 +1,8 @@
-import shlex
-
-def parse_dm_track_def_2(r, parse_property, current_line):
+def parse_dm_track_def_2(r, parse_property, header):
     vertex_animation = {}
 
-    # Parse DMTRACKDEF2 from the data
-    records = shlex.split(current_line)
+    # The DMTRACKDEF2 header line is already split into records
+    records = header
     if records[0] != "DMTRACKDEF2":
         raise Exception(f"Expected DMTRACKDEF2, got {records[0]}")
     vertex_animation['name'] = records[1]
@@ -28,11 +26,7 @@ def parse_dm_track_def_2(r, parse_property, current_line):
     for frame_index in range(num_frames):
         records = parse_property(r, "NUMVERTICES", 1)
         num_vertices = int(records[1])
-        vertices = []
-        for _ in range(num_vertices):
-            records = parse_property(r, "XYZ", 3)
-            vertices.append(tuple(map(float, records[1:])))
-        frames.append(vertices)
+        frames.append(r.read_block("XYZ", 3, num_vertices))
     vertex_animation['frames'] = frames
 
     return vertex_animation
@@ -1,6 +1,4 @@
-import shlex
-
-def parse_hierarchical_sprite_def(r, parse_property, current_line):
+def parse_hierarchical_sprite_def(r, parse_property, header):
     armature_data = {
         'name': '',
         'bones': [],
@@ -13,8 +11,8 @@ def parse_hierarchical_sprite_def(r, parse_property, current_line):
     existing_bone_names = set()
     track_suffix_map = {}
     
-    # Parse HIERARCHICALSPRITEDEF from the current line
-    records = shlex.split(current_line)
+    # The HIERARCHICALSPRITEDEF header line is already split into records
+    records = header
     if records[0] != "HIERARCHICALSPRITEDEF":
         raise Exception(f"Expected HIERARCHICALSPRITEDEF, got {records[0]}")
     armature_data['name'] = records[1]
@@ -1,10 +1,8 @@
-import shlex
-
-def parse_material_definition(r, parse_property, current_line):
+def parse_material_definition(r, parse_property, header):
     material = {}
     
-    # Parse MATERIALDEFINITION from the current line
-    records = shlex.split(current_line)
+    # The MATERIALDEFINITION header line is already split into records
+    records = header
     if records[0] != "MATERIALDEFINITION":
         raise Exception(f"Expected MATERIALDEFINITION, got {records[0]}")
     material['name'] = records[1]
@@ -1,14 +1,12 @@
-import shlex
-
-def parse_material_palette(r, parse_property, current_line):
+def parse_material_palette(r, parse_property, header):
     palette = {
         'name': '',
         'num_materials': 0,
         'materials': []
     }
     
-    # Parse MATERIALPALETTE from the current line
-    records = shlex.split(current_line)
+    # The MATERIALPALETTE header line is already split into records
+    records = header
     if records[0] != "MATERIALPALETTE":
         raise Exception(f"Expected MATERIALPALETTE, got {records[0]}")
     palette['name'] = records[1]
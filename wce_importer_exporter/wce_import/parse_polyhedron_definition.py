@@ -1,6 +1,4 @@
-import shlex
-
-def parse_polyhedron_definition(r, parse_property, current_line):
+def parse_polyhedron_definition(r, parse_property, header):
     polyhedron = {
         'name': '',
         'bounding_radius': 0.0,
@@ -10,8 +8,8 @@ def parse_polyhedron_definition(r, parse_property, current_line):
         'hexoneflag': 0
     }
     
-    # Parse POLYHEDRONDEFINITION from the current line
-    records = shlex.split(current_line)
+    # The POLYHEDRONDEFINITION header line is already split into records
+    records = header
     if records[0] != "POLYHEDRONDEFINITION":
         raise Exception(f"Expected POLYHEDRONDEFINITION, got {records[0]}")
     polyhedron['name'] = records[1]
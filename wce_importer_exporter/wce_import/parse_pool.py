@@ -0,0 +1,81 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import parse_cache
+import parse_stats
+
+# Configured by the add-on from its preferences; 1 parses everything in-process
+pool_settings = {
+    'workers': 1,
+}
+
+def configure(workers=None):
+    if workers is not None:
+        pool_settings['workers'] = max(1, int(workers))
+
+def _parse_include(filepath, kinds, cache_settings, collect_stats):
+    # Runs in a worker process, which imports its own copy of the parser
+    parse_cache.configure(**cache_settings)
+    import eq_ascii_wld_parser
+    eq_ascii_wld_parser.opened_files.clear()
+    if not collect_stats:
+        return eq_ascii_wld_parser.parse(filepath, kinds), list(eq_ascii_wld_parser.opened_files), None
+    with parse_stats.collect() as stats:
+        results = eq_ascii_wld_parser.parse(filepath, kinds)
+    return results, list(eq_ascii_wld_parser.opened_files), stats.to_dict()
+
+def parse_includes(filepaths, kinds, workers):
+    """
+    Parses INCLUDE files in worker processes. Returns one (results,
+    opened_files) pair per file in the same order as filepaths, or None for
+    a file whose worker failed so the caller can parse it in-process.
+    """
+    parsed = [None] * len(filepaths)
+    cache_settings = dict(parse_cache.cache_settings)
+    stats = parse_stats.active_stats
+    try:
+        # Spawned rather than forked so the workers never inherit Blender's state
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(filepaths)), mp_context=context) as executor:
+            futures = [executor.submit(_parse_include, filepath, kinds, cache_settings, stats is not None) for filepath in filepaths]
+            for i, future in enumerate(futures):
+                try:
+                    results, opened_files, worker_stats = future.result()
+                    parsed[i] = results, opened_files
+                    if worker_stats is not None:
+                        stats.merge(worker_stats)
+                except Exception as e:
+                    print(f"Worker failed to parse {filepaths[i]}, parsing it in-process: {e}")
+    except Exception as e:
+        print(f"Parallel INCLUDE parsing unavailable, parsing in-process: {e}")
+    return parsed
+
+def _parse_model(filepath, cache_settings):
+    # Runs in a worker process: parses a whole model the way eq_ascii_parse does in-process
+    parse_cache.configure(**cache_settings)
+    import eq_ascii_wld_parser
+    with parse_stats.collect() as stats:
+        results = eq_ascii_wld_parser.eq_ascii_parse(filepath)
+    return results, stats.to_dict()
+
+def start_model_parses(filepaths, workers):
+    """
+    Starts parsing whole models in worker processes ahead of the scene
+    build. Returns (executor, futures) with one future per file in the same
+    order as filepaths, each resolving to (results, stats dict), or
+    (None, None) if no pool could be started. The caller shuts the executor
+    down once it has consumed or cancelled the futures.
+    """
+    if not filepaths:
+        return None, None
+    cache_settings = dict(parse_cache.cache_settings)
+    executor = None
+    try:
+        context = multiprocessing.get_context("spawn")
+        executor = ProcessPoolExecutor(max_workers=min(max(1, workers), len(filepaths)), mp_context=context)
+        futures = [executor.submit(_parse_model, filepath, cache_settings) for filepath in filepaths]
+    except Exception as e:
+        print(f"Background parsing unavailable, parsing in-process: {e}")
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return None, None
+    return executor, futures
@@ -1,5 +1,3 @@
-import shlex
-
 def process_vislist(vislistbytes, ranges):
     """
     Decode a WCE‐style visibility RANGE byte stream into a flat list of region indices.
@@ -54,10 +52,10 @@ def process_vislist(vislistbytes, ranges):
 
     return regions
 
-def parse_region(r, parse_property, current_line):
+def parse_region(r, parse_property, header):
     region = {}
 
-    records = shlex.split(current_line)
+    records = header
     if records[0] != "REGION":
         raise Exception(f"Expected REGION, got {records[0]}")
     region['name'] = records[1]
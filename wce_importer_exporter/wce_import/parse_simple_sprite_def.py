@@ -1,10 +1,8 @@
-import shlex
-
-def parse_simple_sprite_def(r, parse_property, current_line):
+def parse_simple_sprite_def(r, parse_property, header):
     texture = {}
     
-    # Parse SIMPLESPRITEDEF from the current line
-    records = shlex.split(current_line)
+    # The SIMPLESPRITEDEF header line is already split into records
+    records = header
     if records[0] != "SIMPLESPRITEDEF":
         raise Exception(f"Expected SIMPLESPRITEDEF, got {records[0]}")
     texture['name'] = records[1]
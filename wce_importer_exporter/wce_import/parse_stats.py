@@ -0,0 +1,71 @@
+import contextlib
+import json
+
+class ParseStats:
+    """
+    Time, block count and bytes consumed per definition keyword and per
+    file, plus parse cache hits and misses, for one or more parses.
+    """
+    def __init__(self):
+        self.keywords = {}
+        self.files = {}
+        self.cache = {'hits': 0, 'misses': 0}
+
+    @staticmethod
+    def _add(table, key, seconds=0.0, num_bytes=0, blocks=0):
+        entry = table.get(key)
+        if entry is None:
+            entry = table[key] = {'seconds': 0.0, 'blocks': 0, 'bytes': 0}
+        entry['seconds'] += seconds
+        entry['blocks'] += blocks
+        entry['bytes'] += num_bytes
+
+    def add_block(self, filepath, keyword, seconds, num_bytes):
+        self._add(self.keywords, keyword, seconds, num_bytes, 1)
+        self._add(self.files, filepath, seconds, num_bytes, 1)
+
+    def add_open(self, filepath, seconds):
+        # Mapping, indexing and copying out the lines of a file
+        self._add(self.files, filepath, seconds)
+
+    def merge(self, other):
+        """Adds the totals of another ParseStats or its to_dict(), e.g. from a worker process."""
+        if isinstance(other, ParseStats):
+            other = other.to_dict()
+        for table, key in ((self.keywords, 'keywords'), (self.files, 'files')):
+            for name, entry in other[key].items():
+                self._add(table, name, entry['seconds'], entry['bytes'], entry['blocks'])
+        for key in self.cache:
+            self.cache[key] += other['cache'][key]
+
+    def to_dict(self):
+        return {
+            'total_seconds': sum(entry['seconds'] for entry in self.files.values()),
+            'keywords': self.keywords,
+            'files': self.files,
+            'cache': self.cache,
+        }
+
+    def to_json(self, indent=2):
+        return json.dumps(self.to_dict(), indent=indent, sort_keys=True)
+
+# The ParseStats the parser currently records into, if any
+active_stats = None
+
+@contextlib.contextmanager
+def collect(callback=None):
+    """
+    Records every parse inside the with block into a new ParseStats, which
+    is yielded and, if given, passed to callback when the block exits.
+    """
+    global active_stats
+    previous = active_stats
+    stats = active_stats = ParseStats()
+    try:
+        yield stats
+    finally:
+        active_stats = previous
+        if previous is not None:
+            previous.merge(stats)
+    if callback is not None:
+        callback(stats)
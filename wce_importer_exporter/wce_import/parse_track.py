@@ -1,6 +1,5 @@
-import mathutils
-import shlex
 import re
+import numpy as np
 
 # Regex patterns for detecting animation prefixes and item models
 regexAniPrefix = re.compile(r"^[CDLOPST](0[1-9]|[1-9][0-9])")
@@ -128,25 +127,52 @@ def parse_track_animation(tag, model_prefix):
     return "", ""
 
 
+def reset_track_state():
+    """Forgets the animation and model codes carried over from earlier tracks."""
+    global currentAniCode, currentAniModelCode, previousAnimations
+    currentAniCode = ""
+    currentAniModelCode = ""
+    previousAnimations = {}
+
+
+def resolve_track_animation(animation, model_prefix):
+    """Fills in the animation and model codes of a parsed animation track."""
+    ani_prefix, model_name = parse_track_animation(animation['instance']['name'], model_prefix)
+    animation['animation_prefix'] = ani_prefix
+    animation['model_name'] = model_name
+
+
+def normalize_quaternions(quaternions):
+    """
+    Normalizes an (N, 4) array of (w, x, y, z) quaternions. A zero quaternion
+    becomes (0, 1, 0, 0), matching mathutils.Quaternion.normalize().
+    """
+    lengths = np.sqrt((quaternions * quaternions).sum(axis=1))
+    normalized = np.empty_like(quaternions)
+    nonzero = lengths != 0
+    normalized[nonzero] = quaternions[nonzero] / lengths[nonzero, None]
+    normalized[~nonzero] = (0, 1, 0, 0)
+    return normalized
+
 def format_tag_index(tag_index):
     """Format the tag index as .xxx where xxx = tag_index / 1000."""
     return f".{tag_index:03d}"
 
-def parse_track(r, parse_property, model_prefix, current_line):
+def parse_track(r, parse_property, model_prefix, header):
     track_definitions = {}
     animations = {}
     armature_tracks = {}
 
-    # Parse TRACKDEFINITION from the current line
-    records = shlex.split(current_line)
+    # The TRACKDEFINITION header line is already split into records
+    records = header
     if records[0] != "TRACKDEFINITION":
         raise Exception(f"Expected TRACKDEFINITION, got {records[0]}")
         
     track_def = {
         'name': records[1],
         'num_frames': 0,
-        'frames': [],
-        'legacy_frames': [],
+        'translations': np.zeros((0, 3)),  # (N, 3) XYZ of each FRAME divided by 256
+        'rotations': np.zeros((0, 4)),     # (N, 4) normalized (w, x, y, z) of each FRAME
         'xyz_scale': 256
     }
 
@@ -163,70 +189,24 @@ def parse_track(r, parse_property, model_prefix, current_line):
     records = parse_property(r, "NUMFRAMES", 1)
     track_def['num_frames'] = int(records[1])
 
-    # Parse FRAME lines if NUMFRAMES > 0
-    frames = []
-    if track_def['num_frames'] > 0:
-        for _ in range(track_def['num_frames']):
-            # Parse each FRAME line with 8 values
-            records = parse_property(r, "FRAME", 8)
-
-            # Create a quaternion for the rotation
-            rot_scale = float(records[5])
-            rx = float(records[6])
-            ry = float(records[7])
-            rz = float(records[8])
-            rotation = mathutils.Quaternion((rot_scale, rx, ry, rz))
-            rotation.normalize()  # Normalize the quaternion
-
-            # Parse and process the translation values (XYZ) divided by 256
-            translation = (
-                float(records[2]) / 256,
-                float(records[3]) / 256,
-                float(records[4]) / 256
-            )
-
-            # Store the translation and rotation in the frame_data
-            frame_data = {
-                'translation': translation,
-                'rotation': rotation  # Store the quaternion rotation
-            }
-
-            frames.append(frame_data)
-
-        # Store frames under track_def
-        track_def['frames'] = frames
-
-    # Store xyz_scale separately
-    track_def['xyz_scale'] = int(records[1])
+    # Parse FRAME lines if NUMFRAMES > 0, each with 8 values, into the track's arrays
+    frame_block = r.read_block("FRAME", 8, track_def['num_frames'])
+    track_def['translations'] = (frame_block[:, 1:4] / 256).astype(np.float64)
+    track_def['rotations'] = normalize_quaternions(frame_block[:, 4:8]).astype(np.float64)
+
+    # Store xyz_scale separately (the last FRAME's scale, or 0 without frames)
+    track_def['xyz_scale'] = int(frame_block[-1, 0]) if len(frame_block) else track_def['num_frames']
 
     # Parse NUMLEGACYFRAMES
     records = parse_property(r, "NUMLEGACYFRAMES", 1)
     track_def['num_legacy_frames'] = int(records[1])
 
-    # Parse LEGACYFRAME lines if NUMLEGACYFRAMES > 0
-    legacy_frames = []
-    if track_def['num_legacy_frames'] > 0:
-        for _ in range(track_def['num_legacy_frames']):
-            records = parse_property(r, "LEGACYFRAME", 8)
-
-            # Create a quaternion for the rotation
-            rot_scale = float(records[5])
-            rx = float(records[6])
-            ry = float(records[7])
-            rz = float(records[8])
-            rotation = mathutils.Quaternion((rot_scale, rx, ry, rz))
-            rotation.normalize()  # Normalize the quaternion
-
-            # Parse and process the translation values (XYZ) divided by 256
-            legacy_frame_data = {
-                'xyz_scale': int(records[1]),
-                'tx': int(records[2]) / 256,
-                'ty': int(records[3]) / 256,
-                'tz': int(records[4]) / 256,
-                'rotation': rotation
-            }
-            legacy_frames.append(legacy_frame_data)
-        track_def['legacy_frames'] = legacy_frames
+    # Parse LEGACYFRAME lines if NUMLEGACYFRAMES > 0, with their integer XYZ divided by 256
+    legacy_block = r.read_block("LEGACYFRAME", 8, track_def['num_legacy_frames'])
+    if len(legacy_block):
+        track_def['legacy_xyz_scales'] = legacy_block[:, 0].astype(np.int64)
+        track_def['legacy_translations'] = legacy_block[:, 1:4].astype(np.int64) / 256
+        track_def['legacy_rotations'] = normalize_quaternions(legacy_block[:, 4:8]).astype(np.float64)
 
     # Store the track definition
     track_definitions[track_def['name']] = track_def
@@ -274,14 +254,17 @@ def parse_track(r, parse_property, model_prefix, current_line):
     is_animation = regexAniPrefix.match(track_instance_name)
 
     if is_animation:
-        ani_prefix, model_name = parse_track_animation(track_instance_name, model_prefix)
-
-        animations[track_instance_name] = {
+        animation = {
             'instance': track_instance,
             'definition': track_def,
-            'animation_prefix': ani_prefix,
-            'model_name': model_name
+            'animation_prefix': '',
+            'model_name': ''
         }
+        # A model_prefix of None defers resolution until the ACTORDEF has been read
+        if model_prefix is not None:
+            resolve_track_animation(animation, model_prefix)
+
+        animations[track_instance_name] = animation
     else:
         armature_tracks[track_instance['name']] = {
             'instance': track_instance,
@@ -1,10 +1,8 @@
-import shlex
-
-def parse_world_def(r, parse_property, current_line):
+def parse_world_def(r, parse_property, header):
     """
     Parses the WORLDDEF and its properties.
     """
-    records = shlex.split(current_line)
+    records = header
     if records[0] != "WORLDDEF":
         raise Exception(f"Expected WORLDDEF, got {records[0]}")
 
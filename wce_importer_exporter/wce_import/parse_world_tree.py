@@ -1,10 +1,8 @@
-import shlex
-
-def parse_world_tree(r, parse_property, current_line):
+def parse_world_tree(r, parse_property, header):
     """
     Parses the WORLDTREE and its nodes into a structured dictionary format.
     """
-    records = shlex.split(current_line)
+    records = header
     if records[0] != "WORLDTREE":
         raise Exception(f"Expected WORLDTREE, got {records[0]}")
 
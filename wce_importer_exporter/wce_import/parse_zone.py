@@ -1,12 +1,10 @@
-import shlex
-
-def parse_zone(r, parse_property, current_line):
+def parse_zone(r, parse_property, header):
     """
     Parses the ZONE and its properties.
     """
     zone = {}
 
-    records = shlex.split(current_line)
+    records = header
     if records[0] != "ZONE":
         raise Exception(f"Expected ZONE, got {records[0]}")
     zone['name'] = records[1]
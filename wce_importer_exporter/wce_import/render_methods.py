@@ -0,0 +1,56 @@
+import os
+
+# Render method -> (module, suffix of its create_node_group_* and
+# create_material_with_node_group_* functions, what the material function takes
+# besides its name and node group, whether the node group depends on the texture).
+# Modules are imported on first use, so only the render methods a file uses are loaded.
+RENDER_METHODS = {
+    'SOLIDFILLAMBIENTGOURAUD1': ('solidfillambientgouraud1', 'sfag1', 'mat_data', False),
+    'TEXTURE5AMBIENTGOURAUD1': ('texture5ambientgouraud1', 't5ag1', 'texture', False),
+    'TEXTURE5AMBIENTGOURAUD2': ('texture5ambientgouraud2', 't5ag2', 'texture', False),
+    'TRANSPARENT': ('transparent', 'transparent', None, False),
+    'USERDEFINED_2': ('userdefined_02', 'ud02', 'texture', False),
+    'USERDEFINED_6': ('userdefined_06', 'ud06', 'texture', False),
+    'USERDEFINED_8': ('userdefined_08', 'ud08', 'texture', True),
+    'USERDEFINED_10': ('userdefined_10', 'ud10', 'texture', False),
+    'USERDEFINED_11': ('userdefined_11', 'ud11', 'texture', False),
+    'USERDEFINED_12': ('userdefined_12', 'ud12', 'texture', False),
+    'USERDEFINED_17': ('userdefined_17', 'ud17', 'texture', False),
+    'USERDEFINED_19': ('userdefined_19', 'ud19', 'texture', False),
+    'USERDEFINED_20': ('userdefined_20', 'ud20', 'texture', True),
+    'USERDEFINED_21': ('userdefined_21', 'ud21', 'texture', False),
+    'USERDEFINED_22': ('userdefined_22', 'ud22', 'texture', False),
+    'USERDEFINED_24': ('userdefined_24', 'ud24', 'texture', False),
+    'USERDEFINED_25': ('userdefined_25', 'ud25', 'texture', False),
+    'USERDEFINED_26': ('userdefined_26', 'ud26', 'texture', True),
+}
+
+# Material data the SOLIDFILLAMBIENTGOURAUD1 node tree is built from
+SOLID_FILL_KEYS = ('rgbpen', 'brightness', 'scaledambient')
+
+def material_signature(mat_data, texture_info, group_name, file_path):
+    """
+    The content of a material's node tree: its render method and node group,
+    the resolved files of every frame with their tags and overlay parameters,
+    whether it is animated and, for solid fills, the colors it is built from.
+    Per-name properties such as TAGINDEX, VARIATION or SLEEP are left out; they
+    are set on every material. Returns None for materials not to be shared.
+    """
+    if not isinstance(texture_info, dict):
+        return None
+    frames = []
+    for frame in texture_info.get('frames') or []:
+        files = []
+        for file_entry in frame.get('frame_files', []):
+            entry = dict(file_entry)
+            entry['file'] = os.path.normcase(os.path.abspath(os.path.join(file_path, "assets", entry.get('file', ''))))
+            files.append(tuple(sorted(entry.items())))
+        frames.append((frame.get('tag', ''), tuple(files)))
+    solid_fill = tuple(tuple(value) if isinstance(value, (list, tuple)) else value
+                       for value in (mat_data.get(key) for key in SOLID_FILL_KEYS)) if RENDER_METHODS[mat_data['rendermethod']][2] == 'mat_data' else ()
+    try:
+        signature = (mat_data['rendermethod'], group_name, tuple(frames), bool(texture_info.get('animated', False)), solid_fill)
+        hash(signature)
+    except TypeError:
+        return None
+    return signature
@@ -0,0 +1,112 @@
+import bpy
+import os
+import struct
+from .dds_checker import DDS_HEADER_SIZE, DDS_MAGIC, DDS_OFFSET_FLAGS, DDS_OFFSET_MIPMAPCOUNT, DDS_OFFSET_COMPRESSION, fix_dds_files
+
+BMP_PALETTE_OFFSET = 54  # BMP header is 54 bytes, followed by the palette
+BMP_PALETTE_SIZE = 256 * 4  # 8-bit palette of BGRX entries
+PROBE_SIZE = BMP_PALETTE_OFFSET + BMP_PALETTE_SIZE  # Covers both the DDS header and a BMP palette
+
+# Images loaded and texture headers read during the current import session, so
+# materials sharing a texture share one image and the file is opened only once
+images = {}   # absolute path -> bpy.types.Image
+non_color_copies = {}  # absolute path -> Non-Color copy of an indexed color BMP, see load_non_color_copy()
+headers = {}  # absolute path -> header facts from probe_header()
+loaded_paths = set()  # absolute paths loaded since the last fix_loaded_dds()
+
+def reset():
+    """Forgets the images and headers of the previous import session."""
+    images.clear()
+    non_color_copies.clear()
+    headers.clear()
+    loaded_paths.clear()
+
+def texture_key(texture_path):
+    return os.path.normcase(os.path.abspath(bpy.path.abspath(texture_path)))
+
+def probe_header(texture_path):
+    """
+    Reads the start of a texture file with a single open() and returns what
+    the material builders need from it: whether it is a DDS, its fourCC
+    compression, dwFlags and mip map count, and the raw BMP palette bytes.
+    """
+    try:
+        with open(texture_path, 'rb') as f:
+            data = f.read(PROBE_SIZE)
+    except IOError:
+        data = b''
+    is_dds = len(data) >= DDS_HEADER_SIZE and data[:4] == DDS_MAGIC
+    return {
+        'is_dds': is_dds,
+        'compression': data[DDS_OFFSET_COMPRESSION:DDS_OFFSET_COMPRESSION + 4] if is_dds else b'',
+        'flags': struct.unpack_from('<I', data, DDS_OFFSET_FLAGS)[0] if is_dds else 0,
+        'mip_map_count': struct.unpack_from('<I', data, DDS_OFFSET_MIPMAPCOUNT)[0] if is_dds else 0,
+        'palette': data[BMP_PALETTE_OFFSET:],
+    }
+
+def texture_header(texture_path):
+    key = texture_key(texture_path)
+    header = headers.get(key)
+    if header is None:
+        header = headers[key] = probe_header(texture_path)
+    return header
+
+def has_dds_header(texture_path):
+    return texture_header(texture_path)['is_dds']
+
+def is_dxt5_dds(texture_path):
+    return texture_header(texture_path)['compression'] == b'DXT5'
+
+def read_bmp_palette_color(texture_path, color_index=0):
+    """Returns the (red, green, blue) palette entry color_index of a BMP, from the cached header."""
+    palette = texture_header(texture_path)['palette']
+    blue, green, red, _ = struct.unpack_from('BBBB', palette, color_index * 4)
+    return red / 255.0, green / 255.0, blue / 255.0
+
+def _load(loaded, texture_path, colorspace):
+    key = texture_key(texture_path)
+    image = loaded.get(key)
+    if image is not None:
+        try:
+            image.name  # Still valid unless it was removed since it was loaded
+            return image
+        except ReferenceError:
+            pass
+    image = bpy.data.images.load(texture_path)
+    image.colorspace_settings.name = colorspace
+    loaded[key] = image
+    loaded_paths.add(key)
+    return image
+
+def load_image(texture_path, colorspace):
+    """
+    Loads texture_path once for the session and returns the shared image.
+    colorspace, e.g. 'sRGB' or 'Non-Color', is applied when the file is
+    first loaded, so every use of a file names the one it needs.
+    Raises RuntimeError like bpy.data.images.load() if the file can't be read.
+    """
+    return _load(images, texture_path, colorspace)
+
+def load_non_color_copy(texture_path):
+    """
+    A second, Non-Color image of an indexed color BMP whose palette indices
+    are looked up next to its colors, shared like load_image().
+    """
+    return _load(non_color_copies, texture_path, 'Non-Color')
+
+def fix_texture_files(texture_paths):
+    """
+    Fixes the DDS mip map flags of texture_paths (see dds_checker.fix_dds_files)
+    under the same keys as the loaded images, so a file is checked only once,
+    and drops the cached headers of fixed files.
+    """
+    fixed = fix_dds_files(sorted({texture_key(texture_path) for texture_path in texture_paths}))
+    for texture_path in fixed:
+        headers.pop(texture_path, None)
+    return fixed
+
+def fix_loaded_dds():
+    """Fixes the DDS files loaded since the last call, see fix_texture_files()."""
+    fixed = fix_texture_files(loaded_paths)
+    loaded_paths.clear()
+    return fixed
@@ -3,6 +3,7 @@
 import bpy
 import os
 from .material_utils import add_texture_coordinate_and_mapping_nodes
+from .texture_registry import load_image
 
 def create_node_group_ud02():
     # Create the node group
@@ -46,9 +47,8 @@ def create_material_with_node_group_ud02(material_name, texture_path, node_group
     # Add an Image Texture node
     image_texture_node = nodes.new(type='ShaderNodeTexImage')
     image_texture_node.location = (-300, 0)
-    image_texture_node.image = bpy.data.images.load(texture_path)
+    image_texture_node.image = load_image(texture_path, 'sRGB')
     image_texture_node.interpolation = 'Linear'
-    image_texture_node.image.colorspace_settings.name = 'sRGB'
     image_texture_node.name = f"{os.path.basename(texture_path)}"
     image_texture_node.label = f"{os.path.basename(texture_path)}"
 
@@ -1,25 +1,21 @@
 #Similar to TransparentMasked
 
 import bpy
-import struct
 import os
-from .material_utils import has_dds_header, add_texture_coordinate_and_mapping_nodes
+from .material_utils import add_texture_coordinate_and_mapping_nodes
+from .texture_registry import has_dds_header, load_image, load_non_color_copy, read_bmp_palette_color
 
-def read_bmp_palette_color(file_path):
-    with open(file_path, 'rb') as f:
-        f.seek(54)  # BMP header is 54 bytes
-        palette_data = f.read(4)  # Read the first color in the palette (4 bytes: BGRX)
-        blue, green, red, _ = struct.unpack('BBBB', palette_data)
-        return red / 255.0, green / 255.0, blue / 255.0
-
-def create_node_group_ud26(image_texture_file):
+def create_node_group_ud26(image_texture_file=None, is_dds=None):
     """
     Creates a node group based on the texture type: DXT5 DDS or Indexed Color BMP.
     
     :param texture_path: Path to the texture file.
+    :param is_dds: The texture type, read from the texture file if None.
     :return: The node group created.
     """
-    if has_dds_header(image_texture_file):
+    if is_dds is None:
+        is_dds = has_dds_header(image_texture_file)
+    if is_dds:
         node_group_name = "USERDEFINED_26(DXT5DDS)"
     else:
         node_group_name = "USERDEFINED_26(NDXCLRBMP)"
@@ -30,7 +26,7 @@ def create_node_group_ud26(image_texture_file):
         return bpy.data.node_groups[node_group_name]
 
     # Create the node group based on the texture type
-    if has_dds_header(image_texture_file):
+    if is_dds:
         # Create the node group for DXT5 DDS
         node_group = bpy.data.node_groups.new(name=node_group_name, type='ShaderNodeTree')
 
@@ -176,7 +172,7 @@ def create_material_with_node_group_ud26(material_name, image_texture_file, node
         # Add an Image Texture node
         image_texture_node = nodes.new(type='ShaderNodeTexImage')
         image_texture_node.location = (-300, 0)
-        image_texture_node.image = bpy.data.images.load(image_texture_file)
+        image_texture_node.image = load_image(image_texture_file, 'sRGB')
         image_texture_node.interpolation = 'Linear'
         image_texture_node.name = f"{os.path.basename(image_texture_file)}"
         image_texture_node.label = f"{os.path.basename(image_texture_file)}"
@@ -222,15 +218,14 @@ def create_material_with_node_group_ud26(material_name, image_texture_file, node
 
         image_texture_node1 = nodes.new(type='ShaderNodeTexImage')
         image_texture_node1.location = (-300, -400)
-        image_texture_node1.image = bpy.data.images.load(image_texture_file)
+        image_texture_node1.image = load_image(image_texture_file, 'sRGB')
         image_texture_node1.name = f"{os.path.basename(image_texture_file)}"
         image_texture_node1.label = f"{os.path.basename(image_texture_file)}"
 
         image_texture_node2 = nodes.new(type='ShaderNodeTexImage')
         image_texture_node2.location = (-300, -50)
-        image_texture_node2.image = bpy.data.images.load(image_texture_file)
+        image_texture_node2.image = load_non_color_copy(image_texture_file)
         image_texture_node2.interpolation = 'Closest'
-        image_texture_node2.image.colorspace_settings.name = 'Non-Color'
         image_texture_node2.name = f"{os.path.basename(image_texture_file)}_NC"
         image_texture_node2.label = f"{os.path.basename(image_texture_file)}_NC"
 
@@ -0,0 +1,134 @@
+import locale
+import re
+import shlex
+import numpy as np
+
+# Same default encoding that open(filepath, 'r') decodes with
+FILE_ENCODING = locale.getpreferredencoding(False)
+
+# Matches a double-quoted string (group 1, may be empty) or a bare token (group 2)
+_TOKEN_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+def split_line(line):
+    """
+    Splits a WCE line into its records, honoring double-quoted strings.
+    Produces the same records as shlex.split for the lines Quail writes;
+    lines with backslashes, single quotes or glued quotes fall back to
+    shlex itself.
+    """
+    if '\\' in line or "'" in line:
+        return shlex.split(line)
+    if '"' not in line:
+        return line.split()
+
+    records = []
+    end = 0
+    for match in _TOKEN_RE.finditer(line):
+        # A token glued to a quoted string (abc"def") is rare; let shlex handle it
+        if records and match.start() == end:
+            return shlex.split(line)
+        quoted, bare = match.groups()
+        if bare is not None:
+            if '"' in bare:
+                return shlex.split(line)
+            records.append(bare)
+        else:
+            records.append(quoted)
+        end = match.end()
+    return records
+
+class WCETokenizer:
+    """
+    Single-pass lexer over the lines of a WCE file. Iterating yields one
+    list of records per non-empty line with // comments removed, so
+    records[0] is the keyword and records[1:] are its arguments.
+
+    Lines are kept as raw bytes: a line is only decoded when its records
+    are read, and numeric blocks are converted straight from the bytes.
+    data is the file contents (str or bytes) or a list of its byte lines.
+    """
+    def __init__(self, data):
+        if isinstance(data, str):
+            data = data.encode(FILE_ENCODING)
+        self.lines = data.splitlines() if isinstance(data, bytes) else data
+        self.pos = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        lines = self.lines
+        while self.pos < len(lines):
+            line = lines[self.pos]
+            self.pos += 1
+            if b"//" in line:
+                line = line.split(b"//")[0]
+            records = split_line(line.decode(FILE_ENCODING))
+            if records:
+                return records
+        raise StopIteration
+
+    def byte_count(self, start, end):
+        """Size in bytes of lines start to end, counting one newline per line."""
+        return sum(map(len, self.lines[start:end])) + (end - start)
+
+    def expect(self, keyword, num_args=-1):
+        """Reads the next records and checks the keyword and argument count."""
+        records = next(self, None)
+        if records is None:
+            raise Exception(f"{keyword}: unexpected end of file")
+        if records[0] != keyword:
+            raise Exception(f"{keyword}: expected {keyword} got {records[0]}")
+        if num_args != -1 and len(records) - 1 != num_args:
+            raise Exception(f"{keyword}: expected {num_args} arguments, got {len(records) - 1}")
+        return records
+
+    def read_block(self, keyword, num_args, count, dtype=np.float32):
+        """
+        Reads a run of `count` same-shaped numeric lines such as VXYZ or UV
+        and returns their arguments as a (count, num_args) array.
+        """
+        return self.read_records(((keyword, num_args),), count, dtype)
+
+    def read_records(self, layout, count, dtype=np.float32):
+        """
+        Reads `count` repetitions of the property lines in `layout`, a sequence
+        of (keyword, num_args) pairs, into a (count, total_args) array. Every
+        line is still checked for its keyword and argument count.
+        """
+        width = sum(num_args + 1 for _, num_args in layout)
+        arg_columns = []
+        offset = 0
+        for _, num_args in layout:
+            arg_columns.extend(range(offset + 1, offset + 1 + num_args))
+            offset += num_args + 1
+        if count <= 0:
+            return np.empty((0, len(arg_columns)), dtype=dtype)
+
+        # Fast path: slice the lines and convert the whole run at once
+        end = self.pos + count * len(layout)
+        chunk = self.lines[self.pos:end]
+        text = b" ".join(chunk)
+        if b"//" in text:
+            text = b" ".join(line.split(b"//")[0] for line in chunk)
+        if len(chunk) == count * len(layout) and b'"' not in text:
+            tokens = text.split()
+            if len(tokens) == count * width:
+                table = np.array(tokens).reshape(count, width)
+                offset = 0
+                valid = True
+                for keyword, num_args in layout:
+                    if not (table[:, offset] == keyword.encode("ascii")).all():
+                        valid = False
+                        break
+                    offset += num_args + 1
+                if valid:
+                    self.pos = end
+                    return table[:, arg_columns].astype(dtype)
+
+        # Slow path: blank lines or a malformed record, read line by line
+        values = []
+        for _ in range(count):
+            for keyword, num_args in layout:
+                values.extend(self.expect(keyword, num_args)[1:])
+        return np.array(values).reshape(count, len(arg_columns)).astype(dtype)